@@ -1,19 +1,43 @@
+import os
+
 from flask import Flask
 from flask_cors import CORS
 from .routes.health import blp
+from .routes.tables import candidates_blp, interviews_blp, clients_blp
+from .routes.metrics import blp as metrics_blp
+from .routes.export import blp as export_blp
+from .routes.common import gzip_response, require_api_token
 from flask_smorest import Api
 
 
+def _split_env(name):
+    return [value.strip() for value in os.getenv(name, "").split(",") if value.strip()]
+
+
 app = Flask(__name__)
 app.url_map.strict_slashes = False
-CORS(app, resources={r"/*": {"origins": "*"}})
+# The data API returns candidate PII: browsers may only call it from listed origins, with a token
+CORS(app, resources={r"/*": {"origins": _split_env("CORS_ORIGINS")}})
 app.config["API_TITLE"] = "My Flask API"
 app.config["API_VERSION"] = "v1"
 app.config["OPENAPI_VERSION"] = "3.0.3"
 app.config['OPENAPI_URL_PREFIX'] = '/docs'
 app.config["OPENAPI_SWAGGER_UI_PATH"] = ""
 app.config["OPENAPI_SWAGGER_UI_URL"] = "https://cdn.jsdelivr.net/npm/swagger-ui-dist/"
+app.config["API_SPEC_OPTIONS"] = {
+    "components": {"securitySchemes": {"bearerAuth": {"type": "http", "scheme": "bearer"}}},
+    "security": [{"bearerAuth": []}],
+}
+app.config["DATA_DIR"] = os.getenv("DATA_DIR", "data")
+app.config["API_TOKENS"] = _split_env("API_TOKENS")
+app.before_request(require_api_token)
+app.after_request(gzip_response)
 
 
 api = Api(app)
 api.register_blueprint(blp)
+api.register_blueprint(candidates_blp)
+api.register_blueprint(interviews_blp)
+api.register_blueprint(clients_blp)
+api.register_blueprint(metrics_blp)
+api.register_blueprint(export_blp)
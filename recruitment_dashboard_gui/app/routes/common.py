@@ -0,0 +1,79 @@
+import base64
+import binascii
+import gzip
+import hmac
+import json
+
+from flask import current_app, request
+from flask_smorest import abort
+from marshmallow import Schema, fields
+
+from data_handler import DataHandler
+
+# Responses smaller than this are sent uncompressed
+GZIP_MIN_BYTES = 1024
+
+
+class PageSchema(Schema):
+    items = fields.List(fields.Dict(), metadata={"description": "Rows of this page"})
+    next_cursor = fields.String(
+        allow_none=True, metadata={"description": "Pass as cursor to fetch the next page; null on the last page"}
+    )
+    version = fields.Integer(allow_none=True, metadata={"description": "Table version when the request was served"})
+
+
+def require_api_token():
+    """before_request hook: /api/ routes need "Authorization: Bearer <token>" with a token from API_TOKENS.
+
+    Fails closed: with no tokens configured every data request is refused.
+    CORS preflights pass, since browsers send them without credentials.
+    """
+    if not request.path.startswith("/api/") or request.method == "OPTIONS":
+        return None
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    tokens = current_app.config["API_TOKENS"]
+    if scheme.lower() != "bearer" or not any(hmac.compare_digest(token.strip(), known) for known in tokens):
+        abort(401, message="A valid API token is required", headers={"WWW-Authenticate": "Bearer"})
+    return None
+
+
+def get_data_handler():
+    """DataHandler over the app's data directory; the API never migrates or writes"""
+    return DataHandler(data_dir=current_app.config["DATA_DIR"], auto_migrate=False)
+
+
+def encode_cursor(after):
+    return base64.urlsafe_b64encode(json.dumps({"after": after}).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the id a cursor resumes after; aborts with 400 on a malformed cursor"""
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["after"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        abort(400, message="Invalid cursor")
+
+
+def records(df):
+    """JSON-ready list of dicts: ISO dates, nulls for missing values"""
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def gzip_response(response):
+    """after_request hook compressing JSON responses for clients that accept gzip; streams pass through"""
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or "gzip" not in request.headers.get("Accept-Encoding", "").lower()
+        or not response.mimetype.endswith("json")
+    ):
+        return response
+    body = response.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
@@ -0,0 +1,70 @@
+from flask import Response
+from flask.views import MethodView
+from flask_smorest import Blueprint, abort
+from marshmallow import Schema, fields, validate
+
+from data_handler import EXPORT_VIEWS
+
+from .common import get_data_handler
+
+# Rows read and serialized per chunk of the response body
+EXPORT_CHUNK_ROWS = 5000
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+blp = Blueprint("Export", "export", url_prefix="/api/export", description="Streaming bulk exports")
+
+
+class ExportArgsSchema(Schema):
+    format = fields.String(load_default="ndjson", validate=validate.OneOf(list(FORMATS)))
+    start = fields.Date(metadata={"description": "First applied_date / interview date to include"})
+    end = fields.Date(metadata={"description": "Last applied_date / interview date to include"})
+    after = fields.Integer(
+        metadata={"description": "Resume an interrupted export: id of the last row received"}
+    )
+
+
+@blp.route("/<view>")
+class Export(MethodView):
+    @blp.arguments(ExportArgsSchema, location="query")
+    @blp.doc(responses={
+        "200": {
+            "description": "Rows in id order, streamed as they are read",
+            "content": {mimetype: {"schema": {"type": "string"}} for mimetype in FORMATS.values()},
+        },
+        "404": {"description": f"Unknown view; one of {', '.join(EXPORT_VIEWS)}"},
+    })
+    def get(self, args, view):
+        """Stream a whole table, or interviews joined with their candidates (interview_details).
+
+        Rows are read from storage and written a chunk at a time, all from one
+        table version, so server memory is bounded by the chunk size rather
+        than the size of the table.
+        """
+        if view not in EXPORT_VIEWS:
+            abort(404, message=f"Unknown export view: {view}")
+        if args.get("start") and args.get("end") and args["start"] > args["end"]:
+            abort(400, message="start is after end")
+        chunks = get_data_handler().export_chunks(
+            view, after=args.get("after"), start=args.get("start"), end=args.get("end"),
+            chunk_rows=EXPORT_CHUNK_ROWS,
+        )
+        body = _ndjson(chunks) if args["format"] == "ndjson" else _csv(chunks)
+        return Response(body, mimetype=FORMATS[args["format"]], headers={
+            "Content-Disposition": f'attachment; filename="{view}.{args["format"]}"',
+        })
+
+
+def _ndjson(chunks):
+    for chunk in chunks:
+        yield chunk.to_json(orient="records", lines=True, date_format="iso")
+
+
+def _csv(chunks):
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header)
+        header = False
@@ -0,0 +1,27 @@
+from flask.views import MethodView
+from flask_smorest import Blueprint
+from marshmallow import Schema, fields
+
+from .common import get_data_handler
+
+blp = Blueprint("Metrics", "metrics", url_prefix="/api/metrics", description="Recruitment KPIs")
+
+
+class MetricsSchema(Schema):
+    total_candidates = fields.Integer()
+    recent_candidates = fields.Integer()
+    open_positions = fields.Integer()
+    active_interviews = fields.Integer()
+    success_rate = fields.Float()
+
+
+@blp.route("/")
+class Metrics(MethodView):
+    @blp.etag
+    @blp.response(200, MetricsSchema)
+    def get(self):
+        """Dashboard KPIs; 304 while they are unchanged"""
+        # Tagged on the values: recent_candidates counts back from now and can change without a write
+        metrics = get_data_handler().get_recruitment_metrics()
+        blp.set_etag(metrics)
+        return metrics
@@ -0,0 +1,68 @@
+from flask import request
+from flask.views import MethodView
+from flask_smorest import Blueprint, abort
+from marshmallow import Schema, fields, validate
+
+from data_handler import CATEGORICAL_COLUMNS
+
+from .common import PageSchema, decode_cursor, encode_cursor, get_data_handler, records
+
+MAX_LIMIT = 1000
+
+
+def _list_args_schema(table):
+    """Query-string schema: paging, field selection and one filter per categorical column"""
+    filters = {
+        col: fields.String(metadata={"description": f"Only rows whose {col} is one of these comma-separated values"})
+        for col in CATEGORICAL_COLUMNS[table]
+    }
+    return Schema.from_dict(
+        {
+            "cursor": fields.String(metadata={"description": "next_cursor from the previous page"}),
+            "limit": fields.Integer(load_default=100, validate=validate.Range(min=1, max=MAX_LIMIT)),
+            "fields": fields.String(metadata={"description": "Comma-separated columns to return"}),
+            **filters,
+        },
+        name=f"{table.title()}ListArgs",
+    )
+
+
+def _table_blueprint(table, description):
+    blp = Blueprint(table.title(), table, url_prefix=f"/api/{table}", description=description)
+
+    @blp.route("/")
+    class TableRows(MethodView):
+        @blp.etag
+        @blp.arguments(_list_args_schema(table), location="query")
+        @blp.response(200, PageSchema)
+        def get(self, args):
+            """List rows in id order with cursor pagination.
+
+            Responds 304 when If-None-Match carries the ETag of an unchanged
+            table version for the same query.
+            """
+            dh = get_data_handler()
+            version = dh.table_version(table)
+            # The ETag depends only on the table version and the query, so an unchanged poll is cheap
+            blp.set_etag({"table": table, "version": version, "query": sorted(request.args.items(multi=True))})
+            filters = {col: args[col].split(",") for col in CATEGORICAL_COLUMNS[table] if args.get(col)}
+            after = decode_cursor(args["cursor"]) if args.get("cursor") else None
+            rows, last = dh.scan_rows(table, after=after, limit=args["limit"], filters=filters)
+            if args.get("fields"):
+                selected = [name.strip() for name in args["fields"].split(",") if name.strip()]
+                unknown = [name for name in selected if name not in rows.columns]
+                if len(rows.columns) and unknown:
+                    abort(400, message=f"Unknown fields: {', '.join(unknown)}")
+                rows = rows[[name for name in selected if name in rows.columns]]
+            return {
+                "items": records(rows),
+                "next_cursor": encode_cursor(last) if last is not None else None,
+                "version": version,
+            }
+
+    return blp
+
+
+candidates_blp = _table_blueprint("candidates", "Read-only candidate records")
+interviews_blp = _table_blueprint("interviews", "Read-only interview records")
+clients_blp = _table_blueprint("clients", "Read-only client records")
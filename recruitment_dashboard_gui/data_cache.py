@@ -0,0 +1,158 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class _Entry:
+    __slots__ = ("version", "frame", "nbytes", "derived")
+
+    def __init__(self, version, frame, nbytes, derived=None):
+        self.version = version
+        self.frame = frame
+        self.nbytes = nbytes
+        self.derived = derived or {}
+
+
+# PUBLIC_INTERFACE
+class FrameCache:
+    """Process-wide LRU cache of loaded tables shared by every Streamlit session.
+
+    Entries are keyed on (store identity, table) and tagged with the table
+    version from storage, so a write anywhere makes the cached frame stale.
+    Cached frames are frozen and handed out as shallow, read-only views.
+
+    Each entry can also carry derived structures (indexes, summaries) built
+    from its frame. They live and die with the entry; when a write patches the
+    frame, a structure with an ``update(frame, changes, previous)`` method is
+    carried over incrementally (it may return None to ask for a rebuild);
+    anything else is rebuilt on next use. update() returns a new structure and
+    must leave its own unchanged, since sessions holding a view of the
+    previous version keep reading it; the new one may share any parts it
+    does not change.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def get_or_load(self, key, version, loader):
+        """Return a read-only view of the cached frame, calling loader() on a miss"""
+        return self._entry(key, version, loader).frame.copy(deep=False)
+
+    def derived(self, key, version, loader, name, build):
+        """Return the structure `name` built by build(frame) for the cached frame"""
+        return self._derived(self._entry(key, version, loader), name, build)
+
+    def view(self, key, version, loader, builds):
+        """Return (read-only frame view, {name: derived structure}) all taken from the same version"""
+        entry = self._entry(key, version, loader)
+        return entry.frame.copy(deep=False), {name: self._derived(entry, name, build) for name, build in builds.items()}
+
+    def _derived(self, entry, name, build):
+        with self._lock:
+            value = entry.derived.get(name)
+        if value is None:
+            value = build(entry.frame)
+            with self._lock:
+                value = entry.derived.setdefault(name, value)
+        return value
+
+    def put(self, key, version, frame, derived=None, nbytes=None):
+        """Freeze and store a frame for a table version, evicting least recently used entries"""
+        if nbytes is None:
+            # Measure first: deep memory_usage cannot read frozen object arrays
+            nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+        _freeze(frame)
+        entry = _Entry(version, frame, nbytes, derived)
+        with self._lock:
+            self._discard(key)
+            if nbytes > self.max_bytes:
+                return entry
+            self._entries[key] = entry
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+        return entry
+
+    def apply(self, key, from_version, to_version, update, changes=None):
+        """Move a cached frame to a new version via update(frame, derived) instead of reloading it.
+
+        update also gets the entry's derived structures (e.g. a key index to
+        locate rows). changes is passed to derived structures that support
+        incremental updates. If the cached entry is not at from_version
+        (another writer got in between), the entry is dropped and the next
+        read reloads it. The entry's size is carried forward at the old
+        average row size rather than measured again.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.version != from_version:
+                self._discard(key)
+                return
+            derived = dict(entry.derived)
+        try:
+            frame = update(entry.frame, derived)
+            carried = {}
+            for name, value in derived.items():
+                patch = getattr(value, "update", None)
+                updated = patch(frame, changes, entry.frame) if patch is not None and changes is not None else None
+                if updated is not None:
+                    carried[name] = updated
+        except Exception:
+            # The write is already durable; fall back to reloading from storage
+            self.invalidate(key)
+            return
+        rows = len(entry.frame)
+        nbytes = int(entry.nbytes + (len(frame) - rows) * entry.nbytes / rows) if rows else None
+        self.put(key, to_version, frame, carried, nbytes)
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry when key is None"""
+        with self._lock:
+            for k in [key] if key is not None else list(self._entries):
+                self._discard(k)
+
+    def stats(self):
+        """Return hit/miss counters and memory usage"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _entry(self, key, version, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        return self.put(key, version, loader())
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+
+def _freeze(frame):
+    """Mark the frame's backing arrays read-only so views cannot write through."""
+    # pandas has no public API for this; the block arrays are the shared storage
+    for arr in frame._mgr.arrays:
+        values = getattr(arr, "_ndarray", arr)
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+    return frame
+
+
+frame_cache = FrameCache(max_bytes=int(os.getenv("DATA_CACHE_MAX_MB", "256")) * 1024 * 1024)
@@ -1,17 +1,550 @@
+import io
+import sqlite3
+import numpy as np
 import pandas as pd
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
+from storage import SQLiteStorage, apply_journal, encode_categoricals, parse_date_columns
+from ingest import CHUNK_ROWS, SCHEMAS, IngestReport, MergeReport, RowMatcher, coerce_chunk, iter_workbook_chunks
+from data_cache import frame_cache
+from indexes import BitmapIndex, KeyIndex, locate_changed_rows
+from search import FullTextIndex, SubstringIndex, highlight
+from deadlines import DeadlineIndex, sla_rules_from_env
+from schedule import DEFAULT_INTERVIEW_MINUTES, ScheduleIndex
+from metrics import CandidateCube, InterviewSummary, compute_recruitment_metrics, recruitment_metrics
+
+# Columns parsed as datetimes when a table is loaded
+DATE_COLUMNS = {
+    "candidates": ["applied_date"],
+    "interviews": ["date", "end"],
+    "clients": [],
+}
+
+# Low-cardinality columns loaded as categoricals with a persisted dictionary
+CATEGORICAL_COLUMNS = {
+    "candidates": ["status", "client", "position"],
+    "interviews": ["status", "interviewer"],
+    "clients": [],
+}
+
+# Text columns served by the substring search index
+SEARCH_COLUMNS = {
+    "candidates": ["name", "position"],
+    "interviews": ["interviewer"],
+    "clients": ["name"],
+}
+
+# Free-text column served by the BM25 full-text index
+FULL_TEXT_COLUMNS = {
+    "interviews": "feedback",
+}
+
+# Views served by export_chunks: a base table, optionally left-joined to
+# columns of another table through a foreign key ({column: exported name})
+EXPORT_VIEWS = {
+    "candidates": {"table": "candidates"},
+    "interviews": {"table": "interviews"},
+    "clients": {"table": "clients"},
+    "interview_details": {
+        "table": "interviews",
+        "join": ("candidates", "candidate_id", {
+            "name": "candidate_name", "position": "position", "client": "client", "status": "candidate_status",
+        }),
+    },
+}
+
+# Size of the first export chunk; later chunks double up to the requested size
+EXPORT_FIRST_ROWS = 100
 
 class DataHandler:
-    def __init__(self, data_dir="data"):
+    def __init__(self, data_dir="data", storage=None, auto_migrate=True):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        self.storage = storage or SQLiteStorage(self.data_dir / "recruitment.db")
+        # Legacy workbooks; only read by the one-shot migration
         self.candidates_file = self.data_dir / "candidates.xlsx"
         self.interviews_file = self.data_dir / "interviews.xlsx"
         self.clients_file = self.data_dir / "clients.xlsx"
-        
+        self._pending = None
+        self._expected = None
+        if auto_migrate:
+            self.migrate_from_excel()
+
+    def migrate_from_excel(self, overwrite=False):
+        """Import legacy data/*.xlsx workbooks into storage; returns imported table names"""
+        migrated = []
+        for table in DATE_COLUMNS:
+            path = self.data_dir / f"{table}.xlsx"
+            if not path.exists() or (self.storage.has_table(table) and not overwrite):
+                continue
+            self.import_excel(table, path)
+            migrated.append(table)
+        return migrated
+
+    def import_excel(self, table, source, on_progress=None, chunk_rows=CHUNK_ROWS):
+        """Replace a table with an uploaded workbook, streamed in row chunks.
+
+        Each chunk is validated, type-coerced and written before the next one
+        is read. on_progress(report, total_rows) is called after every chunk;
+        total_rows is None when the workbook does not declare its size.
+        Returns an IngestReport.
+        """
+        report = IngestReport()
+
+        def chunks():
+            for total, chunk in iter_workbook_chunks(source, chunk_rows):
+                first_row = report.rows_read + 2
+                report.rows_read += len(chunk)
+                chunk = self._assign_ids(table, coerce_chunk(table, chunk, DATE_COLUMNS[table], report, first_row))
+                report.rows_written += len(chunk)
+                if on_progress:
+                    on_progress(report, total)
+                yield chunk
+
+        try:
+            self.storage.replace_table(table, chunks())
+        except sqlite3.IntegrityError as e:
+            raise ValueError(f"Duplicate ids in {table} upload") from e
+        frame_cache.invalidate((self.storage.identity, table))
+        return report
+
+    def merge_excel(self, table, source, key=None, on_progress=None, chunk_rows=CHUNK_ROWS):
+        """Merge an uploaded workbook into a table, writing only new and changed rows.
+
+        Rows are matched on key: a list of columns, "id", or None to use id
+        when the workbook has an id column and the table's natural key
+        otherwise. Matched rows are compared by content hash over the
+        uploaded columns; unchanged rows are skipped, and columns missing from
+        the workbook are left untouched. Each chunk commits as one write, so
+        a large upload never holds the write lock for long; a failure leaves
+        the chunks before it applied. Raises ValueError, writing nothing, if
+        the workbook lacks a key column. Returns a MergeReport with the diff
+        summary.
+        """
+        report = MergeReport()
+        existing = self._load(table)
+        matcher = None
+        for total, chunk in iter_workbook_chunks(source, chunk_rows):
+            with self.transaction():
+                first_row = report.rows_read + 2
+                report.rows_read += len(chunk)
+                chunk = coerce_chunk(table, chunk, DATE_COLUMNS[table], report, first_row)
+                if matcher is None:
+                    if key is None:
+                        key = ["id"] if "id" in chunk.columns else SCHEMAS[table]["natural_key"]
+                    matcher = RowMatcher(existing, [key] if isinstance(key, str) else key)
+                positions, changed = matcher.diff(chunk)
+                matched = positions >= 0
+                report.unchanged += int((matched & ~changed).sum())
+                if changed.any():
+                    ids = existing['id'].to_numpy()[positions[changed]]
+                    fields = chunk[changed].drop(columns=['id'], errors='ignore').to_dict("records")
+                    report.updated += self.update_many(table, dict(zip(ids.tolist(), fields)))
+                if (~matched).any():
+                    new_rows = chunk[~matched]
+                    if 'id' in new_rows.columns and new_rows['id'].notna().any():
+                        # A new natural key can still carry an id that exists, which updates that row
+                        written = self.upsert_many(table, new_rows)
+                        report.inserted += written["inserted"]
+                        report.updated += written["updated"]
+                    else:
+                        report.inserted += len(self.insert_many(table, new_rows.drop(columns=['id'], errors='ignore')))
+            report.rows_written = report.inserted + report.updated
+            if on_progress:
+                on_progress(report, total)
+        return report
+
+    def export_excel(self, table):
+        """Export a table as .xlsx bytes for download, built once per table version and shared across sessions"""
+        return self._derived(table, "xlsx", _to_xlsx)
+
+    def _load(self, table):
+        """Return a read-only view of a table from the shared frame cache"""
+        version = self.storage.table_version(table)
+        if version is None:
+            return pd.DataFrame()
+        return frame_cache.get_or_load((self.storage.identity, table), version, self._loader(table))
+
+    def _derived(self, table, name, build):
+        """Return a structure built from the cached table, shared across sessions"""
+        version = self.storage.table_version(table)
+        if version is None:
+            return build(pd.DataFrame())
+        return frame_cache.derived((self.storage.identity, table), version, self._loader(table), name, build)
+
+    def _loader(self, table):
+        def load():
+            df = self.storage.read_table(table, parse_dates=DATE_COLUMNS[table])
+            dictionaries = {
+                col: self.storage.dictionary(table, col, df[col].dropna().unique())
+                for col in CATEGORICAL_COLUMNS[table]
+                if col in df.columns
+            }
+            return encode_categoricals(df, dictionaries)
+        return load
+
+    def _register_values(self, table, entries):
+        """Add values written to categorical columns to their persisted dictionaries"""
+        dictionaries = {}
+        for col in CATEGORICAL_COLUMNS[table]:
+            values = [payload[col] for _, _, payload in entries if payload and payload.get(col) is not None]
+            if values:
+                dictionaries[col] = self.storage.dictionary(table, col, values)
+        return dictionaries
+
+    def columns(self, table):
+        """Column names of a table"""
+        return list(self._load(table).columns)
+
+    def options(self, table, column):
+        """Sorted distinct values of a column, for filter widgets; cached per table version"""
+        return self._derived(table, f"options:{column}", lambda df: _column_options(df, column))
+
+    def date_bounds(self, table, column):
+        """(earliest, latest) date in a column, or None when it has no dates; cached per table version"""
+        return self._derived(table, f"bounds:{column}", lambda df: _date_bounds(df, column))
+
+    def filter_rows(self, table, filters):
+        """Rows matching {column: value or list of values} on categorical columns; None means no filter.
+
+        Answered from a bitmap index kept alongside the cached table, so no
+        full-table masks or copies are made; with no active filter the cached
+        read-only view itself is returned.
+        """
+        df, positions, _ = self._select(table, "", filters)
+        return df if positions is None else df.take(positions)
+
+    def search_rows(self, table, query, filters=None, columns=None):
+        """Rows whose search columns contain query (case-insensitive), best match first.
+
+        Optional categorical filters as for filter_rows are applied to the
+        matches. An empty query returns filter_rows(table, filters).
+        """
+        df, positions, _ = self._select(table, query, filters, columns)
+        return df if positions is None else df.take(positions)
+
+    def page_rows(self, table, query="", filters=None, sort_by=None, ascending=True, page=0, page_size=50):
+        """One page of the rows search_rows(table, query, filters) returns; gives (page DataFrame, total rows).
+
+        Sorting uses a per-column sort order cached with the table, so only
+        the requested window of rows is ever materialized. Without sort_by,
+        rows keep search rank (or table) order; with it, ties keep table
+        order and missing values sort last.
+        """
+        name = f"order:{sort_by}:{bool(ascending)}"
+        builds = {name: lambda frame: _sort_order(frame, sort_by, ascending)} if sort_by is not None else {}
+        df, positions, structures = self._select(table, query, filters, **builds)
+        if sort_by is not None and len(df):
+            positions = _restrict(structures[name], positions, len(df))
+        total = len(df) if positions is None else len(positions)
+        start = max(0, int(page)) * page_size
+        window = np.arange(start, min(start + page_size, total)) if positions is None else positions[start:start + page_size]
+        return df.take(window), total
+
+    def scan_rows(self, table, after=None, limit=100, filters=None):
+        """Up to limit rows with id greater than after, in id order; gives (rows, last id or None if done).
+
+        Keyset pagination: pass the returned id back as after for the next
+        page. Pages stay consistent while rows are added or removed elsewhere.
+        """
+        name = "order:id:True"
+        df, positions, structures = self._select(table, "", filters, **{name: lambda frame: _sort_order(frame, "id", True)})
+        if not len(df):
+            return df, None
+        order = _restrict(structures[name], positions, len(df))
+        ids = df['id'].to_numpy()[order]
+        start = int(np.searchsorted(ids, after, side="right")) if after is not None else 0
+        window = order[start:start + limit]
+        last = int(ids[start + limit - 1]) if start + limit < len(order) else None
+        return df.take(window), last
+
+    def export_chunks(self, view, after=None, start=None, end=None, chunk_rows=CHUNK_ROWS):
+        """Yield the rows of an export view in id order as DataFrame chunks.
+
+        Rows are read from storage a chunk at a time by id, all from one
+        version of the base table, so memory is bounded by the chunk size
+        rather than the table; joined columns are looked up per chunk. Rows
+        with id up to after are skipped, so an interrupted export resumes
+        from the last id received; start and end bound the table's date
+        column by calendar day, inclusive. The first chunk is small so the
+        caller can start sending straight away.
+        """
+        spec = EXPORT_VIEWS.get(view)
+        if spec is None:
+            raise ValueError(f"Unknown export view: {view}")
+        table = spec["table"]
+        lower = pd.Timestamp(start) if start is not None else None
+        upper = pd.Timestamp(end) + pd.Timedelta(days=1) if end is not None else None
+        chunks = self.storage.read_chunks(
+            table, after=after, chunk_rows=chunk_rows, first_rows=min(EXPORT_FIRST_ROWS, chunk_rows),
+            parse_dates=DATE_COLUMNS[table],
+        )
+        for chunk in chunks:
+            date_col = next((col for col in DATE_COLUMNS[table] if col in chunk.columns), None)
+            if date_col is not None and (lower is not None or upper is not None):
+                dates = chunk[date_col]
+                keep = dates.notna()
+                if lower is not None:
+                    keep &= dates >= lower
+                if upper is not None:
+                    keep &= dates < upper
+                chunk = chunk[keep].reset_index(drop=True)
+            if "join" in spec and len(chunk):
+                other, foreign_key, columns = spec["join"]
+                keys = chunk[foreign_key].dropna() if foreign_key in chunk.columns else pd.Series(dtype=float)
+                joined = self.storage.read_rows(other, keys.astype("int64").tolist(), parse_dates=DATE_COLUMNS[other])
+                chunk = _join_columns(chunk, joined, foreign_key, columns)
+            if len(chunk):
+                yield chunk
+
+    def follow_up_deadlines(self, start, end, rules=None):
+        """Candidates with a follow-up deadline between start and end (inclusive), soonest first.
+
+        rules maps status to SLA days (see deadlines.SLA_RULES); defaults
+        come from FOLLOW_UP_SLA. Each rule set keeps its own sorted deadline
+        index with the cached table, updated on every write.
+        """
+        rules = sla_rules_from_env() if rules is None else rules
+        name = "deadlines:" + repr(sorted(rules.items()))
+        df, structures = self._view(
+            "candidates", key_index=KeyIndex, **{name: lambda frame: DeadlineIndex(frame, rules)}
+        )
+        ids, deadlines = structures[name].between(start, end)
+        due = df.take([structures["key_index"].locate(row_id) for row_id in ids.tolist()]).reset_index(drop=True)
+        due["follow_up_deadline"] = deadlines
+        return due
+
+    def interview_conflicts(self, interviewer, start, end, exclude_id=None):
+        """Interviews of the interviewer overlapping [start, end), by start; exclude_id skips the one being edited"""
+        df, structures = self._view("interviews", key_index=KeyIndex, schedule=ScheduleIndex)
+        ids, _, _ = structures["schedule"].overlapping(interviewer, start, end, exclude_id)
+        return df.take([structures["key_index"].locate(row_id) for row_id in ids.tolist()]).reset_index(drop=True)
+
+    def free_interview_slots(self, interviewer, after, minutes=DEFAULT_INTERVIEW_MINUTES, limit=5, exclude_id=None):
+        """Up to limit free (start, end) slots for the interviewer in working hours, from after onwards"""
+        _, structures = self._view("interviews", schedule=ScheduleIndex)
+        return structures["schedule"].free_slots(interviewer, after, minutes, limit, exclude_id)
+
+    def interviewer_workload(self, start, end):
+        """Interview count and booked hours per interviewer within [start, end)"""
+        _, structures = self._view("interviews", schedule=ScheduleIndex)
+        return structures["schedule"].workload(start, end)
+
+    def rows_by_id(self, table, ids):
+        """Current rows with the given ids, in the order given; ids no longer present are skipped"""
+        df, structures = self._view(table, key_index=KeyIndex)
+        positions = [pos for pos in map(structures["key_index"].locate, ids) if pos is not None]
+        return df.take(positions).reset_index(drop=True)
+
+    def _select(self, table, query, filters, columns=None, **builds):
+        """(read-only table view, matching row positions or None for all rows, derived structures)"""
+        active = _active_filters(table, filters or {})
+        searching = bool(str(query).strip())
+        builds["bitmaps"] = self._bitmap_builder(table)
+        if searching:
+            builds["search"] = lambda frame: SubstringIndex(frame, SEARCH_COLUMNS[table])
+            builds["key_index"] = KeyIndex
+        df, structures = self._view(table, **builds)
+        if not len(df) or (not active and not searching):
+            return df, None, structures
+        if not searching:
+            return df, structures["bitmaps"].positions(active), structures
+        ids = structures["search"].search(query, columns)
+        positions = np.array([structures["key_index"].locate(row_id) for row_id in ids], dtype=np.int64)
+        if active and len(positions):
+            positions = positions[structures["bitmaps"].mask(active)[positions]]
+        return df, positions, structures
+
+    def search_text(self, table, query, limit=50):
+        """BM25-ranked rows whose free-text column matches query, with score and snippet columns.
+
+        Bare terms are ranked by relevance; "quoted phrases" must all appear.
+        Snippets are HTML-escaped with matches wrapped in <mark>.
+        """
+        column = FULL_TEXT_COLUMNS.get(table)
+        if column is None:
+            raise ValueError(f"{table} has no full-text column")
+        df, structures = self._view(
+            table, fulltext=lambda frame: FullTextIndex(frame, column), key_index=KeyIndex,
+        )
+        hits = structures["fulltext"].search(query, limit) if len(df) else []
+        positions = [structures["key_index"].locate(row_id) for row_id, _ in hits]
+        results = df.take(positions).reset_index(drop=True)
+        results["score"] = [score for _, score in hits]
+        results["snippet"] = [highlight(text, query) for text in results[column].tolist()] if hits else []
+        return results
+
+    def fingerprint(self, table, filters=None):
+        """Cheap key for what filter_rows(table, filters) returns, for caching derived output like figures"""
+        active = _active_filters(table, filters or {})
+        return (
+            self.storage.identity,
+            table,
+            self.storage.table_version(table),
+            tuple(sorted((col, repr(value)) for col, value in active.items())),
+        )
+
+    def _view(self, table, **builds):
+        """Read-only view of a cached table with derived structures from the same version"""
+        version = self.storage.table_version(table)
+        if version is None:
+            return pd.DataFrame(), {name: build(pd.DataFrame()) for name, build in builds.items()}
+        return frame_cache.view((self.storage.identity, table), version, self._loader(table), builds)
+
+    @staticmethod
+    def _bitmap_builder(table):
+        return lambda frame: BitmapIndex(frame, CATEGORICAL_COLUMNS[table])
+
+    def _key_index(self, table):
+        return self._derived(table, "key_index", KeyIndex)
+
+    def _save(self, table, df):
+        df = df.copy()
+        for col in DATE_COLUMNS[table]:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+        df = self._assign_ids(table, df)
+        duplicated = df['id'][df['id'].duplicated()]
+        if len(duplicated):
+            raise ValueError(f"Duplicate ids in {table}: {sorted(set(duplicated.tolist()))[:10]}")
+        self.storage.write_table(table, df)
+        frame_cache.invalidate((self.storage.identity, table))
+
+    def _assign_ids(self, table, df):
+        """Fill missing ids from the table's sequence"""
+        if 'id' not in df.columns:
+            df.insert(0, 'id', None)
+        missing = df['id'].isna()
+        if missing.any():
+            df['id'] = df['id'].astype(object)
+            first = self.storage.allocate_ids(table, int(missing.sum()))
+            df.loc[missing, 'id'] = range(first, first + int(missing.sum()))
+        df['id'] = df['id'].astype("int64")
+        return df
+
+    def table_version(self, table):
+        """Current version of a table; pass it back as expected_version to reject edits made on stale data"""
+        return self.storage.table_version(table)
+
+    def _log(self, table, entries):
+        """Queue row changes in the open transaction, or write them right away"""
+        if self._pending is not None:
+            self._pending.setdefault(table, []).extend(entries)
+        else:
+            self._commit({table: entries})
+
+    def _commit(self, changes, expected_versions=None):
+        """Append row changes to the write logs in one storage transaction and patch cached frames"""
+        changes = {table: entries for table, entries in changes.items() if entries}
+        if not changes:
+            return
+        versions = self.storage.append_journals(changes, expected_versions)
+        for table, entries in changes.items():
+            frame_cache.apply(
+                (self.storage.identity, table),
+                versions[table] - 1,
+                versions[table],
+                _journal_patch(table, entries, self._register_values(table, entries)),
+                changes=entries,
+            )
+
+    @contextmanager
+    def transaction(self, expected_versions=None):
+        """Group mutations made on this handler and commit them together on exit.
+
+        Nothing is written if the block raises. Nested calls join the outer
+        transaction. expected_versions ({table: version from table_version})
+        makes the commit raise StaleVersionError, writing nothing, if any of
+        those tables changed in the meantime.
+        """
+        expected = {table: version for table, version in (expected_versions or {}).items() if version is not None}
+        if self._pending is not None:
+            for table, version in expected.items():
+                self._expected.setdefault(table, version)
+            yield self
+            return
+        self._pending, self._expected = {}, expected
+        try:
+            yield self
+            pending, expected = self._pending, self._expected
+        finally:
+            self._pending = self._expected = None
+        self._commit(pending, expected)
+
+    def _existing_ids(self, table, ids):
+        """Return the subset of ids present in the table, counting the open transaction"""
+        index = self._key_index(table)
+        present = {int(row_id) for row_id in ids if row_id in index}
+        for op, row_id, _ in (self._pending or {}).get(table, []):
+            if op == "insert":
+                present.add(int(row_id))
+            elif op == "delete":
+                present.discard(int(row_id))
+        return present
+
+    def _get(self, table, row_id):
+        pos = self._key_index(table).locate(row_id)
+        df = self._load(table)
+        if pos is None or pos >= len(df) or df['id'].iat[pos] != int(row_id):
+            return None
+        return df.iloc[pos].to_dict()
+
+    def insert_many(self, table, rows):
+        """Insert a DataFrame or list of dicts in one write; returns the new ids"""
+        records = _records(rows)
+        if not records:
+            return []
+        first = self.storage.allocate_ids(table, len(records))
+        ids = list(range(first, first + len(records)))
+        for row_id, record in zip(ids, records):
+            record['id'] = row_id
+        self._log(table, [("insert", row_id, record) for row_id, record in zip(ids, records)])
+        return ids
+
+    def update_many(self, table, updates):
+        """Apply {id: fields} or a DataFrame with an id column in one write; returns rows updated"""
+        if isinstance(updates, pd.DataFrame):
+            updates = {record.pop('id'): record for record in _records(updates)}
+        present = self._existing_ids(table, updates)
+        entries = [
+            ("update", int(row_id), {key: value for key, value in fields.items() if key != 'id'})
+            for row_id, fields in updates.items()
+            if int(row_id) in present
+        ]
+        self._log(table, entries)
+        return len(entries)
+
+    def upsert_many(self, table, rows):
+        """Update rows whose id exists and insert the rest in one write"""
+        records = _records(rows)
+        ids = [record.get('id') for record in records if pd.notna(record.get('id'))]
+        present = self._existing_ids(table, ids)
+        updates, inserts, explicit = {}, [], []
+        for record in records:
+            row_id = record.get('id')
+            if pd.isna(row_id):
+                record.pop('id', None)
+                inserts.append(record)
+            elif int(row_id) in present:
+                updates[int(row_id)] = record
+            else:
+                record['id'] = int(row_id)
+                explicit.append(record)
+        with self.transaction():
+            self.update_many(table, updates)
+            self.insert_many(table, inserts)
+            self._log(table, [("insert", record['id'], record) for record in explicit])
+        return {"inserted": len(inserts) + len(explicit), "updated": len(updates)}
+
+    def delete_many(self, table, ids):
+        """Delete rows by id in one write; returns rows deleted"""
+        present = self._existing_ids(table, ids)
+        entries = [("delete", row_id, None) for row_id in dict.fromkeys(int(i) for i in ids) if row_id in present]
+        self._log(table, entries)
+        return len(entries)
+
     def load_all_data(self):
-        """Load all data from Excel files"""
+        """Load all data from storage"""
         return {
             "candidates": self.load_candidates(),
             "interviews": self.load_interviews(),
@@ -20,98 +553,179 @@ class DataHandler:
     
     def load_candidates(self):
         """Load candidates data"""
-        if self.candidates_file.exists():
-            df = pd.read_excel(self.candidates_file)
-            df['applied_date'] = pd.to_datetime(df['applied_date'])
-            return df
-        return pd.DataFrame()
+        return self._load("candidates")
     
     def load_interviews(self):
         """Load interviews data"""
-        if self.interviews_file.exists():
-            df = pd.read_excel(self.interviews_file)
-            df['date'] = pd.to_datetime(df['date'])
-            return df
-        return pd.DataFrame()
+        return self._load("interviews")
     
     def load_clients(self):
         """Load clients data"""
-        if self.clients_file.exists():
-            return pd.read_excel(self.clients_file)
-        return pd.DataFrame()
+        return self._load("clients")
     
     def save_candidates(self, df):
         """Save candidates data"""
-        df.to_excel(self.candidates_file, index=False)
+        self._save("candidates", df)
     
     def save_interviews(self, df):
         """Save interviews data"""
-        df.to_excel(self.interviews_file, index=False)
+        self._save("interviews", df)
     
     def save_clients(self, df):
         """Save clients data"""
-        df.to_excel(self.clients_file, index=False)
+        self._save("clients", df)
+
+    def compact(self):
+        """Fold pending write-log entries into the base tables"""
+        for table in DATE_COLUMNS:
+            self.storage.compact(table)
     
     def add_candidate(self, candidate_data):
         """Add a new candidate"""
-        df = self.load_candidates()
-        new_id = len(df) + 1 if len(df) > 0 else 1
+        new_id = self.insert_many("candidates", [candidate_data])[0]
         candidate_data['id'] = new_id
-        df = pd.concat([df, pd.DataFrame([candidate_data])], ignore_index=True)
-        self.save_candidates(df)
         return new_id
     
-    def update_candidate(self, candidate_id, updated_data):
-        """Update candidate information"""
-        df = self.load_candidates()
-        idx = df.index[df['id'] == candidate_id].tolist()
-        if idx:
-            for key, value in updated_data.items():
-                df.at[idx[0], key] = value
-            self.save_candidates(df)
-            return True
-        return False
+    def update_candidate(self, candidate_id, updated_data, expected_version=None):
+        """Update candidate information; raises StaleVersionError if expected_version is no longer current"""
+        with self.transaction({"candidates": expected_version}):
+            return self.update_many("candidates", {candidate_id: updated_data}) == 1
+
+    def get_candidate(self, candidate_id):
+        """Return a candidate row as a dict, or None if the id does not exist"""
+        return self._get("candidates", candidate_id)
+
+    def delete_candidate(self, candidate_id, expected_version=None):
+        """Delete a candidate by id; raises StaleVersionError if expected_version is no longer current"""
+        with self.transaction({"candidates": expected_version}):
+            return self.delete_many("candidates", [candidate_id]) == 1
     
     def add_interview(self, interview_data):
         """Schedule a new interview"""
-        df = self.load_interviews()
-        new_id = len(df) + 1 if len(df) > 0 else 1
+        new_id = self.insert_many("interviews", [interview_data])[0]
         interview_data['id'] = new_id
-        df = pd.concat([df, pd.DataFrame([interview_data])], ignore_index=True)
-        self.save_interviews(df)
         return new_id
     
-    def update_interview(self, interview_id, updated_data):
-        """Update interview information"""
-        df = self.load_interviews()
-        idx = df.index[df['id'] == interview_id].tolist()
-        if idx:
-            for key, value in updated_data.items():
-                df.at[idx[0], key] = value
-            self.save_interviews(df)
-            return True
-        return False
+    def update_interview(self, interview_id, updated_data, expected_version=None):
+        """Update interview information; raises StaleVersionError if expected_version is no longer current"""
+        with self.transaction({"interviews": expected_version}):
+            return self.update_many("interviews", {interview_id: updated_data}) == 1
+
+    def get_interview(self, interview_id):
+        """Return a interview row as a dict, or None if the id does not exist"""
+        return self._get("interviews", interview_id)
+
+    def delete_interview(self, interview_id, expected_version=None):
+        """Delete a interview by id; raises StaleVersionError if expected_version is no longer current"""
+        with self.transaction({"interviews": expected_version}):
+            return self.delete_many("interviews", [interview_id]) == 1
     
-    def get_recruitment_metrics(self):
-        """Calculate recruitment metrics"""
-        candidates_df = self.load_candidates()
-        interviews_df = self.load_interviews()
-        
-        total_candidates = len(candidates_df)
-        recent_candidates = len(candidates_df[
-            candidates_df['applied_date'] > (datetime.now() - pd.Timedelta(days=30))
-        ])
-        open_positions = len(candidates_df[candidates_df['status'] == 'Open']['position'].unique())
-        active_interviews = len(interviews_df[interviews_df['status'] == 'Scheduled'])
-        success_rate = (
-            len(candidates_df[candidates_df['status'] == 'Hired']) / total_candidates * 100
-            if total_candidates > 0 else 0
+    def add_client(self, client_data):
+        """Add a new client"""
+        return self.insert_many("clients", [client_data])[0]
+
+    def get_recruitment_metrics(self, data=None):
+        """Calculate recruitment metrics.
+
+        Served from the candidate cube and interview summary maintained on
+        every write; pass frames already loaded as data to compute over those
+        instead.
+        """
+        if data is not None:
+            return compute_recruitment_metrics(data['candidates'], data['interviews'])
+        return recruitment_metrics(self.candidate_cube(), self._derived("interviews", "summary", InterviewSummary))
+
+    def candidate_cube(self, filters=None):
+        """Candidate counts by client/status/position/week, optionally sliced by the categorical filters"""
+        cube = self._derived("candidates", "cube", CandidateCube)
+        return cube.slice(_active_filters("candidates", filters)) if filters else cube
+
+
+def _journal_patch(table, entries, dictionaries):
+    """Cache update applying journal entries to a cached frame, locating rows through its key index"""
+    def update(df, derived):
+        locate = getattr(derived.get("key_index"), "locate", None)
+        frame = encode_categoricals(
+            parse_date_columns(apply_journal(df, entries, locate=locate), DATE_COLUMNS[table]), dictionaries
         )
-        
-        return {
-            'total_candidates': total_candidates,
-            'recent_candidates': recent_candidates,
-            'open_positions': open_positions,
-            'active_interviews': active_interviews,
-            'success_rate': success_rate
-        }
+        if locate is not None:
+            locate_changed_rows(df, frame, entries, locate)
+        return frame
+    return update
+
+
+def _active_filters(table, filters):
+    active = {col: value for col, value in filters.items() if value is not None}
+    unknown = set(active) - set(CATEGORICAL_COLUMNS[table])
+    if unknown:
+        raise ValueError(f"Not a filterable column of {table}: {', '.join(sorted(unknown))}")
+    return active
+
+
+def _restrict(order, positions, rows):
+    """Keep the entries of a sort order that are among positions (None keeps all)"""
+    if positions is None:
+        return order
+    selected = np.zeros(rows, dtype=bool)
+    selected[positions] = True
+    return order[selected[order]]
+
+
+def _sort_order(df, column, ascending):
+    """Row positions of df sorted on column (stable, missing values last)"""
+    if not len(df):
+        return np.array([], dtype=np.int64)
+    if column not in df.columns:
+        raise ValueError(f"Unknown sort column: {column}")
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Dictionary codes follow insertion order; rank categories by value instead
+        ranks = np.argsort(np.argsort(values.cat.categories.to_numpy(dtype=object)))
+        codes = values.cat.codes.to_numpy()
+        values = pd.Series(np.where(codes >= 0, ranks[codes], np.nan))
+    ordered = values.reset_index(drop=True).sort_values(ascending=ascending, kind="stable", na_position="last")
+    return ordered.index.to_numpy()
+
+
+def _join_columns(chunk, other, foreign_key, columns):
+    """Left-join columns of other onto chunk through foreign_key, matching other's id"""
+    keys = chunk[foreign_key] if foreign_key in chunk.columns else pd.Series(np.nan, index=chunk.index)
+    lookup = other.set_index("id") if "id" in other.columns else pd.DataFrame(index=pd.Index([], dtype="int64"))
+    joined = chunk.copy()
+    for col, name in columns.items():
+        # Chunk columns win over joined ones with the same name
+        if name not in joined.columns:
+            values = lookup[col] if col in lookup.columns else pd.Series(np.nan, index=lookup.index)
+            joined[name] = keys.map(values)
+    return joined
+
+
+def _records(rows):
+    """Normalize a DataFrame or iterable of dicts to a list of fresh dicts"""
+    if isinstance(rows, pd.DataFrame):
+        return rows.to_dict("records")
+    return [dict(row) for row in rows]
+
+
+def _column_options(df, column):
+    if column not in df.columns:
+        return []
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Categories still referenced by a row, found from the integer codes
+        used = np.bincount(values.cat.codes.to_numpy() + 1, minlength=len(values.cat.categories) + 1)[1:] > 0
+        return sorted(values.cat.categories[used].tolist())
+    return sorted(values.dropna().unique().tolist())
+
+
+def _to_xlsx(df):
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _date_bounds(df, column):
+    if column not in df.columns:
+        return None
+    dates = pd.to_datetime(df[column], errors="coerce")
+    return (dates.min().date(), dates.max().date()) if dates.notna().any() else None
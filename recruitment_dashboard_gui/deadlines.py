@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from indexes import changed_rows
+
+# Follow-up SLA in days after applied_date, per candidate status. "*" covers
+# statuses not listed (and candidates without one); None means no follow-up.
+SLA_RULES = {"*": 14, "Hired": None, "Rejected": None}
+
+
+# PUBLIC_INTERFACE
+def sla_rules_from_env(default=SLA_RULES):
+    """SLA rules with overrides from FOLLOW_UP_SLA, e.g. "*=14,In Progress=7,Hired=" (empty: no follow-up)"""
+    rules = dict(default)
+    for item in os.getenv("FOLLOW_UP_SLA", "").split(","):
+        status, sep, days = item.partition("=")
+        if sep and status.strip():
+            rules[status.strip()] = int(days) if days.strip() else None
+    return rules
+
+
+# PUBLIC_INTERFACE
+class DeadlineIndex:
+    """Follow-up deadlines of a cached candidates frame, kept sorted for range lookups.
+
+    Deadlines and ids live in two aligned arrays ordered by deadline, so a
+    window is found with two binary searches. Updates build new arrays with
+    the touched ids removed and their new deadlines merged in at their
+    sorted positions, without re-sorting the rest.
+    """
+
+    def __init__(self, frame, rules=SLA_RULES, key="id"):
+        self.rules = dict(rules)
+        self.key = key
+        ids, deadlines = _deadlines(frame, self.rules, key)
+        order = np.argsort(deadlines, kind="stable")
+        self.ids, self.deadlines = ids[order], deadlines[order]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def between(self, start, end):
+        """(ids, deadlines) with start <= deadline <= end, soonest first"""
+        lo = np.searchsorted(self.deadlines, np.datetime64(pd.Timestamp(start), "ns"), side="left")
+        hi = np.searchsorted(self.deadlines, np.datetime64(pd.Timestamp(end), "ns"), side="right")
+        return self.ids[lo:hi], self.deadlines[lo:hi]
+
+    def update(self, frame, changes, previous):
+        _, new = changed_rows(previous, frame, changes, self.key)
+        keep = ~np.isin(self.ids, [int(row_id) for _, row_id, _ in changes])
+        ids, deadlines = self.ids[keep], self.deadlines[keep]
+        new_ids, new_deadlines = _deadlines(new, self.rules, self.key)
+        order = np.argsort(new_deadlines, kind="stable")
+        new_ids, new_deadlines = new_ids[order], new_deadlines[order]
+        positions = np.searchsorted(deadlines, new_deadlines, side="right")
+        index = DeadlineIndex.__new__(DeadlineIndex)
+        index.rules, index.key = self.rules, self.key
+        index.ids = np.insert(ids, positions, new_ids)
+        index.deadlines = np.insert(deadlines, positions, new_deadlines)
+        return index
+
+
+def _deadlines(frame, rules, key):
+    """(ids, deadlines) of rows that have a follow-up deadline under the rules"""
+    if not len(frame) or key not in frame.columns or "applied_date" not in frame.columns:
+        return np.array([], dtype=np.int64), np.array([], dtype="datetime64[ns]")
+    applied = pd.to_datetime(frame["applied_date"], errors="coerce").to_numpy(dtype="datetime64[ns]")
+    default = rules.get("*")
+    if "status" in frame.columns:
+        # One rule lookup per distinct status, then a vectorized gather by code
+        status = frame["status"].astype("category")
+        days_by_code = np.array(
+            [np.nan if days is None else days for days in (rules.get(s, default) for s in status.cat.categories)],
+            dtype=float,
+        )
+        codes = status.cat.codes.to_numpy()
+        days = np.where(codes >= 0, days_by_code[np.maximum(codes, 0)] if len(days_by_code) else np.nan,
+                        np.nan if default is None else default)
+    else:
+        days = np.full(len(frame), np.nan if default is None else default, dtype=float)
+    valid = ~np.isnat(applied) & ~np.isnan(days)
+    deadlines = applied[valid] + (days[valid] * 86400).astype("timedelta64[s]")
+    return frame[key].to_numpy(dtype=np.int64)[valid], deadlines.astype("datetime64[ns]")
@@ -0,0 +1,87 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+
+
+# PUBLIC_INTERFACE
+class FigureCache:
+    """Process-wide LRU cache of serialized Plotly figures shared by every Streamlit session.
+
+    Entries are keyed on the chart, its styling and a fingerprint of the data
+    it was drawn from, and hold the figure's JSON so a hit skips both the
+    aggregation and the Plotly build. Hits are rebuilt without re-validating
+    the spec, and each caller gets its own Figure object.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    def get_or_build(self, key, build):
+        """Return the cached figure for key, calling build() (which may return None) on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                spec = self._entries[key]
+                return go.Figure(json.loads(spec), _validate=False) if spec is not None else None
+            self.misses += 1
+        fig = build()
+        self.put(key, fig.to_json() if fig is not None else None)
+        return fig
+
+    def put(self, key, spec):
+        """Store a serialized figure (or None for "no chart"), evicting least recently used entries"""
+        nbytes = len(spec) if spec is not None else 0
+        with self._lock:
+            self._discard(key)
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = spec
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and memory usage"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _discard(self, key):
+        if key in self._entries:
+            spec = self._entries.pop(key)
+            self._bytes -= len(spec) if spec is not None else 0
+
+
+# PUBLIC_INTERFACE
+def frame_fingerprint(df, columns):
+    """Order-independent content hash of the given columns, for frames without a known version"""
+    columns = tuple(col for col in columns if col in df.columns)
+    if not len(df) or not columns:
+        return (len(df), columns)
+    # Row hashes summed with uint64 wrap-around: equal for any row order, unlike XOR it keeps duplicates
+    hashes = pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy()
+    return (len(df), columns, int(hashes.sum()))
+
+
+figure_cache = FigureCache(max_bytes=int(os.getenv("FIGURE_CACHE_MAX_MB", "64")) * 1024 * 1024)
@@ -0,0 +1,268 @@
+import threading
+from collections.abc import MutableMapping
+from itertools import chain
+from math import isqrt
+
+import numpy as np
+import pandas as pd
+
+
+# PUBLIC_INTERFACE
+class ChunkedMap(MutableMapping):
+    """Dict split into about sqrt(n) hash chunks whose copies share every chunk they have not written.
+
+    copy() costs O(sqrt n) and leaves both maps reading the same chunks; the
+    first write to a chunk on either side copies just that chunk. Derived
+    structures keep their large maps in one so an update touching a few keys
+    costs O(sqrt n) rather than a copy of the whole map.
+    """
+
+    def __init__(self, items=()):
+        self._rechunk(dict(items))
+
+    def _rechunk(self, items):
+        count = _chunk_count(len(items))
+        chunks = [{} for _ in range(count)]
+        for key, value in items.items():
+            chunks[hash(key) & (count - 1)][key] = value
+        self._chunks, self._owned, self._len = chunks, set(range(count)), len(items)
+        # Chunk count stays within 4x of sqrt(n) either way before it is redone
+        self._grow_at, self._shrink_at = 16 * count * count, count * count // 16
+
+    def _own(self, key):
+        """The chunk holding key, copied first if another map may still read it"""
+        pos = hash(key) & (len(self._chunks) - 1)
+        if pos not in self._owned:
+            self._chunks[pos] = dict(self._chunks[pos])
+            self._owned.add(pos)
+        return self._chunks[pos]
+
+    # Reads index the chunk inline: they sit on search and lookup hot paths
+    def __getitem__(self, key):
+        chunks = self._chunks
+        return chunks[hash(key) & (len(chunks) - 1)][key]
+
+    def get(self, key, default=None):
+        chunks = self._chunks
+        return chunks[hash(key) & (len(chunks) - 1)].get(key, default)
+
+    def __contains__(self, key):
+        chunks = self._chunks
+        return key in chunks[hash(key) & (len(chunks) - 1)]
+
+    def __setitem__(self, key, value):
+        chunk = self._own(key)
+        if key not in chunk:
+            self._len += 1
+        chunk[key] = value
+        if self._len > self._grow_at:
+            self._rechunk(self._merged())
+
+    def __delitem__(self, key):
+        del self._own(key)[key]
+        self._len -= 1
+        if self._len < self._shrink_at:
+            self._rechunk(self._merged())
+
+    def __iter__(self):
+        return chain.from_iterable(self._chunks)
+
+    def __len__(self):
+        return self._len
+
+    def _merged(self):
+        return {key: value for chunk in self._chunks for key, value in chunk.items()}
+
+    def copy(self):
+        """A map with the same contents; neither side's later writes show in the other"""
+        clone = ChunkedMap.__new__(ChunkedMap)
+        clone._chunks, clone._owned, clone._len = list(self._chunks), set(), self._len
+        clone._grow_at, clone._shrink_at = self._grow_at, self._shrink_at
+        self._owned = set()
+        return clone
+
+
+def _chunk_count(size):
+    """Largest power of two not above sqrt(size)"""
+    return 1 << max(0, isqrt(size).bit_length() - 1)
+
+
+# PUBLIC_INTERFACE
+class KeyIndex:
+    """Hash index from primary key to row position in a cached table frame."""
+
+    def __init__(self, frame, key="id"):
+        self.key = key
+        ids = frame[key].tolist() if key in frame.columns else []
+        self.positions = ChunkedMap((int(row_id), pos) for pos, row_id in enumerate(ids))
+
+    def locate(self, row_id):
+        """Return the row position for an id, or None if it does not exist"""
+        return self.positions.get(int(row_id))
+
+    def __contains__(self, row_id):
+        return int(row_id) in self.positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def update(self, frame, changes, previous):
+        """Carry the index over a journal patch into a copy sharing the untouched chunks of the id map"""
+        if any(op == "delete" for op, _, _ in changes):
+            return None  # positions shifted, rebuild on next use
+        index = KeyIndex.__new__(KeyIndex)
+        index.key = self.key
+        index.positions = self.positions.copy()
+        start = len(self.positions)
+        for pos, row_id in enumerate(frame[self.key].iloc[start:].tolist(), start):
+            index.positions[int(row_id)] = pos
+        return index
+
+
+# Rows touched by the latest patch on this thread, shared by every structure
+# updated from it: (previous frame, patched frame, changes, key, (old rows, new rows)).
+# Per thread, since the frame cache is shared by every session's script thread.
+_last_changed = threading.local()
+
+
+# PUBLIC_INTERFACE
+def changed_rows(previous, frame, changes, key="id"):
+    """Return (old rows, new rows) touched by a journal patch, for incremental structures"""
+    last = getattr(_last_changed, "value", None)
+    if last is not None and last[0] is previous and last[1] is frame and last[2] is changes and last[3] == key:
+        return last[4]
+    ids = {int(row_id) for _, row_id, _ in changes}
+    old = previous[previous[key].isin(ids)] if key in previous.columns else previous.iloc[:0]
+    new = frame[frame[key].isin(ids)] if key in frame.columns else frame.iloc[:0]
+    _remember(previous, frame, changes, key, old, new)
+    return old, new
+
+
+# PUBLIC_INTERFACE
+def locate_changed_rows(previous, frame, changes, locate, key="id"):
+    """Find the rows a patch touched through locate (e.g. KeyIndex.locate) instead of scanning the key column.
+
+    Works when the patch kept row positions and appended its inserts, as
+    apply_journal does without deletes; the lookup is then remembered for
+    changed_rows. Returns False (leaving changed_rows to scan) otherwise.
+    """
+    ids = list(dict.fromkeys(int(row_id) for _, row_id, _ in changes))
+    if key not in previous.columns or key not in frame.columns:
+        return False
+    before, after = previous[key].to_numpy(), frame[key].to_numpy()
+    positions, appended = [], []
+    for row_id in ids:
+        pos = locate(row_id)
+        if pos is not None and pos < len(before) and before[pos] == row_id:
+            positions.append(pos)
+        else:
+            appended.append(row_id)
+    if len(after) != len(before) + len(appended) or sorted(after[len(before):].tolist()) != sorted(appended):
+        return False
+    if any(after[pos] != before[pos] for pos in positions):
+        return False
+    old = previous.take(positions)
+    new = frame.take(positions + list(range(len(before), len(after))))
+    _remember(previous, frame, changes, key, old, new)
+    return True
+
+
+def _remember(previous, frame, changes, key, old, new):
+    _last_changed.value = (previous, frame, changes, key, (old, new))
+
+
+# PUBLIC_INTERFACE
+class BitmapIndex:
+    """One packed bitmap per distinct value of each filterable column.
+
+    Any combination of equality (or membership) filters is answered by
+    OR-ing the bitmaps of a column's selected values and AND-ing across
+    columns, then unpacking the result to row positions. Bitmaps are never
+    modified in place; an update copies only the bitmaps it touches, to the
+    new table length, and leaves the others short. A bitmap may be shorter
+    than the table, in which case missing bits are zero.
+    """
+
+    def __init__(self, frame, columns):
+        self.rows = len(frame)
+        self.bitmaps = {col: _build_bitmaps(frame[col]) for col in columns if col in frame.columns}
+
+    def mask(self, filters):
+        """Boolean row mask for {column: value or list of values}; None values are ignored"""
+        nbytes = _nbytes(self.rows)
+        combined = None
+        for col, wanted in filters.items():
+            if wanted is None:
+                continue
+            values = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            bitmaps = self.bitmaps.get(col, {})
+            selected = np.zeros(nbytes, dtype=np.uint8)
+            for value in values:
+                if value in bitmaps:
+                    selected |= _fit(bitmaps[value], nbytes)
+            combined = selected if combined is None else combined & selected
+        if combined is None:
+            return np.ones(self.rows, dtype=bool)
+        return np.unpackbits(combined, count=self.rows).astype(bool)
+
+    def positions(self, filters):
+        """Row positions matching the filters, in table order"""
+        return np.flatnonzero(self.mask(filters))
+
+    def update(self, frame, changes, previous):
+        if any(op == "delete" for op, _, _ in changes) or len(frame) < self.rows:
+            return None  # positions shifted, rebuild on next use
+        index = BitmapIndex.__new__(BitmapIndex)
+        index.rows = len(frame)
+        index.bitmaps = {col: dict(bitmaps) for col, bitmaps in self.bitmaps.items()}
+        _, new = changed_rows(previous, frame, changes)
+        # Cached frames carry a default RangeIndex, so the changed rows' labels are their positions
+        touched = new.index.to_numpy()
+        nbytes = _nbytes(index.rows)
+        for col, bitmaps in index.bitmaps.items():
+            values = new[col].to_numpy(dtype=object)
+            copied = set()
+            for pos, value in zip(touched.tolist(), values):
+                byte, bit = pos >> 3, np.uint8(128 >> (pos & 7))
+                for other, bitmap in list(bitmaps.items()):
+                    if byte < len(bitmap) and bitmap[byte] & bit and other != value:
+                        bitmaps[other] = bitmap = _copy_once(bitmaps, other, copied, nbytes)
+                        bitmap[byte] &= ~bit
+                if not pd.isna(value):
+                    bitmap = bitmaps.get(value)
+                    if bitmap is None or byte >= len(bitmap) or not bitmap[byte] & bit:
+                        bitmap = _copy_once(bitmaps, value, copied, nbytes)
+                        bitmap[byte] |= bit
+        return index
+
+
+def _build_bitmaps(column):
+    codes, uniques = pd.factorize(column, use_na_sentinel=True)
+    nbytes = _nbytes(len(codes))
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    bitmaps = {}
+    for code, value in enumerate(uniques):
+        rows = order[bounds[code]:bounds[code + 1]]
+        bitmap = np.zeros(nbytes, dtype=np.uint8)
+        np.bitwise_or.at(bitmap, rows >> 3, (128 >> (rows & 7)).astype(np.uint8))
+        bitmaps[value] = bitmap
+    return bitmaps
+
+
+def _copy_once(bitmaps, value, copied, nbytes):
+    """Private, full-length copy of a value's bitmap, made once per update"""
+    if value not in copied:
+        bitmaps[value] = _fit(bitmaps.get(value, np.zeros(0, dtype=np.uint8)), nbytes).copy()
+        copied.add(value)
+    return bitmaps[value]
+
+
+def _fit(bitmap, nbytes):
+    if len(bitmap) >= nbytes:
+        return bitmap[:nbytes]
+    return np.concatenate([bitmap, np.zeros(nbytes - len(bitmap), dtype=np.uint8)])
+
+
+def _nbytes(rows):
+    return (rows + 7) // 8
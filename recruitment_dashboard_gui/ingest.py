@@ -0,0 +1,201 @@
+from zipfile import BadZipFile
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+CHUNK_ROWS = 5000
+
+# Upload schema per table: columns that must be present and non-empty,
+# columns coerced to nullable integers, and the natural key used to match
+# re-uploaded rows that carry no id. Date columns come from the caller.
+SCHEMAS = {
+    "candidates": {
+        "required": ["name", "position", "status"],
+        "integers": ["id"],
+        "natural_key": ["name", "position", "client"],
+    },
+    "interviews": {
+        "required": ["candidate_id", "interviewer", "date", "status"],
+        "integers": ["id", "candidate_id"],
+        "natural_key": ["candidate_id", "interviewer", "date"],
+    },
+    "clients": {
+        "required": ["name"],
+        "integers": ["id", "active_positions", "total_hires"],
+        "natural_key": ["name"],
+    },
+}
+
+
+# PUBLIC_INTERFACE
+class IngestReport:
+    """Counters and row-level problems collected while ingesting a workbook."""
+
+    MAX_ERRORS = 20
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.errors = []
+
+    def reject(self, row_numbers, reason):
+        self.rows_rejected += len(row_numbers)
+        for number in row_numbers[: max(0, self.MAX_ERRORS - len(self.errors))]:
+            self.errors.append(f"Row {number}: {reason}")
+
+    def summary(self):
+        return f"{self.rows_written} rows saved, {self.rows_rejected} rejected of {self.rows_read} read"
+
+
+# PUBLIC_INTERFACE
+class MergeReport(IngestReport):
+    """IngestReport for merge uploads, with the insert/update/unchanged diff."""
+
+    def __init__(self):
+        super().__init__()
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+
+    def summary(self):
+        return (
+            f"{self.inserted} inserted, {self.updated} updated, {self.unchanged} unchanged, "
+            f"{self.rows_rejected} rejected of {self.rows_read} read"
+        )
+
+
+# PUBLIC_INTERFACE
+class RowMatcher:
+    """Match incoming rows to existing ones on id or a natural key and diff them by content hash."""
+
+    def __init__(self, existing, key_columns):
+        self.existing = existing
+        self.key_columns = list(key_columns)
+        if len(existing) and all(col in existing.columns for col in self.key_columns):
+            keys = _key_frame(existing, self.key_columns)
+            keys["_pos"] = range(len(keys))
+            # A natural key can repeat in stored data; the last row wins
+            keys = keys.drop_duplicates(self.key_columns, keep="last")
+            self._positions = keys["_pos"].to_numpy()
+            self._index = pd.MultiIndex.from_frame(keys[self.key_columns])
+        else:
+            self._positions = None
+
+    def diff(self, chunk):
+        """Return (positions of matched existing rows or -1, mask of matched rows whose content changed).
+
+        Raises ValueError if the chunk lacks any key column, since every row
+        would otherwise look new.
+        """
+        missing = [col for col in self.key_columns if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Missing key columns: {', '.join(missing)}")
+        if self._positions is None:
+            return np.full(len(chunk), -1), np.zeros(len(chunk), dtype=bool)
+        found = self._index.get_indexer(pd.MultiIndex.from_frame(_key_frame(chunk, self.key_columns)))
+        positions = np.where(found >= 0, self._positions[found], -1)
+        matched = positions >= 0
+        changed = np.zeros(len(chunk), dtype=bool)
+        if matched.any():
+            columns = [col for col in chunk.columns if col != "id"]
+            incoming = row_hashes(chunk[matched], columns)
+            stored = row_hashes(self.existing.iloc[positions[matched]], columns)
+            changed[matched] = incoming != stored
+        return positions, changed
+
+
+# PUBLIC_INTERFACE
+def row_hashes(df, columns):
+    """64-bit content hash per row over columns, insensitive to dtype differences between sources"""
+    canonical = pd.DataFrame(
+        {col: _canonical(df[col]) if col in df.columns else "" for col in columns}, index=range(len(df))
+    )
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+
+def _key_frame(df, columns):
+    return pd.DataFrame({col: _canonical(df[col]) for col in columns}, index=range(len(df)))
+
+
+def _canonical(series):
+    """Normalize a column so equal values from the store and from a workbook compare equal."""
+    values = series.reset_index(drop=True)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.strftime("%Y-%m-%d %H:%M:%S").fillna("")
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype("float64")
+    return values.astype(object).where(values.notna(), "").astype(str)
+
+
+# PUBLIC_INTERFACE
+def iter_workbook_chunks(source, chunk_rows=CHUNK_ROWS):
+    """Yield (total_rows or None, DataFrame chunk) from the first sheet of a workbook.
+
+    Uses openpyxl's read-only mode so only one chunk of rows is held in memory.
+    Legacy files that are CSV text with an .xlsx extension are streamed with
+    the CSV reader instead. Always yields at least one (possibly empty) chunk
+    carrying the header.
+    """
+    try:
+        workbook = load_workbook(source, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        yielded = False
+        for chunk in pd.read_csv(source, chunksize=chunk_rows):
+            yielded = True
+            yield None, chunk
+        if not yielded:
+            yield None, pd.DataFrame()
+        return
+    try:
+        sheet = workbook.worksheets[0]
+        total = sheet.max_row - 1 if sheet.max_row else None
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(name).strip() for name in next(rows, ()) if name is not None]
+        batch, yielded = [], False
+        for row in rows:
+            if not any(value is not None for value in row):
+                continue
+            batch.append(row[: len(header)])
+            if len(batch) >= chunk_rows:
+                yield total, pd.DataFrame(batch, columns=header)
+                batch, yielded = [], True
+        if batch or not yielded:
+            yield total, pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+# PUBLIC_INTERFACE
+def coerce_chunk(table, chunk, date_columns, report, first_row=2):
+    """Validate one chunk against the table schema and coerce its column types.
+
+    Raises ValueError if required columns are missing. Rows with empty
+    required values are dropped and recorded on the report; first_row is the
+    sheet row number of the chunk's first data row, for error messages.
+    """
+    schema = SCHEMAS[table]
+    chunk = chunk.rename(columns=lambda name: str(name).strip())
+    missing = [col for col in schema["required"] if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    for col in date_columns:
+        if col in chunk.columns:
+            chunk[col] = pd.to_datetime(chunk[col], errors="coerce", format="mixed")
+    for col in schema["integers"]:
+        if col in chunk.columns:
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce").round().astype("Int64")
+    for col in chunk.columns:
+        if chunk[col].dtype == object:
+            chunk[col] = chunk[col].where(chunk[col].isna(), chunk[col].astype(str).str.strip())
+    invalid = chunk[schema["required"]].isna().any(axis=1)
+    invalid |= (chunk[schema["required"]].astype(str) == "").any(axis=1)
+    if invalid.any():
+        numbers = [first_row + pos for pos in invalid.to_numpy().nonzero()[0]]
+        report.reject(numbers, f"missing one of {', '.join(schema['required'])}")
+        chunk = chunk[~invalid]
+    return chunk.reset_index(drop=True)
@@ -0,0 +1,240 @@
+import copy
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from indexes import ChunkedMap, changed_rows
+
+RECENT_DAYS = 30
+
+
+# PUBLIC_INTERFACE
+class CandidateCube:
+    """Candidate counts over client × status × position × applied week, maintained on every write.
+
+    Charts and KPIs roll up the cells, so their cost depends on the number of
+    distinct category combinations rather than the number of candidates.
+    Cells are kept in a ChunkedMap keyed by cell tuple, and an update only
+    adds or subtracts the counts of the cells its rows fall in; the cells
+    frame used by counts() and slice() is built on first use. The
+    whole-table cube also maintains its total, status and open-position
+    counts, and per-day applied counts with each day's sorted timestamps, so
+    the recent-candidates KPI is exact for any `now`: only the day the cutoff
+    falls on is binary-searched. Sliced cubes count it at week resolution.
+    """
+
+    DIMENSIONS = ['client', 'status', 'position', 'week']
+
+    def __init__(self, frame):
+        self.cell_counts = ChunkedMap(_cell_counts(frame))
+        self.applied_days = ChunkedMap()
+        self.applied_times = ChunkedMap()
+        if len(frame) and 'applied_date' in frame.columns:
+            _merge_applied(self.applied_days, self.applied_times, frame['applied_date'], 1)
+        self._total, self._status, self._open = _rollups(self.cell_counts.items())
+        self._cells = None
+
+    @property
+    def cells(self):
+        """Frame of the non-empty cells: the dimension columns and their count"""
+        if self._cells is None:
+            self._cells = _cells_frame(self.cell_counts)
+        return self._cells
+
+    @property
+    def total(self):
+        return self._total if self._total is not None else int(self.cells['count'].sum())
+
+    @property
+    def status_counts(self):
+        if self._status is not None:
+            return Counter(self._status)
+        return Counter(self.counts(['status']).to_dict())
+
+    @property
+    def open_positions(self):
+        """Positions with at least one Open candidate, with their counts"""
+        if self._open is not None:
+            return Counter(self._open)
+        return Counter(self.slice({'status': 'Open'}).counts(['position']).to_dict())
+
+    def counts(self, dimensions):
+        """Candidate counts grouped by the given dimensions; rows with a missing value are left out"""
+        counts = self.cells.groupby(dimensions)['count'].sum()
+        return counts[counts > 0]
+
+    def slice(self, filters):
+        """Cube restricted to {dimension: value or list of values}; None values are ignored"""
+        if all(value is None for value in filters.values()):
+            return self
+        cells = self.cells
+        mask = pd.Series(True, index=cells.index)
+        for dimension, wanted in filters.items():
+            if wanted is not None:
+                values = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+                mask &= cells[dimension].isin(values)
+        cube = CandidateCube.__new__(CandidateCube)
+        cube.cell_counts = cube.applied_days = cube.applied_times = None
+        cube._total = cube._status = cube._open = None
+        cube._cells = cells[mask]
+        return cube
+
+    def update(self, frame, changes, previous):
+        old, new = changed_rows(previous, frame, changes)
+        deltas = Counter(_cell_counts(new))
+        deltas.subtract(_cell_counts(old))
+        cube = CandidateCube.__new__(CandidateCube)
+        cube.cell_counts = self.cell_counts.copy()
+        for cell, delta in deltas.items():
+            count = cube.cell_counts.get(cell, 0) + delta
+            if count:
+                cube.cell_counts[cell] = count
+            elif cell in cube.cell_counts:
+                del cube.cell_counts[cell]
+        total, status, open_positions = _rollups(deltas.items())
+        cube._total = self._total + total
+        cube._status = _combine(self._status, status)
+        cube._open = _combine(self._open, open_positions)
+        cube.applied_days = self.applied_days.copy()
+        cube.applied_times = self.applied_times.copy()
+        for rows, sign in ((old, -1), (new, 1)):
+            if len(rows) and 'applied_date' in rows.columns:
+                _merge_applied(cube.applied_days, cube.applied_times, rows['applied_date'], sign)
+        cube._cells = None
+        return cube
+
+    def recent(self, now=None, days=RECENT_DAYS):
+        """Candidates who applied within the last `days` days"""
+        cutoff = pd.Timestamp(now or datetime.now()) - pd.Timedelta(days=days)
+        if self.applied_days is not None:
+            boundary = cutoff.normalize()
+            later = sum(count for day, count in self.applied_days.items() if day > boundary)
+            on_boundary = self.applied_times.get(boundary, _NO_TIMES)
+            return later + len(on_boundary) - int(np.searchsorted(on_boundary, cutoff.to_datetime64(), side='right'))
+        weeks = self.counts(['week'])
+        return int(weeks[weeks.index > cutoff - pd.Timedelta(days=7)].sum())
+
+
+# PUBLIC_INTERFACE
+class InterviewSummary:
+    """Materialized status histogram over the interviews table."""
+
+    def __init__(self, frame):
+        self.status_counts = Counter()
+        self._add(frame, 1)
+
+    def _add(self, rows, sign):
+        if len(rows) and 'status' in rows.columns:
+            _merge(self.status_counts, rows['status'].value_counts(), sign)
+
+    def update(self, frame, changes, previous):
+        summary = copy.copy(self)
+        summary.status_counts = Counter(self.status_counts)
+        old, new = changed_rows(previous, frame, changes)
+        summary._add(old, -1)
+        summary._add(new, 1)
+        return summary
+
+
+# PUBLIC_INTERFACE
+def recruitment_metrics(candidate_summary, interview_summary, now=None):
+    """Build the KPI dict from the candidate cube and interview summary, without scanning rows"""
+    total = candidate_summary.total
+    return {
+        'total_candidates': total,
+        'recent_candidates': candidate_summary.recent(now),
+        'open_positions': len(candidate_summary.open_positions),
+        'active_interviews': interview_summary.status_counts.get('Scheduled', 0),
+        'success_rate': candidate_summary.status_counts.get('Hired', 0) / total * 100 if total > 0 else 0,
+    }
+
+
+# PUBLIC_INTERFACE
+def compute_recruitment_metrics(candidates_df, interviews_df, now=None):
+    """Compute the KPI dict in one pass over already-loaded (possibly filtered) frames"""
+    return recruitment_metrics(CandidateCube(candidates_df), InterviewSummary(interviews_df), now)
+
+
+def _cell_counts(frame):
+    """{(client, status, position, week): rows}; a missing dimension value is None"""
+    dimensions = CandidateCube.DIMENSIONS
+    if not len(frame):
+        return {}
+    keys = pd.DataFrame(
+        {col: frame[col].astype(object) if col in frame.columns else None for col in dimensions[:-1]},
+        index=frame.index,
+    )
+    if 'applied_date' in frame.columns:
+        days = frame['applied_date'].dt.normalize()
+        keys['week'] = days - pd.to_timedelta(days.dt.dayofweek, unit='D')
+    else:
+        keys['week'] = pd.NaT
+    counts = keys.value_counts(dropna=False, sort=False)
+    cells = counts.index.to_frame(index=False).astype(object)
+    cells = cells.where(cells.notna(), None)
+    return dict(zip(zip(*(cells[col].tolist() for col in dimensions)), counts.tolist()))
+
+
+def _cells_frame(cell_counts):
+    dimensions = CandidateCube.DIMENSIONS
+    columns = list(zip(*cell_counts)) or [()] * len(dimensions)
+    cells = pd.DataFrame({col: pd.Series(values, dtype=object) for col, values in zip(dimensions, columns)})
+    cells['week'] = pd.to_datetime(cells['week'])
+    cells['count'] = pd.Series(list(cell_counts.values()), dtype='int64')
+    return cells
+
+
+def _rollups(cell_counts):
+    """(total, {status: count}, {position: Open count}) over (cell, count) pairs"""
+    total, status, open_positions = 0, Counter(), Counter()
+    for (_, cell_status, position, _), count in cell_counts:
+        total += count
+        if cell_status is not None:
+            status[cell_status] += count
+            if cell_status == 'Open' and position is not None:
+                open_positions[position] += count
+    return total, status, open_positions
+
+
+def _combine(counts, deltas):
+    combined = Counter(counts)
+    combined.update(deltas)
+    return Counter({value: count for value, count in combined.items() if count > 0})
+
+
+def _merge_applied(days, times, applied, sign):
+    """Add (sign 1) or remove (-1) applied timestamps from the per-day counts and each day's sorted timestamps"""
+    stamps = np.sort(applied.dropna().to_numpy(dtype='datetime64[ns]'))
+    if not len(stamps):
+        return
+    day_of = stamps.astype('datetime64[D]')
+    starts = np.flatnonzero(np.r_[True, day_of[1:] != day_of[:-1]])
+    for day, chunk in zip(day_of[starts], np.split(stamps, starts[1:])):
+        day = pd.Timestamp(day)
+        current = times.get(day, _NO_TIMES)
+        if sign > 0:
+            merged = np.insert(current, np.searchsorted(current, chunk, side='right'), chunk)
+        else:
+            # One stored occurrence per removed timestamp, counting repeats within the chunk
+            repeat = np.arange(len(chunk)) - np.searchsorted(chunk, chunk, side='left')
+            keep = np.ones(len(current), dtype=bool)
+            keep[np.searchsorted(current, chunk, side='left') + repeat] = False
+            merged = current[keep]
+        if len(merged):
+            days[day], times[day] = len(merged), merged
+        elif day in times:
+            del days[day], times[day]
+
+
+_NO_TIMES = np.array([], dtype='datetime64[ns]')
+
+
+def _merge(counter, counts, sign):
+    for value, count in counts.items():
+        total = counter.get(value, 0) + sign * int(count)
+        if total > 0:
+            counter[value] = total
+        elif value in counter:
+            del counter[value]
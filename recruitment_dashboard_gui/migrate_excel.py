@@ -0,0 +1,23 @@
+import argparse
+from data_handler import DataHandler
+
+
+# PUBLIC_INTERFACE
+def main(argv=None):
+    """One-shot migration of the legacy data/*.xlsx workbooks into the SQLite store.
+
+    DataHandler also runs it on startup for tables missing from storage; use
+    --overwrite to re-import workbooks over existing tables.
+    """
+    parser = argparse.ArgumentParser(description="Migrate Excel workbooks into the storage backend")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--overwrite", action="store_true", help="replace tables that already exist")
+    args = parser.parse_args(argv)
+
+    dh = DataHandler(data_dir=args.data_dir, auto_migrate=False)
+    migrated = dh.migrate_from_excel(overwrite=args.overwrite)
+    print(f"Migrated: {', '.join(migrated) if migrated else 'nothing to migrate'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import streamlit as st
+
+from notifications import CLAIM_TIMEOUT_SECONDS, Outbox, dispatcher, sender_from_env, transport_from_env
+from polling import request_poll
+
+
+# PUBLIC_INTERFACE
+def notify_action(dh, kind, label, key, build):
+    """Render a button that queues build()'s messages and starts delivery, then the kind's delivery status.
+
+    The script thread only writes to the outbox; sending happens on the
+    dispatcher's background thread. Messages already queued or sent are
+    skipped by their de-duplication key.
+    """
+    outbox = Outbox(Path(dh.data_dir) / "outbox.db")
+    try:
+        transport = transport_from_env()
+    except ValueError as e:
+        st.button(label, key=f"{key}_button", disabled=True)
+        st.error(f"Email is not configured: {e}")
+        return
+
+    def start():
+        dispatcher.kick(outbox, lambda: sender_from_env(outbox, transport))
+
+    if st.button(label, key=f"{key}_button"):
+        queued, duplicates = outbox.enqueue(build())
+        st.session_state[f"{key}_queued"] = (queued, duplicates)
+        start()
+    if f"{key}_queued" not in st.session_state:
+        return
+    queued, duplicates = st.session_state[f"{key}_queued"]
+    # Read before the counts, so a drain finishing in between is not mistaken for an interrupted one
+    active = dispatcher.running(outbox)
+    status = outbox.status(kind)
+    pending = status["queued"] + status["sending"]
+    st.caption(
+        f"{queued} queued, {duplicates} already queued or sent · "
+        f"delivered {status['sent']}, pending {pending}, failed {status['failed']}"
+    )
+    if status["failed"]:
+        st.error(f"Some messages could not be delivered: {outbox.last_error(kind)}")
+    if active:
+        if status["sending"] or status["queued"]:
+            request_poll()
+    elif status["sending"]:
+        # Claimed by a sender that is gone (e.g. the app restarted mid-send); the
+        # dispatcher hands them out again once the claim times out, so stop polling
+        st.warning(
+            f"{status['sending']} message(s) were interrupted while sending and will be retried "
+            f"within {CLAIM_TIMEOUT_SECONDS // 60} minutes."
+        )
+        start()
+    elif status["queued"]:
+        # Waiting out a retry backoff, or the sender stopped (e.g. after a restart)
+        start()
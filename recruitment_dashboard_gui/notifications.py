@@ -0,0 +1,399 @@
+import asyncio
+import logging
+import os
+import smtplib
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime
+from email.message import EmailMessage
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Reminders go out for follow-up deadlines this many days ahead
+REMINDER_WINDOW_DAYS = 7
+
+# Messages claimed and marked per outbox transaction
+NOTIFY_BATCH_SIZE = 50
+# Delivery attempts before a message is marked failed; retries back off exponentially
+NOTIFY_MAX_ATTEMPTS = 5
+NOTIFY_RETRY_SECONDS = 30
+# A message claimed by a sender that died is handed out again after this long
+CLAIM_TIMEOUT_SECONDS = 300
+
+
+# PUBLIC_INTERFACE
+class Outbox:
+    """Persistent notification queue in SQLite.
+
+    Every message carries a de-duplication key (e.g. candidate and deadline);
+    enqueueing a key that is already queued or sent does nothing, so pressing
+    a button twice or re-running a job never sends twice. Senders claim
+    batches, and mark them sent or failed in one transaction per batch.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "dedupe_key TEXT NOT NULL UNIQUE, kind TEXT NOT NULL, recipient TEXT NOT NULL, "
+                "subject TEXT NOT NULL, body TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'queued', "
+                "attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT, created_at REAL NOT NULL, "
+                "available_at REAL NOT NULL, sent_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox__pending ON outbox (status, available_at)")
+
+    def _connect(self):
+        return closing(sqlite3.connect(self.path, timeout=30, isolation_level=None))
+
+    def enqueue(self, messages):
+        """Queue dicts with key, kind, recipient, subject and body; returns (queued, duplicates)"""
+        now = time.time()
+        rows = [
+            (m["key"], m["kind"], m["recipient"], m["subject"], m["body"], now, now) for m in messages
+        ]
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO outbox (dedupe_key, kind, recipient, subject, body, created_at, available_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            queued = conn.total_changes - before
+            conn.execute("COMMIT")
+        return queued, len(rows) - queued
+
+    def claim(self, limit):
+        """Mark up to limit due messages as sending and return them as dicts"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, recipient, subject, body, attempts FROM outbox "
+                "WHERE (status = 'queued' AND available_at <= ?) OR (status = 'sending' AND available_at <= ?) "
+                "ORDER BY id LIMIT ?",
+                (now, now - CLAIM_TIMEOUT_SECONDS, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET status = 'sending', available_at = ? WHERE id = ?", [(now, row[0]) for row in rows]
+            )
+            conn.execute("COMMIT")
+        return [dict(zip(("id", "recipient", "subject", "body", "attempts"), row)) for row in rows]
+
+    def mark_sent(self, ids):
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?",
+                [(time.time(), message_id) for message_id in ids],
+            )
+
+    def mark_failed(self, errors, max_attempts=NOTIFY_MAX_ATTEMPTS):
+        """Record {id: error}; messages with attempts left are re-queued after a backoff"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for message_id, error in errors.items():
+                attempts = conn.execute("SELECT attempts FROM outbox WHERE id = ?", (message_id,)).fetchone()[0] + 1
+                conn.execute(
+                    "UPDATE outbox SET attempts = ?, last_error = ?, status = ?, available_at = ? WHERE id = ?",
+                    (
+                        attempts, str(error), "failed" if attempts >= max_attempts else "queued",
+                        now + NOTIFY_RETRY_SECONDS * 2 ** (attempts - 1), message_id,
+                    ),
+                )
+            conn.execute("COMMIT")
+
+    def status(self, kind=None):
+        """Message counts by status ({"queued", "sending", "sent", "failed"}), optionally for one kind"""
+        query = "SELECT status, COUNT(*) FROM outbox" + (" WHERE kind = ?" if kind else "") + " GROUP BY status"
+        with self._connect() as conn:
+            counts = dict(conn.execute(query, (kind,) if kind else ()).fetchall())
+        return {status: counts.get(status, 0) for status in ("queued", "sending", "sent", "failed")}
+
+    def last_error(self, kind=None):
+        """Most recent delivery error, or None"""
+        query = "SELECT last_error FROM outbox WHERE last_error IS NOT NULL" + (" AND kind = ?" if kind else "")
+        with self._connect() as conn:
+            row = conn.execute(query + " ORDER BY available_at DESC LIMIT 1", (kind,) if kind else ()).fetchone()
+        return row[0] if row else None
+
+
+class Transport:
+    """Base class for message transports; connect() opens one reusable connection."""
+
+    async def connect(self):
+        """Return a connection with async send(EmailMessage) and close()"""
+        raise NotImplementedError
+
+
+# PUBLIC_INTERFACE
+class SMTPTransport(Transport):
+    """SMTP via smtplib; each connection stays open for many messages and reconnects when dropped."""
+
+    def __init__(self, host, port=25, username=None, password=None, starttls=False, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    async def connect(self):
+        connection = _SMTPConnection(self)
+        await asyncio.to_thread(connection.open)
+        return connection
+
+    def _open(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password)
+        return smtp
+
+
+class _SMTPConnection:
+    def __init__(self, transport):
+        self.transport = transport
+        self.smtp = None
+
+    def open(self):
+        self.smtp = self.transport._open()
+
+    async def send(self, message):
+        await asyncio.to_thread(self._send, message)
+
+    def _send(self, message):
+        if self.smtp is None:
+            self.open()
+        try:
+            self.smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Idle connections get dropped by servers; retry once on a fresh one
+            self.open()
+            self.smtp.send_message(message)
+
+    async def close(self):
+        if self.smtp is not None:
+            await asyncio.to_thread(self._quit)
+
+    def _quit(self):
+        try:
+            self.smtp.quit()
+        except smtplib.SMTPException:
+            self.smtp.close()
+        self.smtp = None
+
+
+# PUBLIC_INTERFACE
+class RateLimiter:
+    """Token bucket shared by the sender's connections; rate is messages per second (None: unlimited)"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# PUBLIC_INTERFACE
+class NotificationSender:
+    """Drain an outbox through a transport with a few reused connections under a shared rate limit."""
+
+    def __init__(self, outbox, transport, sender, rate=None, connections=2, batch_size=NOTIFY_BATCH_SIZE):
+        self.outbox = outbox
+        self.transport = transport
+        self.sender = sender
+        self.rate = rate
+        self.connections = connections
+        self.batch_size = batch_size
+
+    async def drain(self):
+        """Send every due message; returns (sent, failed attempts)"""
+        limiter = RateLimiter(self.rate)
+        sent = failed = 0
+        pool = []
+        try:
+            while True:
+                batch = await asyncio.to_thread(self.outbox.claim, self.batch_size)
+                if not batch:
+                    break
+                try:
+                    if not pool:
+                        for _ in range(max(1, self.connections)):
+                            pool.append(await self.transport.connect())
+                    queue = asyncio.Queue()
+                    for message in batch:
+                        queue.put_nowait(message)
+                    done, errors = [], {}
+                    await asyncio.gather(*(self._worker(conn, queue, limiter, done, errors) for conn in pool))
+                    await asyncio.to_thread(self.outbox.mark_sent, done)
+                except Exception as exc:
+                    # Count the attempt so the batch backs off with the error instead of staying claimed
+                    logger.exception("Notification batch failed")
+                    await asyncio.to_thread(self.outbox.mark_failed, {m["id"]: exc for m in batch})
+                    raise
+                if errors:
+                    await asyncio.to_thread(self.outbox.mark_failed, errors)
+                sent += len(done)
+                failed += len(errors)
+        finally:
+            for conn in pool:
+                await conn.close()
+        return sent, failed
+
+    async def _worker(self, conn, queue, limiter, done, errors):
+        while not queue.empty():
+            message = queue.get_nowait()
+            await limiter.acquire()
+            try:
+                await conn.send(self._email(message))
+                done.append(message["id"])
+            except Exception as exc:
+                logger.warning("Could not send message %s to %s: %s", message["id"], message["recipient"], exc)
+                errors[message["id"]] = exc
+
+    def _email(self, message):
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = message["recipient"]
+        email["Subject"] = message["subject"]
+        email.set_content(message["body"])
+        return email
+
+
+# PUBLIC_INTERFACE
+class Dispatcher:
+    """Drains outboxes on background threads, one at a time per outbox, each with its own event loop."""
+
+    def __init__(self):
+        self._running = {}
+        self._again = set()
+        self._lock = threading.Lock()
+
+    def kick(self, outbox, make_sender):
+        """Start draining outbox with make_sender(), or have the running drain go round once more"""
+        key = str(outbox.path.resolve())
+        with self._lock:
+            if key in self._running:
+                self._again.add(key)
+                return
+            self._running[key] = thread = threading.Thread(target=self._run, args=(key, make_sender), daemon=True)
+        thread.start()
+
+    def running(self, outbox):
+        with self._lock:
+            return str(outbox.path.resolve()) in self._running
+
+    def _run(self, key, make_sender):
+        while True:
+            try:
+                asyncio.run(make_sender().drain())
+            except Exception:
+                # The failed batch carries the error and is retried on the next drain
+                logger.exception("Notification drain of %s failed", key)
+            with self._lock:
+                if key not in self._again:
+                    del self._running[key]
+                    return
+                self._again.discard(key)
+
+
+# PUBLIC_INTERFACE
+def transport_from_env():
+    """SMTPTransport from the SMTP_* settings; raises ValueError when no mail relay is configured"""
+    kind = os.getenv("NOTIFY_TRANSPORT", "smtp").lower()
+    if kind != "smtp":
+        raise ValueError(f"Unsupported NOTIFY_TRANSPORT {kind!r}; only 'smtp' is available")
+    host = os.getenv("SMTP_HOST", "").strip()
+    if not host:
+        raise ValueError("SMTP_HOST is not set, so there is no mail relay to send through")
+    return SMTPTransport(
+        host, int(os.getenv("SMTP_PORT", "25")),
+        os.getenv("SMTP_USERNAME") or None, os.getenv("SMTP_PASSWORD") or None,
+        starttls=os.getenv("SMTP_STARTTLS", "false").lower() == "true",
+    )
+
+
+# PUBLIC_INTERFACE
+def sender_from_env(outbox, transport=None):
+    """NotificationSender configured from NOTIFY_* settings, over transport_from_env() unless given one"""
+    rate = float(os.getenv("NOTIFY_RATE_PER_SECOND", "10"))
+    return NotificationSender(
+        outbox,
+        transport or transport_from_env(),
+        sender=os.getenv("NOTIFY_FROM", "recruiting@example.com"),
+        rate=rate or None,
+        connections=int(os.getenv("NOTIFY_CONNECTIONS", "2")),
+    )
+
+
+# PUBLIC_INTERFACE
+def recipients_from_env(name, default):
+    """Comma-separated addresses from an environment variable"""
+    return [address.strip() for address in os.getenv(name, default).split(",") if address.strip()]
+
+
+# PUBLIC_INTERFACE
+def reminder_messages(due, recipient):
+    """Follow-up reminders for DataHandler.follow_up_deadlines rows, one per candidate, deadline and recipient"""
+    if not len(due):
+        return []
+    return [
+        {
+            "key": f"reminder:{row['id']}:{recipient}:{deadline.date()}",
+            "kind": "reminder",
+            "recipient": recipient,
+            "subject": f"Follow-up due {deadline.date()}: {row['name']}",
+            "body": (
+                f"Follow-up for {row['name']} ({row.get('position', '')}, client {row.get('client', '')}) "
+                f"is due by {deadline.date()}."
+            ),
+        }
+        for row, deadline in zip(due.to_dict("records"), due["follow_up_deadline"])
+    ]
+
+
+# PUBLIC_INTERFACE
+def stakeholder_messages(cube, recipients, today=None):
+    """Daily digest of candidate counts by status, one per client and recipient"""
+    today = (today or datetime.now()).date()
+    counts = cube.counts(["client", "status"]) if cube.total else pd.Series(dtype="int64")
+    messages = []
+    for client in sorted(counts.index.get_level_values(0).unique()):
+        statuses = counts.loc[client]
+        body = "\n".join(f"{status}: {int(count)}" for status, count in statuses.items())
+        for recipient in recipients:
+            messages.append({
+                "key": f"stakeholders:{client}:{recipient}:{today}",
+                "kind": "stakeholders",
+                "recipient": recipient,
+                "subject": f"{client} pipeline update {today}",
+                "body": f"Candidate pipeline for {client} as of {today}:\n\n{body}\n",
+            })
+    return messages
+
+
+dispatcher = Dispatcher()
@@ -1,9 +1,170 @@
-from google.oauth2 import id_token
-from google.auth.transport import requests
+from google.auth import jwt
 from google_auth_oauthlib.flow import Flow
+from email.utils import parsedate_to_datetime
+import base64
+import json
 import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import streamlit as st
 
+# Google's ID token signing certificates, as {key id: PEM certificate}
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+# GOOGLE_CERTS_URL may only point elsewhere (e.g. a local test issuer) when this is "true"
+ALLOW_TEST_CERTS_ENV = "OAUTH_ALLOW_TEST_CERTS_URL"
+# Certificate lifetime when the response carries no max-age or Expires
+DEFAULT_CERTS_TTL_SECONDS = 300
+# A token signed with an unknown key id forces a refresh at most this often
+CERTS_REFRESH_SECONDS = 5
+# Allowed clock difference when checking a token's iat/exp
+CLOCK_SKEW_SECONDS = 10
+# Timeout for each request to Google's endpoints
+HTTP_TIMEOUT_SECONDS = 10
+
+_session_lock = threading.Lock()
+_adapter = None
+_session = None
+_certificate_caches = {}
+
+
+def _http_adapter():
+    """Connection pool shared by every session that talks to Google"""
+    global _adapter
+    with _session_lock:
+        if _adapter is None:
+            retries = Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504), allowed_methods=["GET"])
+            _adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+        return _adapter
+
+
+# PUBLIC_INTERFACE
+def http_session():
+    """Process-wide requests session with pooled keep-alive connections"""
+    global _session
+    adapter = _http_adapter()
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+# PUBLIC_INTERFACE
+class CertificateCache:
+    """Signing certificates fetched from a certs URL and kept for as long as the response allows.
+
+    The lifetime comes from Cache-Control max-age (less Age), else Expires;
+    no-store or no-cache responses are used once and not kept. An expired
+    entry is revalidated with If-None-Match when the server sent an ETag,
+    and kept serving if the refresh fails. Lookups are thread-safe and only
+    one thread refreshes at a time.
+    """
+
+    def __init__(self, url, session=None):
+        self.url = url
+        self.session = session
+        self.fetches = 0
+        self._certs = None
+        self._etag = None
+        self._expires = 0.0
+        self._last_fetch = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, key_id=None):
+        """Current certificates; an unknown key_id triggers a (rate-limited) refresh for key rotation"""
+        with self._lock:
+            now = time.monotonic()
+            stale = self._certs is None or now >= self._expires
+            rotated = key_id is not None and self._certs is not None and key_id not in self._certs
+            if stale or (rotated and now - self._last_fetch >= CERTS_REFRESH_SECONDS):
+                self._refresh(now)
+            return self._certs
+
+    def _refresh(self, now):
+        headers = {"If-None-Match": self._etag} if self._certs is not None and self._etag else {}
+        try:
+            response = (self.session or http_session()).get(self.url, headers=headers, timeout=HTTP_TIMEOUT_SECONDS)
+            self.fetches += 1
+            self._last_fetch = now
+            if response.status_code != 304:
+                response.raise_for_status()
+                self._certs = response.json()
+                self._etag = response.headers.get("ETag")
+        except (requests.RequestException, ValueError) as exc:
+            if self._certs is None:
+                raise ValueError(f"Could not fetch signing certificates from {self.url}: {exc}") from exc
+            self._expires = now + CERTS_REFRESH_SECONDS
+            return
+        self._expires = now + _cache_lifetime(response.headers)
+
+    def verify(self, token, audience, issuers=GOOGLE_ISSUERS):
+        """Decoded claims of a valid ID token; raises ValueError otherwise"""
+        certs = self.get(_key_id(token))
+        claims = jwt.decode(token, certs=certs, audience=audience, clock_skew_in_seconds=CLOCK_SKEW_SECONDS)
+        if claims.get("iss") not in issuers:
+            raise ValueError(f"Wrong issuer {claims.get('iss')!r}; expected one of {list(issuers)}")
+        return claims
+
+
+# PUBLIC_INTERFACE
+def certificate_cache(url=GOOGLE_CERTS_URL):
+    """The process-wide certificate cache for a certs URL"""
+    with _session_lock:
+        if url not in _certificate_caches:
+            _certificate_caches[url] = CertificateCache(url)
+        return _certificate_caches[url]
+
+
+# PUBLIC_INTERFACE
+def certs_url_from_env():
+    """GOOGLE_CERTS_URL, or Google's; anything else is refused unless OAUTH_ALLOW_TEST_CERTS_URL=true.
+
+    Whoever serves the certificates can mint logins, so a leaked or
+    mistyped setting must not be able to swap them on its own.
+    """
+    url = os.getenv("GOOGLE_CERTS_URL") or GOOGLE_CERTS_URL
+    if url != GOOGLE_CERTS_URL and os.getenv(ALLOW_TEST_CERTS_ENV, "false").lower() != "true":
+        raise ValueError(
+            f"GOOGLE_CERTS_URL={url!r} is not Google's certificate endpoint; "
+            f"set {ALLOW_TEST_CERTS_ENV}=true to use it for local testing"
+        )
+    return url
+
+
+def _cache_lifetime(headers):
+    """Seconds a response may be reused for, per its Cache-Control, Age and Expires headers"""
+    directives = {}
+    for item in headers.get("Cache-Control", "").split(","):
+        name, _, value = item.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    if "no-store" in directives or "no-cache" in directives:
+        return 0.0
+    try:
+        if "max-age" in directives:
+            return max(0.0, float(directives["max-age"]) - float(headers.get("Age", 0) or 0))
+        if "Expires" in headers:
+            date = parsedate_to_datetime(headers["Date"]).timestamp() if "Date" in headers else time.time()
+            return max(0.0, parsedate_to_datetime(headers["Expires"]).timestamp() - date)
+    except (TypeError, ValueError):
+        return 0.0
+    return float(DEFAULT_CERTS_TTL_SECONDS)
+
+
+def _key_id(token):
+    """The kid from a JWT's header without verifying it, or None if the token is malformed"""
+    try:
+        header = token.split(".")[0] if isinstance(token, str) else token.decode().split(".")[0]
+        return json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4))).get("kid")
+    except (ValueError, AttributeError, UnicodeDecodeError):
+        return None
+
+
 class GoogleOAuth:
     def __init__(self):
         self.client_id = os.getenv('GOOGLE_CLIENT_ID')
@@ -13,23 +174,29 @@ class GoogleOAuth:
             'https://www.googleapis.com/auth/userinfo.email',
             'https://www.googleapis.com/auth/userinfo.profile',
         ]
+        self.client_config = {
+            "web": {
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+                "token_uri": "https://oauth2.googleapis.com/token",
+                "redirect_uris": [self.redirect_uri]
+            }
+        }
+        self.certs = certificate_cache(certs_url_from_env())
+
+    def _flow(self, state=None):
+        """Flow over the prebuilt client config, sending its requests through the shared connection pool"""
+        flow = Flow.from_client_config(self.client_config, scopes=self.scopes, state=state)
+        flow.redirect_uri = self.redirect_uri
+        adapter = _http_adapter()
+        flow.oauth2session.mount("https://", adapter)
+        flow.oauth2session.mount("http://", adapter)
+        return flow
 
     def create_authorization_url(self):
         """Create OAuth 2.0 authorization URL"""
-        flow = Flow.from_client_config(
-            {
-                "web": {
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
-                    "redirect_uris": [self.redirect_uri]
-                }
-            },
-            scopes=self.scopes
-        )
-        flow.redirect_uri = self.redirect_uri
-        authorization_url, state = flow.authorization_url(
+        authorization_url, state = self._flow().authorization_url(
             access_type='offline',
             include_granted_scopes='true'
         )
@@ -38,36 +205,19 @@ class GoogleOAuth:
     def verify_oauth_token(self, token):
         """Verify the OAuth token and return user info"""
         try:
-            idinfo = id_token.verify_oauth2_token(
-                token, 
-                requests.Request(), 
-                self.client_id
-            )
+            idinfo = self.certs.verify(token, self.client_id)
             return {
                 'email': idinfo['email'],
                 'name': idinfo.get('name', ''),
                 'picture': idinfo.get('picture', '')
             }
-        except ValueError:
+        except (ValueError, KeyError):
             return None
 
     def handle_callback(self, state, code):
         """Handle OAuth callback and return credentials"""
-        flow = Flow.from_client_config(
-            {
-                "web": {
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret,
-                    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                    "token_uri": "https://oauth2.googleapis.com/token",
-                    "redirect_uris": [self.redirect_uri]
-                }
-            },
-            scopes=self.scopes,
-            state=state
-        )
-        flow.redirect_uri = self.redirect_uri
-        flow.fetch_token(code=code)
+        flow = self._flow(state=state)
+        flow.fetch_token(code=code, timeout=HTTP_TIMEOUT_SECONDS)
         return flow.credentials
 
 # Utility functions for session management
@@ -8,7 +8,6 @@ def render_overview_page():
     st.title("Dashboard Overview")
 
     dh = DataHandler(data_dir="data")
-    data = dh.load_all_data()
 
     # KPI Metrics
     metrics = dh.get_recruitment_metrics()
@@ -25,8 +24,7 @@ def render_overview_page():
     # Notifications
     with st.container():
         try:
-            candidates_df = data['candidates']
-            open_positions = candidates_df[candidates_df['status'] == 'Open']['position'].unique()
+            open_positions = sorted(dh.candidate_cube().open_positions)
             if len(open_positions) > 0:
                 st.info(f"📢 Currently {len(open_positions)} open positions: {', '.join(open_positions)}")
         except Exception:
@@ -36,20 +34,20 @@ def render_overview_page():
     st.subheader("Filters")
     colf1, colf2, colf3 = st.columns(3)
     with colf1:
-        client_filter = st.selectbox("Filter by Client", options=["All"] + sorted([c for c in data['candidates']['client'].dropna().unique()]) if len(data['candidates']) else ["All"])
+        client_filter = st.selectbox("Filter by Client", options=["All"] + dh.options("candidates", "client"))
     with colf2:
-        status_filter = st.selectbox("Filter by Status", options=["All"] + sorted([s for s in data['candidates']['status'].dropna().unique()]) if len(data['candidates']) else ["All"])
+        status_filter = st.selectbox("Filter by Status", options=["All"] + dh.options("candidates", "status"))
     with colf3:
-        position_filter = st.selectbox("Filter by Position", options=["All"] + sorted([p for p in data['candidates']['position'].dropna().unique()]) if len(data['candidates']) else ["All"])
+        position_filter = st.selectbox("Filter by Position", options=["All"] + dh.options("candidates", "position"))
 
-    candidates_df = data['candidates'].copy()
-    if len(candidates_df):
-        if client_filter != "All":
-            candidates_df = candidates_df[candidates_df['client'] == client_filter]
-        if status_filter != "All":
-            candidates_df = candidates_df[candidates_df['status'] == status_filter]
-        if position_filter != "All":
-            candidates_df = candidates_df[candidates_df['position'] == position_filter]
+    filters = {
+        "client": None if client_filter == "All" else client_filter,
+        "status": None if status_filter == "All" else status_filter,
+        "position": None if position_filter == "All" else position_filter,
+    }
+    # Taken before reading so a concurrent write can only make the key older than the data
+    fingerprint = dh.fingerprint("candidates", filters)
+    cube = dh.candidate_cube(filters)
 
     viz = DashboardVisualizations(theme_colors={
         "primary": "#2563EB",
@@ -61,20 +59,27 @@ def render_overview_page():
 
     col1, col2 = st.columns(2)
     with col1:
-        fig_stack = viz.create_candidate_status_chart(candidates_df) if len(candidates_df) else None
+        fig_stack = viz.create_candidate_status_chart(cube, fingerprint) if cube.total else None
         if fig_stack:
             st.plotly_chart(fig_stack, use_container_width=True)
         else:
             st.empty()
     with col2:
-        fig_pie = viz.create_position_distribution_chart(candidates_df) if len(candidates_df) else None
+        fig_pie = viz.create_position_distribution_chart(cube, fingerprint) if cube.total else None
         if fig_pie:
             st.plotly_chart(fig_pie, use_container_width=True)
         else:
             st.empty()
 
     st.subheader("Interview Timeline")
-    fig_timeline = viz.create_interview_timeline(data['interviews'])
+    timeline_fingerprint = dh.fingerprint("interviews")
+    interviews_df = dh.load_interviews()
+    window = None
+    bounds = dh.date_bounds("interviews", "date")
+    if bounds is not None and bounds[0] < bounds[1]:
+        # Zooming happens server-side: narrowing the window re-buckets at finer resolution
+        window = st.slider("Timeline window", min_value=bounds[0], max_value=bounds[1], value=bounds)
+    fig_timeline = viz.create_interview_timeline(interviews_df, timeline_fingerprint, date_range=window)
     if fig_timeline:
         st.plotly_chart(fig_timeline, use_container_width=True)
 
@@ -1,25 +1,22 @@
 import streamlit as st
 import pandas as pd
 from data_handler import DataHandler
+from storage import StaleVersionError
+from table_view import paged_table
+from ingest import SCHEMAS
 
-def _filters(df: pd.DataFrame):
+def _filters(dh: DataHandler):
     col1, col2, col3 = st.columns(3)
     with col1:
-        by_client = st.selectbox("Client", options=["All"] + sorted(df['client'].dropna().unique().tolist()) if len(df) else ["All"])
+        by_client = st.selectbox("Client", options=["All"] + dh.options("candidates", "client"))
     with col2:
-        by_status = st.selectbox("Status", options=["All"] + sorted(df['status'].dropna().unique().tolist()) if len(df) else ["All"])
+        by_status = st.selectbox("Status", options=["All"] + dh.options("candidates", "status"))
     with col3:
         search = st.text_input("Search by Name/Position")
-    filtered = df.copy()
-    if len(filtered):
-        if by_client != "All":
-            filtered = filtered[filtered['client'] == by_client]
-        if by_status != "All":
-            filtered = filtered[filtered['status'] == by_status]
-        if search:
-            mask = filtered['name'].str.contains(search, case=False, na=False) | filtered['position'].str.contains(search, case=False, na=False)
-            filtered = filtered[mask]
-    return filtered
+    return search, {
+        "client": None if by_client == "All" else by_client,
+        "status": None if by_status == "All" else by_status,
+    }
 
 def _new_candidate_form(dh: DataHandler):
     st.subheader("Add Candidate")
@@ -43,13 +40,29 @@ def _new_candidate_form(dh: DataHandler):
                 })
                 st.success(f"Candidate added with ID {cid}")
 
-def _edit_delete_section(dh: DataHandler, df: pd.DataFrame):
+def _after_write(dh: DataHandler, notice):
+    """Rerun against the table version this session just wrote, so its next edit is not taken as stale"""
+    st.session_state["candidates_form_version"] = dh.table_version("candidates")
+    st.session_state["candidates_form_notice"] = notice
+    st.rerun()
+
+def _edit_delete_section(dh: DataHandler, df: pd.DataFrame, version):
     st.subheader("Edit / Delete")
+    # Submit against the version the form was last rendered from, so edits made on stale data are rejected
+    seen_version = st.session_state.get("candidates_form_version", version)
+    st.session_state["candidates_form_version"] = version
+    notice = st.session_state.pop("candidates_form_notice", None)
+    if notice:
+        st.success(notice)
     if len(df) == 0:
         st.info("No candidates to edit.")
         return
-    selected_id = st.selectbox("Select Candidate ID", options=df['id'].tolist())
-    selected_row = df[df['id'] == selected_id].iloc[0]
+    # Typed rather than picked, so the browser is not sent every id in the table
+    selected_id = st.number_input("Candidate ID", min_value=1, step=1, value=int(df['id'].iat[0]), key="candidates_edit_id")
+    selected_row = dh.get_candidate(selected_id)
+    if selected_row is None:
+        st.info(f"No candidate with ID {selected_id}.")
+        return
     with st.form("edit_candidate_form"):
         name = st.text_input("Name", selected_row['name'])
         position = st.text_input("Position", selected_row['position'])
@@ -61,36 +74,70 @@ def _edit_delete_section(dh: DataHandler, df: pd.DataFrame):
             update = st.form_submit_button("Update")
         with c2:
             delete = st.form_submit_button("Delete")
-    if update:
-        ok = dh.update_candidate(int(selected_id), {
-            "name": name,
-            "position": position,
-            "status": status,
-            "client": client,
-            "applied_date": applied_date
-        })
-        if ok:
-            st.success("Candidate updated.")
-        else:
-            st.error("Update failed.")
-    if delete:
-        # Simple delete by overwriting file without the row
-        all_df = dh.load_candidates()
-        all_df = all_df[all_df['id'] != int(selected_id)]
-        all_df.to_excel(dh.candidates_file, index=False)
-        st.success("Candidate deleted.")
+    try:
+        if update:
+            ok = dh.update_candidate(int(selected_id), {
+                "name": name,
+                "position": position,
+                "status": status,
+                "client": client,
+                "applied_date": applied_date
+            }, expected_version=seen_version)
+            if ok:
+                _after_write(dh, "Candidate updated.")
+            else:
+                st.error("Update failed.")
+        if delete:
+            if dh.delete_candidate(int(selected_id), expected_version=seen_version):
+                _after_write(dh, "Candidate deleted.")
+            else:
+                st.error("Delete failed.")
+    except StaleVersionError:
+        st.error("Candidates were changed by someone else since this form loaded. Review the latest data and try again.")
 
 def _upload_excel(dh: DataHandler):
     st.subheader("Upload Candidates Excel")
+    mode = st.radio(
+        "Upload mode",
+        ["Merge", "Replace"],
+        horizontal=True,
+        key="candidates_upload_mode",
+        help="Merge updates matching rows and adds new ones; Replace overwrites the whole table.",
+    )
+    match_on = st.selectbox(
+        "Match rows on",
+        ["Auto", "id", ", ".join(SCHEMAS["candidates"]["natural_key"])],
+        key="candidates_match_on",
+        help="Auto uses id when the workbook has an id column, otherwise the natural key.",
+    )
     up = st.file_uploader("Upload .xlsx", type=["xlsx"])
-    if up:
+    # The uploader keeps its file across reruns; ingest each upload only once
+    if up and st.session_state.get("candidates_upload_id") != up.file_id:
+        progress = st.progress(0.0, text="Reading workbook...")
+
+        def on_progress(report, total):
+            fraction = min(report.rows_read / total, 1.0) if total else 0.0
+            progress.progress(fraction, text=f"{report.rows_read:,} rows read, {report.rows_written:,} saved")
+
         try:
-            df = pd.read_excel(up)
-            # Store to "database" placeholder (Excel)
-            dh.save_candidates(df)
-            st.success("Candidates uploaded and saved.")
+            if mode == "Merge":
+                key = None if match_on == "Auto" else ("id" if match_on == "id" else SCHEMAS["candidates"]["natural_key"])
+                report = dh.merge_excel("candidates", up, key=key, on_progress=on_progress)
+            else:
+                report = dh.import_excel("candidates", up, on_progress=on_progress)
+            st.session_state["candidates_upload_id"] = up.file_id
+            progress.progress(1.0, text=report.summary())
+            st.success(f"Candidates uploaded and saved: {report.summary()}.")
+            for error in report.errors:
+                st.caption(error)
         except Exception as e:
             st.error(f"Upload failed: {e}")
+    st.download_button(
+        "Export Candidates (.xlsx)",
+        data=dh.export_excel("candidates"),
+        file_name="candidates.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
 
 # PUBLIC_INTERFACE
 def render_candidates_page():
@@ -102,14 +149,19 @@ def render_candidates_page():
     _upload_excel(dh)
 
     st.subheader("Candidates List")
-    filtered = _filters(df) if len(df) else df
-    st.dataframe(filtered, use_container_width=True)
+    if len(df):
+        search, filters = _filters(dh)
+        paged_table(dh, "candidates", "candidates_table", search, filters)
+    else:
+        st.dataframe(df, use_container_width=True)
 
     st.divider()
     col1, col2 = st.columns(2)
     with col1:
         _new_candidate_form(dh)
     with col2:
-        _edit_delete_section(dh, df)
+        # Read after this run's own upload or add, so those writes do not make the next edit look stale
+        version = dh.table_version("candidates")
+        _edit_delete_section(dh, dh.load_candidates(), version)
 
 render_candidates_page()
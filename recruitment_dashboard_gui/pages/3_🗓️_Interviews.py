@@ -1,20 +1,57 @@
+import html
+from datetime import time
+
 import streamlit as st
 import pandas as pd
 from data_handler import DataHandler
+from schedule import DEFAULT_INTERVIEW_MINUTES
+from storage import StaleVersionError
+from table_view import paged_table
 
-def _filters(df: pd.DataFrame):
+def _filters(dh: DataHandler):
     col1, col2 = st.columns(2)
     with col1:
-        by_status = st.selectbox("Status", options=["All"] + sorted(df['status'].dropna().unique().tolist()) if len(df) else ["All"])
+        by_status = st.selectbox("Status", options=["All"] + dh.options("interviews", "status"))
     with col2:
         search = st.text_input("Search by Interviewer")
-    filtered = df.copy()
-    if len(filtered):
-        if by_status != "All":
-            filtered = filtered[filtered['status'] == by_status]
-        if search:
-            filtered = filtered[filtered['interviewer'].str.contains(search, case=False, na=False)]
-    return filtered
+    return search, {"status": None if by_status == "All" else by_status}
+
+def _feedback_search(dh: DataHandler):
+    st.subheader("Search Feedback")
+    query = st.text_input("Search interview feedback", placeholder='e.g. kubernetes "system design"')
+    if not query:
+        return
+    results = dh.search_text("interviews", query)
+    if not len(results):
+        st.info("No feedback matches your search.")
+        return
+    st.caption(f"Top {len(results)} matches")
+    for row in results.itertuples():
+        date = row.date.strftime("%Y-%m-%d") if pd.notna(row.date) else "no date"
+        # Fields come from uploaded workbooks; only the snippet's <mark> tags may pass through as HTML
+        interviewer, candidate_id, status = (
+            html.escape(str(value)) for value in (row.interviewer, row.candidate_id, row.status)
+        )
+        st.markdown(
+            f"**{interviewer}** · candidate {candidate_id} · {date} · {status}  \n{row.snippet}",
+            unsafe_allow_html=True,
+        )
+
+def _slot_times(date, start_time, minutes):
+    start = pd.Timestamp.combine(date, start_time)
+    return start, start + pd.Timedelta(minutes=int(minutes))
+
+def _conflict_message(dh: DataHandler, interviewer, start, end, minutes, exclude_id=None):
+    """Warning text if the interviewer is already booked over [start, end), with free slots to pick instead"""
+    conflicts = dh.interview_conflicts(interviewer, start, end, exclude_id=exclude_id)
+    if not len(conflicts):
+        return None
+    booked = ", ".join(
+        f"#{row.id} at {row.date:%Y-%m-%d %H:%M}" for row in conflicts.head(5).itertuples()
+    )
+    slots = dh.free_interview_slots(interviewer, start.normalize(), minutes, exclude_id=exclude_id)
+    suggestions = ", ".join(f"{slot_start:%a %Y-%m-%d %H:%M}" for slot_start, _ in slots) or "none in the next two weeks"
+    return f"{interviewer} is already booked then ({booked}). Free slots: {suggestions}."
 
 def _new_interview_form(dh: DataHandler):
     st.subheader("Schedule Interview")
@@ -22,47 +59,99 @@ def _new_interview_form(dh: DataHandler):
         candidate_id = st.number_input("Candidate ID", min_value=1, step=1)
         interviewer = st.text_input("Interviewer", "")
         date = st.date_input("Date")
+        start_time = st.time_input("Start time", value=time(9, 0))
+        minutes = st.number_input("Duration (minutes)", min_value=15, max_value=480, value=DEFAULT_INTERVIEW_MINUTES, step=15)
         status = st.selectbox("Status", ["Scheduled", "Completed", "Cancelled"])
         feedback = st.text_area("Feedback", "")
         submitted = st.form_submit_button("Schedule")
         if submitted:
+            start, end = _slot_times(date, start_time, minutes)
+            conflict = _conflict_message(dh, interviewer, start, end, minutes) if status != "Cancelled" else None
             if not interviewer:
                 st.warning("Interviewer is required.")
+            elif conflict:
+                st.error(conflict)
             else:
                 iid = dh.add_interview({
                     "candidate_id": int(candidate_id),
                     "interviewer": interviewer,
-                    "date": date,
+                    "date": start,
+                    "end": end,
                     "status": status,
                     "feedback": feedback
                 })
                 st.success(f"Interview scheduled with ID {iid}")
 
-def _update_interview_form(dh: DataHandler, df: pd.DataFrame):
+def _update_interview_form(dh: DataHandler, df: pd.DataFrame, version):
     st.subheader("Update Interview")
+    # Submit against the version the form was last rendered from, so edits made on stale data are rejected
+    seen_version = st.session_state.get("interviews_form_version", version)
+    st.session_state["interviews_form_version"] = version
+    notice = st.session_state.pop("interviews_form_notice", None)
+    if notice:
+        st.success(notice)
     if len(df) == 0:
         st.info("No interviews to update.")
         return
-    selected_id = st.selectbox("Select Interview ID", options=df['id'].tolist())
-    row = df[df['id'] == selected_id].iloc[0]
+    # Typed rather than picked, so the browser is not sent every id in the table
+    selected_id = st.number_input("Interview ID", min_value=1, step=1, value=int(df['id'].iat[0]), key="interviews_edit_id")
+    row = dh.get_interview(selected_id)
+    if row is None:
+        st.info(f"No interview with ID {selected_id}.")
+        return
+    booked_start = row['date'] if pd.notna(row['date']) else pd.Timestamp.today().normalize()
+    booked_end = row.get('end')
+    booked_minutes = (
+        int((booked_end - booked_start) / pd.Timedelta(minutes=1))
+        if pd.notna(booked_end) and booked_end > booked_start else DEFAULT_INTERVIEW_MINUTES
+    )
     with st.form("edit_interview_form"):
         interviewer = st.text_input("Interviewer", row['interviewer'])
-        date = st.date_input("Date", value=row['date'])
+        date = st.date_input("Date", value=booked_start)
+        start_time = st.time_input("Start time", value=booked_start.time())
+        minutes = st.number_input("Duration (minutes)", min_value=15, max_value=480, value=min(max(booked_minutes, 15), 480), step=15)
         status = st.selectbox("Status", ["Scheduled", "Completed", "Cancelled"], index=["Scheduled", "Completed", "Cancelled"].index(row['status']) if row['status'] in ["Scheduled", "Completed", "Cancelled"] else 0)
         feedback = st.text_area("Feedback", row.get('feedback', ""))
         update = st.form_submit_button("Update")
     if update:
-        ok = dh.update_interview(int(selected_id), {
-            "interviewer": interviewer,
-            "date": date,
-            "status": status,
-            "feedback": feedback
-        })
+        start, end = _slot_times(date, start_time, minutes)
+        if status != "Cancelled":
+            conflict = _conflict_message(dh, interviewer, start, end, minutes, exclude_id=int(selected_id))
+            if conflict:
+                st.error(conflict)
+                return
+        try:
+            ok = dh.update_interview(int(selected_id), {
+                "interviewer": interviewer,
+                "date": start,
+                "end": end,
+                "status": status,
+                "feedback": feedback
+            }, expected_version=seen_version)
+        except StaleVersionError:
+            st.error("Interviews were changed by someone else since this form loaded. Review the latest data and try again.")
+            return
         if ok:
-            st.success("Interview updated.")
+            # Rerun against the version just written, so this session's next edit is not taken as stale
+            st.session_state["interviews_form_version"] = dh.table_version("interviews")
+            st.session_state["interviews_form_notice"] = "Interview updated."
+            st.rerun()
         else:
             st.error("Update failed.")
 
+def _workload_section(dh: DataHandler):
+    st.subheader("Interviewer Workload")
+    today = pd.Timestamp.today().normalize()
+    week_start = today - pd.Timedelta(days=today.weekday())
+    period = st.date_input("Period", value=(week_start, week_start + pd.Timedelta(days=6)), key="workload_period")
+    if not isinstance(period, (list, tuple)) or len(period) != 2:
+        return
+    workload = dh.interviewer_workload(pd.Timestamp(period[0]), pd.Timestamp(period[1]) + pd.Timedelta(days=1))
+    if not len(workload):
+        st.info("No interviews booked in this period.")
+        return
+    st.dataframe(workload.round({"hours": 1}), use_container_width=True, hide_index=True)
+
 # PUBLIC_INTERFACE
 def render_interviews_page():
     """Render the Interviews page with filters and add/edit functionality."""
@@ -70,14 +159,24 @@ def render_interviews_page():
     dh = DataHandler(data_dir="data")
     df = dh.load_interviews()
     st.subheader("Interviews List")
-    filtered = _filters(df) if len(df) else df
-    st.dataframe(filtered, use_container_width=True)
+    if len(df):
+        search, filters = _filters(dh)
+        paged_table(dh, "interviews", "interviews_table", search, filters)
+    else:
+        st.dataframe(df, use_container_width=True)
+
+    _feedback_search(dh)
 
     st.divider()
     col1, col2 = st.columns(2)
     with col1:
         _new_interview_form(dh)
     with col2:
-        _update_interview_form(dh, df)
+        # Read after this run's own add, so it does not make the next edit look stale
+        version = dh.table_version("interviews")
+        _update_interview_form(dh, dh.load_interviews(), version)
+
+    st.divider()
+    _workload_section(dh)
 
 render_interviews_page()
@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
 from data_handler import DataHandler
+from ingest import SCHEMAS
 
 # PUBLIC_INTERFACE
 def render_clients_page():
@@ -10,15 +10,48 @@ def render_clients_page():
     df = dh.load_clients()
 
     st.subheader("Upload Clients Excel")
+    mode = st.radio(
+        "Upload mode",
+        ["Merge", "Replace"],
+        horizontal=True,
+        key="clients_upload_mode",
+        help="Merge updates matching rows and adds new ones; Replace overwrites the whole table.",
+    )
+    match_on = st.selectbox(
+        "Match rows on",
+        ["Auto", "id", ", ".join(SCHEMAS["clients"]["natural_key"])],
+        key="clients_match_on",
+        help="Auto uses id when the workbook has an id column, otherwise the natural key.",
+    )
     up = st.file_uploader("Upload .xlsx", type=["xlsx"], key="clients_upload")
-    if up:
+    # The uploader keeps its file across reruns; ingest each upload only once
+    if up and st.session_state.get("clients_upload_id") != up.file_id:
+        progress = st.progress(0.0, text="Reading workbook...")
+
+        def on_progress(report, total):
+            fraction = min(report.rows_read / total, 1.0) if total else 0.0
+            progress.progress(fraction, text=f"{report.rows_read:,} rows read, {report.rows_written:,} saved")
+
         try:
-            new_df = pd.read_excel(up)
-            dh.save_clients(new_df)
-            st.success("Clients uploaded and saved.")
-            df = new_df
+            if mode == "Merge":
+                key = None if match_on == "Auto" else ("id" if match_on == "id" else SCHEMAS["clients"]["natural_key"])
+                report = dh.merge_excel("clients", up, key=key, on_progress=on_progress)
+            else:
+                report = dh.import_excel("clients", up, on_progress=on_progress)
+            st.session_state["clients_upload_id"] = up.file_id
+            progress.progress(1.0, text=report.summary())
+            st.success(f"Clients uploaded and saved: {report.summary()}.")
+            for error in report.errors:
+                st.caption(error)
+            df = dh.load_clients()
         except Exception as e:
             st.error(f"Upload failed: {e}")
+    st.download_button(
+        "Export Clients (.xlsx)",
+        data=dh.export_excel("clients"),
+        file_name="clients.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
 
     st.subheader("Clients List")
     if len(df):
@@ -28,9 +61,7 @@ def render_clients_page():
             name_search = st.text_input("Search by Client Name")
         with col2:
             min_positions = st.number_input("Min Active Positions", min_value=0, step=1, value=0)
-        filtered = df.copy()
-        if name_search:
-            filtered = filtered[filtered['name'].str.contains(name_search, case=False, na=False)]
+        filtered = dh.search_rows("clients", name_search)
         if 'active_positions' in filtered.columns:
             filtered = filtered[filtered['active_positions'] >= min_positions]
         st.dataframe(filtered, use_container_width=True)
@@ -46,17 +77,12 @@ def render_clients_page():
         total_hires = st.number_input("Total Hires", min_value=0, step=1)
         submitted = st.form_submit_button("Save")
     if submitted:
-        base = dh.load_clients()
-        new_id = int(base['id'].max() + 1) if 'id' in base.columns and len(base) else 1
-        row = {
-            "id": new_id,
+        dh.add_client({
             "name": name,
             "industry": industry,
             "active_positions": active_positions,
             "total_hires": total_hires
-        }
-        base = pd.concat([base, pd.DataFrame([row])], ignore_index=True)
-        dh.save_clients(base)
+        })
         st.success("Client saved.")
 
 render_clients_page()
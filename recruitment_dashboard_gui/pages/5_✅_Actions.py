@@ -1,46 +1,90 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
 from data_handler import DataHandler
+from polling import poll_if_active, request_poll
+from report_view import report_export
+from sync_engine import sync_runs, target_from_env
+from notification_view import notify_action
+from notifications import REMINDER_WINDOW_DAYS, recipients_from_env, reminder_messages
+from deadlines import sla_rules_from_env
 
-def _deadlines_section(candidates: pd.DataFrame):
+# Upcoming deadlines listed on the page; the count covers all of them
+DEADLINE_ROWS = 500
+
+def _deadlines_section(dh):
     st.subheader("Upcoming Deadlines")
-    # Placeholder: Assuming 'applied_date' + 14 days as follow-up deadline
-    if len(candidates) == 0:
+    if dh.candidate_cube().total == 0:
         st.info("No candidates data.")
         return
-    df = candidates.copy()
-    df['applied_date'] = pd.to_datetime(df['applied_date'], errors='coerce')
-    df['follow_up_deadline'] = df['applied_date'] + pd.to_timedelta(14, unit="D")
-    upcoming = df[(df['follow_up_deadline'] >= datetime.now()) & (df['follow_up_deadline'] <= datetime.now() + timedelta(days=7))]
-    if len(upcoming):
-        for _, r in upcoming.iterrows():
-            st.warning(f"⏰ Follow-up due for {r['name']} ({r['position']}) by {r['follow_up_deadline'].date()} - Client: {r['client']}")
+    days = st.slider("Next days", min_value=1, max_value=60, value=REMINDER_WINDOW_DAYS)
+    now = datetime.now()
+    upcoming = dh.follow_up_deadlines(now, now + timedelta(days=days))
+    rules = ", ".join(
+        f"{'other statuses' if status == '*' else status}: {f'{sla} days' if sla is not None else 'none'}"
+        for status, sla in sla_rules_from_env().items()
+    )
+    st.caption(f"Follow-up SLA after applying — {rules}")
+    if not len(upcoming):
+        st.success(f"No upcoming deadlines within next {days} days.")
+        return
+    st.warning(f"⏰ {len(upcoming):,} follow-ups due within the next {days} days")
+    columns = [col for col in ['follow_up_deadline', 'name', 'position', 'client', 'status'] if col in upcoming.columns]
+    st.dataframe(
+        upcoming[columns].head(DEADLINE_ROWS),
+        hide_index=True,
+        use_container_width=True,
+        column_config={"follow_up_deadline": st.column_config.DateColumn("Due")},
+    )
+    if len(upcoming) > DEADLINE_ROWS:
+        st.caption(f"Showing the {DEADLINE_ROWS} soonest.")
+
+def _sync_to_warehouse(dh):
+    if st.button("Sync to Snowflake"):
+        try:
+            st.session_state["sync_run"] = sync_runs.start(dh, target_from_env(dh.data_dir))
+        except Exception as e:
+            st.error(f"Could not connect to the warehouse: {e}")
+    run = st.session_state.get("sync_run")
+    if run is None:
+        return
+    summary = "; ".join(
+        f"{table}: unchanged" if stats["skipped"]
+        else f"{table}: {stats['upserted']} upserted, {stats['deleted']} deleted"
+        for table, stats in run.stats.items()
+    )
+    if run.status == "failed":
+        st.error(f"Sync failed: {run.error}" + (f" ({summary})" if summary else ""))
+    elif run.status == "done":
+        st.success(f"Synced. {summary}")
     else:
-        st.success("No upcoming deadlines within next 7 days.")
+        st.info(f"Syncing… {summary}")
+        request_poll()
 
-def _automation_hooks():
-    st.subheader("Automation Hooks (Placeholders)")
-    st.caption("These actions are placeholders for future integrations (e.g., Snowflake, notifications, ATS API).")
+def _automation_hooks(dh):
+    st.subheader("Automation Hooks")
+    st.caption("Each action runs in the background; its progress shows below the button.")
     col1, col2, col3 = st.columns(3)
     with col1:
-        if st.button("Sync to Snowflake"):
-            st.info("Snowflake sync initiated (placeholder).")
+        _sync_to_warehouse(dh)
     with col2:
-        if st.button("Send Reminder Emails"):
-            st.info("Reminder emails queued (placeholder).")
+        notify_action(dh, "reminder", "Send Reminder Emails", "reminders", lambda: [
+            message
+            for recipient in recipients_from_env("NOTIFY_REMINDER_TO", "recruiting@example.com")
+            for message in reminder_messages(
+                dh.follow_up_deadlines(datetime.now(), datetime.now() + timedelta(days=REMINDER_WINDOW_DAYS)), recipient
+            )
+        ])
     with col3:
-        if st.button("Export Reports"):
-            st.info("Report export generated (placeholder).")
+        report_export(dh, "actions_reports")
 
 # PUBLIC_INTERFACE
 def render_actions_page():
-    """Render the Actions page displaying dynamic notifications and automation placeholders."""
+    """Render the Actions page: upcoming follow-up deadlines and automation hooks."""
     st.title("Actions")
     dh = DataHandler(data_dir="data")
-    data = dh.load_all_data()
-    _deadlines_section(data['candidates'])
+    _deadlines_section(dh)
     st.divider()
-    _automation_hooks()
+    _automation_hooks(dh)
+    poll_if_active()
 
 render_actions_page()
@@ -0,0 +1,27 @@
+import time
+
+import streamlit as st
+
+# How often a page showing a running background job polls for progress
+POLL_SECONDS = 1.0
+
+# Session state flag set by widgets whose background job is still running
+_POLL_KEY = "_poll_requested"
+
+
+# PUBLIC_INTERFACE
+def request_poll():
+    """Ask for the page to refresh once it has finished rendering, because a background job is still running"""
+    st.session_state[_POLL_KEY] = True
+
+
+# PUBLIC_INTERFACE
+def poll_if_active():
+    """Call last on a page: if any widget requested a poll during this run, wait POLL_SECONDS and rerun.
+
+    Widgets only record the request, so every column and section still
+    renders before the page sleeps; one rerun then refreshes them all.
+    """
+    if st.session_state.pop(_POLL_KEY, False):
+        time.sleep(POLL_SECONDS)
+        st.rerun()
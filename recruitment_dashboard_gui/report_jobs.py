@@ -0,0 +1,278 @@
+import html
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import types
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from metrics import compute_recruitment_metrics
+from visualizations import DashboardVisualizations
+
+REPORT_FORMATS = ("xlsx", "parquet", "html")
+
+# Finished jobs kept (with their artifacts) before the oldest are removed
+REPORT_JOBS_KEEP = 20
+
+# Client label for candidates (and their interviews) without a client
+UNASSIGNED = "Unassigned"
+
+REPORT_THEME = {
+    "primary": "#2563EB",
+    "secondary": "#F59E0B",
+    "success": "#F59E0B",
+    "error": "#EF4444",
+    "text": "#111827",
+}
+
+
+# PUBLIC_INTERFACE
+class ReportJob:
+    """State of one report export, updated by its coordinator thread and read by the UI"""
+
+    def __init__(self, key, formats, root):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.formats = formats
+        self.directory = Path(root) / self.id
+        self.status = "queued"
+        self.done = 0
+        self.total = 0
+        self.artifact = None
+        self.error = None
+        self.created = time.time()
+
+    @property
+    def progress(self):
+        """Fraction of steps completed, 0.0 to 1.0"""
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+
+# PUBLIC_INTERFACE
+class ReportJobs:
+    """Process-wide registry of report export jobs shared by every Streamlit session.
+
+    A job builds one report per client in a pool of worker processes, so a
+    large export neither blocks the script thread nor competes with it for
+    the GIL, then zips the per-client files into one artifact. Jobs are keyed
+    on the store, the versions of the tables they read and the formats, so
+    repeated requests for unchanged data share one job.
+    """
+
+    def __init__(self, max_workers, keep=REPORT_JOBS_KEEP):
+        self.max_workers = max_workers
+        self.keep = keep
+        self._jobs = {}
+        self._by_key = {}
+        self._pool = None
+        self._lock = threading.RLock()
+
+    def submit(self, dh, formats=REPORT_FORMATS):
+        """Start a report export for the current data, or return the job already building it"""
+        formats = tuple(sorted(set(formats)))
+        unknown = set(formats) - set(REPORT_FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown report format: {', '.join(sorted(unknown))}")
+        # Versions are read before the data, so a concurrent write can only make the key older than the data
+        versions = tuple(dh.table_version(table) for table in ("candidates", "interviews"))
+        key = (dh.storage.identity, versions, formats)
+        with self._lock:
+            job = self._by_key.get(key)
+            if job is not None and job.status != "failed":
+                return job
+            job = ReportJob(key, formats, Path(dh.data_dir) / "reports")
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self._prune()
+        thread = threading.Thread(
+            target=self._run, args=(job, dh.load_candidates(), dh.load_interviews()), daemon=True
+        )
+        thread.start()
+        return job
+
+    def get(self, job_id):
+        """Return a job by id, or None if unknown or pruned"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, candidates, interviews):
+        job.status = "running"
+        out_dir = job.directory
+        try:
+            out_dir.mkdir(parents=True, exist_ok=True)
+            parts = list(_split_by_client(candidates, interviews))
+            # One step per client plus packaging
+            job.total = len(parts) + 1
+            pool = self._executor()
+            slugs = _slugs([client for client, _, _ in parts])
+            # Workers are started on submit
+            with self._lock, _plain_main():
+                futures = [
+                    pool.submit(build_client_report, client, slug, client_candidates, client_interviews,
+                                job.formats, str(out_dir))
+                    for (client, client_candidates, client_interviews), slug in zip(parts, slugs)
+                ]
+            files = []
+            for future in as_completed(futures):
+                files.extend(future.result())
+                job.done += 1
+            artifact = out_dir / f"recruitment_reports_{job.id}.zip"
+            with zipfile.ZipFile(artifact, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+                for name in sorted(files):
+                    bundle.write(out_dir / name, arcname=name)
+                    (out_dir / name).unlink()
+            job.artifact = artifact
+            job.done += 1
+            job.status = "done"
+        except BrokenProcessPool as exc:
+            with self._lock:
+                self._pool = None
+            self._fail(job, exc)
+        except Exception as exc:
+            self._fail(job, exc)
+
+    def _fail(self, job, exc):
+        job.error = str(exc) or type(exc).__name__
+        job.status = "failed"
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a threaded server process can deadlock the children
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in sorted(finished, key=lambda job: job.created)[:max(0, len(self._jobs) - self.keep)]:
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+            shutil.rmtree(job.directory, ignore_errors=True)
+
+
+# PUBLIC_INTERFACE
+def build_client_report(client, slug, candidates, interviews, formats, out_dir):
+    """Write one client's report in each format to out_dir, named after slug; returns the file names.
+
+    Runs in a worker process, so it only takes picklable arguments.
+    """
+    metrics = compute_recruitment_metrics(candidates, interviews)
+    written = []
+    if "xlsx" in formats:
+        name = f"{slug}.xlsx"
+        with pd.ExcelWriter(Path(out_dir) / name, engine="openpyxl") as writer:
+            _summary(client, metrics, candidates).to_excel(writer, sheet_name="Summary", index=False)
+            candidates.to_excel(writer, sheet_name="Candidates", index=False)
+            interviews.to_excel(writer, sheet_name="Interviews", index=False)
+        written.append(name)
+    if "parquet" in formats:
+        for table, df in (("candidates", candidates), ("interviews", interviews)):
+            name = f"{slug}_{table}.parquet"
+            df.to_parquet(Path(out_dir) / name, index=False)
+            written.append(name)
+    if "html" in formats:
+        name = f"{slug}.html"
+        (Path(out_dir) / name).write_text(_html_report(client, metrics, candidates, interviews), encoding="utf-8")
+        written.append(name)
+    return written
+
+
+@contextmanager
+def _plain_main():
+    """Swap in an empty __main__ while worker processes start.
+
+    spawn re-runs the parent's __main__ file in each new worker; under
+    Streamlit that is the page script, which would run once per worker.
+    """
+    main = sys.modules.get("__main__")
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _split_by_client(candidates, interviews):
+    """Yield (client, candidates, interviews) with interviews assigned through their candidate"""
+    if "client" in candidates.columns:
+        clients = candidates["client"].astype(object).fillna(UNASSIGNED)
+    else:
+        clients = pd.Series(UNASSIGNED, index=candidates.index, dtype=object)
+    if len(interviews) and "candidate_id" in interviews.columns and "id" in candidates.columns:
+        owner = interviews["candidate_id"].map(pd.Series(clients.to_numpy(), index=candidates["id"].to_numpy()))
+        interview_clients = owner.fillna(UNASSIGNED)
+    else:
+        interview_clients = pd.Series(UNASSIGNED, index=interviews.index, dtype=object)
+    for client in sorted(set(clients) | set(interview_clients)):
+        yield (
+            client,
+            candidates[(clients == client).to_numpy()].reset_index(drop=True),
+            interviews[(interview_clients == client).to_numpy()].reset_index(drop=True),
+        )
+
+
+def _slugs(clients):
+    """File-name-safe, unique names for the clients"""
+    slugs = []
+    for client in clients:
+        base = re.sub(r"[^A-Za-z0-9]+", "_", str(client)).strip("_") or "client"
+        slug, n = base, 1
+        while slug in slugs:
+            n += 1
+            slug = f"{base}_{n}"
+        slugs.append(slug)
+    return slugs
+
+
+def _summary(client, metrics, candidates):
+    rows = [("Client", client)] + [(name.replace("_", " ").title(), value) for name, value in metrics.items()]
+    if "status" in candidates.columns:
+        counts = candidates["status"].value_counts(sort=False)
+        rows += [(f"Status: {status}", int(count)) for status, count in counts.items() if count]
+    return pd.DataFrame(rows, columns=["Metric", "Value"])
+
+
+def _html_report(client, metrics, candidates, interviews):
+    """Standalone HTML page: KPIs, charts with plotly.js inlined once, and the raw tables"""
+    viz = DashboardVisualizations(REPORT_THEME)
+    figures = [
+        viz.create_candidate_status_chart(candidates),
+        viz.create_position_distribution_chart(candidates),
+        viz.create_recruitment_funnel(candidates),
+        viz.create_interview_timeline(interviews),
+    ]
+    charts = []
+    for fig in (fig for fig in figures if fig is not None):
+        charts.append(fig.to_html(full_html=False, include_plotlyjs="inline" if not charts else False))
+    summary = _summary(client, metrics, candidates).to_html(index=False, border=0)
+    title = html.escape(f"Recruitment report — {client}")
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{title}</title>"
+        "<style>body{font-family:sans-serif;margin:2rem;color:#111827}"
+        "table{border-collapse:collapse;margin-bottom:2rem}td,th{padding:4px 8px;border-bottom:1px solid #e5e7eb}"
+        "</style></head><body>"
+        f"<h1>{title}</h1>{summary}{''.join(charts)}"
+        f"<h2>Candidates</h2>{candidates.to_html(index=False, border=0)}"
+        f"<h2>Interviews</h2>{interviews.to_html(index=False, border=0)}"
+        "</body></html>"
+    )
+
+
+report_jobs = ReportJobs(max_workers=int(os.getenv("REPORT_WORKERS", "2")))
@@ -0,0 +1,30 @@
+import streamlit as st
+
+from polling import request_poll
+from report_jobs import report_jobs
+
+
+# PUBLIC_INTERFACE
+def report_export(dh, key, label="Export Reports"):
+    """Render a button starting a background report export, its progress, and a download when done.
+
+    The job id lives in session state under `key`; pressing the button again
+    while the data is unchanged rejoins the same job.
+    """
+    if st.button(label, key=f"{key}_button"):
+        st.session_state[f"{key}_job"] = report_jobs.submit(dh).id
+    job = report_jobs.get(st.session_state.get(f"{key}_job"))
+    if job is None:
+        return
+    if job.status == "failed":
+        st.error(f"Report export failed: {job.error}")
+    elif job.status == "done":
+        with open(job.artifact, "rb") as artifact:
+            st.download_button(
+                "Download reports", data=artifact, file_name=job.artifact.name,
+                mime="application/zip", key=f"{key}_download",
+            )
+    else:
+        st.progress(job.progress, text=f"Building reports… {job.done}/{job.total or '?'} steps")
+        # Refresh progress once the rest of the page has rendered
+        request_poll()
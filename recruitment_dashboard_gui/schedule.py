@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+
+from indexes import changed_rows
+
+# Length assumed for interviews stored without an end time
+DEFAULT_INTERVIEW_MINUTES = 60
+
+# Interview statuses that do not occupy the interviewer's calendar
+FREE_STATUSES = {"Cancelled"}
+
+# Working hours [start, end) in which free slots are suggested, on weekdays
+WORKDAY_HOURS = (9, 17)
+
+# How many days ahead free slot suggestions look
+SLOT_SEARCH_DAYS = 14
+
+# Candidate bands up to this many interviews are scanned rather than searched in the tree
+SCAN_BAND_ROWS = 256
+
+
+# PUBLIC_INTERFACE
+class ScheduleIndex:
+    """Per-interviewer interval index over a cached interviews frame.
+
+    Each interviewer has aligned arrays of interview ids, starts and ends
+    ordered by start, with a segment tree of the latest end over that order
+    (see _Calendar), so a conflict check costs O(log n) per overlapping
+    interview even when one long booking spans the interviewer's whole
+    history. Updates rebuild the calendars of the interviewers they touch
+    and share the rest.
+    """
+
+    def __init__(self, frame, key="id"):
+        self.key = key
+        self.calendars = {
+            interviewer: _Calendar(ids, starts, ends)
+            for interviewer, (ids, starts, ends) in _intervals(frame, key).items()
+        }
+
+    def __len__(self):
+        return sum(len(calendar.ids) for calendar in self.calendars.values())
+
+    def interviewers(self):
+        return sorted(self.calendars)
+
+    def overlapping(self, interviewer, start, end, exclude_id=None):
+        """(ids, starts, ends) of the interviewer's interviews overlapping [start, end), by start"""
+        calendar = self.calendars.get(str(interviewer))
+        if calendar is None:
+            return _empty()
+        ids, starts, ends = calendar.overlapping(_ns(start), _ns(end))
+        if exclude_id is not None:
+            keep = ids != int(exclude_id)
+            ids, starts, ends = ids[keep], starts[keep], ends[keep]
+        return ids, starts, ends
+
+    def free_slots(self, interviewer, after, minutes=DEFAULT_INTERVIEW_MINUTES, limit=5, exclude_id=None):
+        """Up to limit free (start, end) slots of the given length in working hours, from after onwards"""
+        length = np.timedelta64(int(minutes), "m")
+        after = pd.Timestamp(after)
+        slots = []
+        for day in pd.bdate_range(after.normalize(), periods=SLOT_SEARCH_DAYS):
+            opens = max(day + pd.Timedelta(hours=WORKDAY_HOURS[0]), after)
+            closes = day + pd.Timedelta(hours=WORKDAY_HOURS[1])
+            cursor = _ns(opens)
+            _, starts, ends = self.overlapping(interviewer, opens, closes, exclude_id)
+            for busy_start, busy_end in zip(starts, ends):
+                if busy_start - cursor >= length:
+                    slots.append((cursor, cursor + length))
+                cursor = max(cursor, busy_end)
+            if _ns(closes) - cursor >= length:
+                slots.append((cursor, cursor + length))
+            if len(slots) >= limit:
+                break
+        return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in slots[:limit]]
+
+    def workload(self, start, end):
+        """Interview count and booked hours per interviewer within [start, end)"""
+        lo, hi = _ns(start), _ns(end)
+        rows = []
+        for interviewer, calendar in self.calendars.items():
+            _, starts, ends = calendar.overlapping(lo, hi)
+            if len(starts):
+                booked = np.minimum(ends, hi) - np.maximum(starts, lo)
+                rows.append((interviewer, len(starts), booked.sum() / np.timedelta64(1, "h")))
+        workload = pd.DataFrame(rows, columns=["interviewer", "interviews", "hours"])
+        return workload.sort_values(["hours", "interviewer"], ascending=[False, True], ignore_index=True)
+
+    def update(self, frame, changes, previous):
+        old, new = changed_rows(previous, frame, changes, self.key)
+        changed_ids = [int(row_id) for _, row_id, _ in changes]
+        incoming = _intervals(new, self.key)
+        touched = set(incoming)
+        if "interviewer" in old.columns:
+            touched.update(old["interviewer"].dropna().astype(str))
+        index = ScheduleIndex.__new__(ScheduleIndex)
+        index.key = self.key
+        index.calendars = dict(self.calendars)
+        for interviewer in touched:
+            calendar = self.calendars.get(interviewer)
+            ids, starts, ends = incoming.get(interviewer, _empty())
+            if calendar is not None:
+                keep = ~np.isin(calendar.ids, changed_ids)
+                ids = np.concatenate([calendar.ids[keep], ids])
+                starts = np.concatenate([calendar.starts[keep], starts])
+                ends = np.concatenate([calendar.ends[keep], ends])
+            if len(ids):
+                index.calendars[interviewer] = _Calendar(ids, starts, ends)
+            else:
+                index.calendars.pop(interviewer, None)
+        return index
+
+
+class _Calendar:
+    """One interviewer's interviews ordered by start, with a max-end segment tree over that order.
+
+    As in an augmented interval tree, each node holds the latest end among
+    the interviews below it. A query descends only into nodes that begin
+    before the window ends and whose latest end passes its start, so it
+    costs O(log n) per interview reported however long the bookings are.
+    Narrow bands, the common case, are scanned directly instead.
+    """
+
+    def __init__(self, ids, starts, ends):
+        order = np.argsort(starts, kind="stable")
+        self.ids, self.starts, self.ends = ids[order], starts[order], ends[order]
+        self.max_ends = np.maximum.accumulate(self.ends)
+        self.levels = _max_tree(self.ends.view("int64"))
+
+    def overlapping(self, start, end):
+        # Everything before lo ends by start; everything from hi on starts at or after end
+        lo = np.searchsorted(self.max_ends, start, side="right")
+        hi = np.searchsorted(self.starts, end, side="left")
+        if hi - lo <= SCAN_BAND_ROWS:
+            rows = np.arange(lo, max(lo, hi))
+            rows = rows[self.ends[rows] > start]
+        else:
+            rows = self._descend(lo, hi, start.astype("int64"))
+        return self.ids[rows], self.starts[rows], self.ends[rows]
+
+    def _descend(self, lo, hi, start):
+        """Positions in [lo, hi) whose end is after start, in order, walking the tree level by level"""
+        # Start at the level where the band spans about SCAN_BAND_ROWS nodes; node n at a
+        # given depth covers positions [n << depth, (n + 1) << depth)
+        depth = min(len(self.levels) - 1, max(0, int(hi - lo) // SCAN_BAND_ROWS).bit_length())
+        nodes = np.arange(lo >> depth, ((hi - 1) >> depth) + 1)
+        while True:
+            level = self.levels[depth]
+            nodes = nodes[level[nodes] > start]
+            if not depth:
+                break
+            depth -= 1
+            nodes = (2 * nodes[:, None] + _CHILDREN).ravel()
+            nodes = nodes[nodes < len(self.levels[depth])]
+        # Leaves outside the band can only be at its two ends
+        return nodes[(nodes >= lo) & (nodes < hi)]
+
+
+_CHILDREN = np.array([0, 1])
+
+
+def _max_tree(values):
+    """Levels of a max segment tree over values, leaves first; each level pairs up the one below"""
+    levels = [values]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        if len(level) % 2:
+            level = np.append(level, np.iinfo(np.int64).min)
+        levels.append(level.reshape(-1, 2).max(axis=1))
+    return levels
+
+
+def _intervals(frame, key):
+    """{interviewer: (ids, starts, ends)} for interviews that occupy the calendar"""
+    if not len(frame) or not {key, "interviewer", "date"} <= set(frame.columns):
+        return {}
+    starts = pd.to_datetime(frame["date"], errors="coerce")
+    ends = pd.to_datetime(frame["end"], errors="coerce") if "end" in frame.columns else pd.Series(pd.NaT, index=frame.index)
+    ends = ends.where(ends > starts, starts + pd.Timedelta(minutes=DEFAULT_INTERVIEW_MINUTES))
+    valid = starts.notna() & frame["interviewer"].notna()
+    if "status" in frame.columns:
+        valid &= ~frame["status"].astype(object).isin(FREE_STATUSES)
+    rows = pd.DataFrame({
+        "interviewer": frame["interviewer"].astype(object)[valid].astype(str),
+        "id": frame[key][valid].astype("int64"),
+        "start": starts[valid].astype("datetime64[ns]"),
+        "end": ends[valid].astype("datetime64[ns]"),
+    })
+    return {
+        interviewer: (group["id"].to_numpy(), group["start"].to_numpy(), group["end"].to_numpy())
+        for interviewer, group in rows.groupby("interviewer", sort=False)
+    }
+
+
+def _empty():
+    return np.array([], dtype=np.int64), np.array([], dtype="datetime64[ns]"), np.array([], dtype="datetime64[ns]")
+
+
+def _ns(value):
+    return np.datetime64(pd.Timestamp(value), "ns")
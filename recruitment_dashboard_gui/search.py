@@ -0,0 +1,324 @@
+import html
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from indexes import ChunkedMap, changed_rows
+
+
+# PUBLIC_INTERFACE
+class SubstringIndex:
+    """Case-insensitive substring and prefix search over text columns of a cached table.
+
+    Each distinct lower-cased value keeps the set of row ids holding it, and
+    every trigram of a value points back to the value. A query of three or
+    more characters only checks the values sharing all of its trigrams;
+    shorter queries scan the distinct values. Both maps are ChunkedMaps: an
+    update shares them with the previous version and copies only the chunks
+    and row-id sets of the values it touches.
+    """
+
+    def __init__(self, frame, columns, key="id"):
+        self.key = key
+        self.columns = [col for col in columns if col in frame.columns]
+        self.postings = {col: ChunkedMap() for col in self.columns}
+        self.grams = {col: ChunkedMap() for col in self.columns}
+        if key not in frame.columns:
+            return
+        ids = frame[key].tolist()
+        for col in self.columns:
+            postings, grams = {}, {}
+            for row_id, value in zip(ids, _normalize(frame[col]).tolist()):
+                if isinstance(value, str):
+                    postings.setdefault(value, set()).add(row_id)
+            for value in postings:
+                for gram in _trigrams(value):
+                    grams.setdefault(gram, set()).add(value)
+            self.postings[col], self.grams[col] = ChunkedMap(postings), ChunkedMap(grams)
+
+    def search(self, query, columns=None, limit=None):
+        """Row ids whose columns contain query, best match first.
+
+        Exact matches rank before prefix matches, then matches at the start
+        of a word, then other substrings; shorter values rank first within
+        each group.
+        """
+        query = str(query).strip().lower()
+        if not query:
+            return []
+        word = f" {query}"
+        matched = sorted(
+            (_match_kind(value, query, word), len(value), value, col)
+            for col in columns or self.columns
+            for value in self._matches(col, query)
+        )
+        ranked = []
+        for *_, value, col in matched:
+            ranked.extend(sorted(self.postings[col][value]))
+        # A row matching several columns keeps its first (best) position
+        ranked = list(dict.fromkeys(ranked))
+        return ranked[:limit] if limit is not None else ranked
+
+    def _matches(self, col, query):
+        if len(query) < 3:
+            return [value for value in self.postings[col] if query in value]
+        grams = self.grams[col]
+        candidates = None
+        for gram in sorted(_trigrams(query), key=lambda gram: len(grams.get(gram, ()))):
+            found = grams.get(gram)
+            if not found:
+                return []
+            candidates = set(found) if candidates is None else candidates & found
+        return [value for value in candidates if query in value]
+
+    def update(self, frame, changes, previous):
+        index = SubstringIndex.__new__(SubstringIndex)
+        index.key = self.key
+        index.columns = self.columns
+        index.postings = dict(self.postings)
+        index.grams = dict(self.grams)
+        old, new = changed_rows(previous, frame, changes, self.key)
+        for col in self.columns:
+            # Rows whose value in this column is unchanged need no posting changes
+            before = dict(zip(old[self.key].tolist(), _normalize(old[col]).tolist()))
+            after = dict(zip(new[self.key].tolist(), _normalize(new[col]).tolist()))
+            removed = [(row_id, value) for row_id, value in before.items() if after.get(row_id, np.nan) != value]
+            added = [(row_id, value) for row_id, value in after.items() if before.get(row_id, np.nan) != value]
+            if not removed and not added:
+                continue
+            copied = set()
+            postings = index.postings[col] = self.postings[col].copy()
+            grams = index.grams[col] = self.grams[col].copy()
+            for row_id, value in removed:
+                if pd.isna(value) or value not in postings:
+                    continue
+                rows = _copy_once(postings, value, copied)
+                rows.discard(row_id)
+                if not rows:
+                    del postings[value]
+                    for gram in _trigrams(value):
+                        remaining = grams[gram] - {value}
+                        if remaining:
+                            grams[gram] = remaining
+                        else:
+                            del grams[gram]
+            for row_id, value in added:
+                if pd.isna(value):
+                    continue
+                if value not in postings:
+                    for gram in _trigrams(value):
+                        grams[gram] = grams.get(gram, set()) | {value}
+                _copy_once(postings, value, copied).add(row_id)
+        return index
+
+
+# PUBLIC_INTERFACE
+class FullTextIndex:
+    """Inverted index with BM25 ranking over one free-text column of a cached table.
+
+    Postings map each term to {row id: term frequency}. Queries combine bare
+    terms (any may match, ranked by BM25) with quoted phrases (all must match,
+    checked against the stored text). The term, length and text maps are
+    ChunkedMaps, so an update copies only the chunks and postings of the rows
+    and terms it touches. Per-term arrays used for vectorized scoring are
+    cached until that term's postings are next copied; the cache is shared by
+    every version of the index.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, frame, column, key="id"):
+        self.key = key
+        self.column = column
+        self.postings = ChunkedMap()
+        self.lengths = ChunkedMap()
+        self.texts = ChunkedMap()
+        self.total_length = 0
+        self._cache = {}
+        if key not in frame.columns or column not in frame.columns:
+            return
+        # Filled as plain dicts, then chunked once
+        self.postings, self.lengths, self.texts = {}, {}, {}
+        created = set()
+        for row_id, text in zip(frame[key].tolist(), frame[column].tolist()):
+            self._add(row_id, text, created)
+        self.postings = ChunkedMap(self.postings)
+        self.lengths = ChunkedMap(self.lengths)
+        self.texts = ChunkedMap(self.texts)
+
+    def search(self, query, limit=50):
+        """Return [(row id, score)] for the query, best first"""
+        terms, phrases = parse_query(query)
+        required = {term for phrase in phrases for term in phrase}
+        parts = []
+        for term in set(terms) | required:
+            arrays = self._arrays(term)
+            if arrays is None:
+                if term in required:
+                    return []
+                continue
+            parts.append((term, arrays))
+        if not parts:
+            return []
+        ids = np.concatenate([arrays[0] for _, arrays in parts])
+        scores = np.concatenate([self._bm25(*arrays) for _, arrays in parts])
+        ids, inverse = np.unique(ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=scores)
+        for term, arrays in parts:
+            if term in required:
+                keep = np.isin(ids, arrays[0], assume_unique=True)
+                ids, scores = ids[keep], scores[keep]
+        if limit is not None and not phrases and len(ids) > limit:
+            # Keep every row tied with the limit-th score so ties still break on id
+            top = scores >= np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            ids, scores = ids[top], scores[top]
+        patterns = [_phrase_pattern(phrase) for phrase in phrases]
+        hits = []
+        for pos in np.lexsort((ids, -scores)):
+            row_id = int(ids[pos])
+            if all(pattern.search(self.texts[row_id]) for pattern in patterns):
+                hits.append((row_id, round(float(scores[pos]), 4)))
+                if limit is not None and len(hits) >= limit:
+                    break
+        return hits
+
+    def _arrays(self, term):
+        """(row ids, term frequencies, document lengths) of a term, cached until its postings change"""
+        postings = self.postings.get(term)
+        if not postings:
+            return None
+        cached = self._cache.get(term)
+        if cached is None or cached[0] is not postings:
+            arrays = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings)),
+                np.fromiter((self.lengths[row_id] for row_id in postings), dtype=np.float64, count=len(postings)),
+            )
+            cached = self._cache[term] = (postings, arrays)
+        return cached[1]
+
+    def _bm25(self, ids, tf, lengths):
+        docs = len(self.lengths)
+        idf = np.log(1 + (docs - len(ids) + 0.5) / (len(ids) + 0.5))
+        norm = self.K1 * (1 - self.B + self.B * lengths / (self.total_length / docs))
+        return idf * tf * (self.K1 + 1) / (tf + norm)
+
+    def update(self, frame, changes, previous):
+        index = FullTextIndex.__new__(FullTextIndex)
+        index.key, index.column = self.key, self.column
+        if self.column not in frame.columns:
+            return None
+        index.postings = self.postings.copy()
+        index.lengths = self.lengths.copy()
+        index.texts = self.texts.copy()
+        index.total_length = self.total_length
+        # Entries are checked against the postings they were built from, so versions can share them
+        index._cache = self._cache
+        old, new = changed_rows(previous, frame, changes, self.key)
+        copied = set()
+        for row_id in old[self.key].tolist():
+            index._remove(row_id, copied)
+        for row_id, text in zip(new[self.key].tolist(), new[self.column].tolist()):
+            index._add(row_id, text, copied)
+        return index
+
+    def _add(self, row_id, text, copied):
+        counts = Counter(tokenize(text)) if isinstance(text, str) else None
+        if not counts:
+            return
+        for term, tf in counts.items():
+            _copy_term(self.postings, term, copied)[row_id] = tf
+        self.lengths[row_id] = sum(counts.values())
+        self.texts[row_id] = text
+        self.total_length += self.lengths[row_id]
+
+    def _remove(self, row_id, copied):
+        text = self.texts.pop(row_id, None)
+        if text is None:
+            return
+        for term in set(tokenize(text)):
+            postings = _copy_term(self.postings, term, copied)
+            postings.pop(row_id, None)
+            if not postings:
+                del self.postings[term]
+                copied.discard(term)
+        self.total_length -= self.lengths.pop(row_id)
+
+
+# PUBLIC_INTERFACE
+def tokenize(text):
+    """Lower-cased word tokens of a text"""
+    return _TOKEN.findall(str(text).lower())
+
+
+# PUBLIC_INTERFACE
+def parse_query(query):
+    """Split a query into (bare terms, quoted phrases as token lists)"""
+    query = str(query)
+    phrases = [tokens for tokens in map(tokenize, _PHRASE.findall(query)) if tokens]
+    return tokenize(_PHRASE.sub(" ", query)), phrases
+
+
+# PUBLIC_INTERFACE
+def highlight(text, query, width=160):
+    """HTML-escaped snippet of text around the first query match, with matches in <mark>"""
+    text = str(text)
+    terms, phrases = parse_query(query)
+    words = set(terms) | {term for phrase in phrases for term in phrase}
+    if not words:
+        return html.escape(text[:width])
+    pattern = re.compile(r"\b(" + "|".join(sorted(map(re.escape, words), key=len, reverse=True)) + r")\b", re.IGNORECASE)
+    first = pattern.search(text)
+    start = max(0, (first.start() if first else 0) - width // 3)
+    window = text[start:start + width]
+    parts = []
+    last = 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        last = match.end()
+    parts.append(html.escape(window[last:]))
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(text) else ""
+    return prefix + "".join(parts) + suffix
+
+
+_TOKEN = re.compile(r"\w+")
+_PHRASE = re.compile(r'"([^"]*)"')
+
+
+def _phrase_pattern(tokens):
+    """Regex matching the tokens consecutively, as tokenize() would split them"""
+    return re.compile(r"(?<!\w)" + r"\W+".join(map(re.escape, tokens)) + r"(?!\w)", re.IGNORECASE)
+
+
+def _copy_term(postings, term, copied):
+    if term not in copied:
+        postings[term] = dict(postings.get(term, {}))
+        copied.add(term)
+    return postings[term]
+
+
+def _normalize(values):
+    text = values.astype(object)
+    return text.where(text.isna(), text.astype(str).str.strip().str.lower())
+
+
+def _trigrams(value):
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+def _match_kind(value, query, word):
+    if value.startswith(query):
+        return 0 if len(value) == len(query) else 1
+    return 2 if word in value else 3
+
+
+def _copy_once(postings, value, copied):
+    if value not in copied:
+        postings[value] = set(postings.get(value, ()))
+        copied.add(value)
+    return postings[value]
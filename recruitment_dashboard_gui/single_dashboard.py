@@ -1,5 +1,10 @@
 import streamlit as st
 from datetime import datetime
+from data_handler import DataHandler
+from polling import poll_if_active
+from report_view import report_export
+from notification_view import notify_action
+from notifications import recipients_from_env, stakeholder_messages
 
 # PUBLIC_INTERFACE
 def init_theme():
@@ -248,18 +253,19 @@ def render_tabs():
     with tabs[3]:
         st.subheader("Action")
         st.markdown('<div class="panel">', unsafe_allow_html=True)
-        st.markdown("##### Quick Actions (Mock)")
+        st.markdown("##### Quick Actions")
+        dh = DataHandler(data_dir="data")
         c1, c2, c3 = st.columns(3, gap="large")
         with c1:
-            if st.button("Export Report"):
-                st.info("Export initiated (placeholder).")
+            report_export(dh, "tabs_reports", label="Export Report")
         with c2:
             if st.button("Refresh Data"):
                 st.success("Data refreshed (placeholder).")
         with c3:
-            if st.button("Notify Stakeholders"):
-                st.warning("Notifications queued (placeholder).")
-        st.caption("These are placeholders. No backend actions are performed.")
+            notify_action(dh, "stakeholders", "Notify Stakeholders", "stakeholders", lambda: stakeholder_messages(
+                dh.candidate_cube(), recipients_from_env("NOTIFY_STAKEHOLDERS", "stakeholders@example.com")
+            ))
+        st.caption("Refresh is a placeholder; reports and notifications use the live data.")
         st.markdown('</div>', unsafe_allow_html=True)
 
 # PUBLIC_INTERFACE
@@ -270,6 +276,7 @@ def main():
     render_kpis()
     render_placeholder_charts()
     render_tabs()
+    poll_if_active()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,803 @@
+import json
+import logging
+import sqlite3
+import threading
+from bisect import bisect_right
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Tables with a compaction running in the background: {(store identity, table)}
+_compacting = set()
+_compacting_lock = threading.Lock()
+_compacted = threading.Condition(_compacting_lock)
+
+
+# PUBLIC_INTERFACE
+class StaleVersionError(ValueError):
+    """A write expected a table version that another writer has since moved past."""
+
+    def __init__(self, table, expected, current):
+        super().__init__(f"{table} changed since version {expected} (now {current})")
+        self.table = table
+        self.expected = expected
+        self.current = current
+
+
+class StorageBackend:
+    """Base class for table storage used by DataHandler."""
+
+    @property
+    def identity(self):
+        """Stable key identifying this store across DataHandler instances"""
+        raise NotImplementedError
+
+    def has_table(self, name):
+        """Return True if the table exists in storage"""
+        raise NotImplementedError
+
+    def table_version(self, name):
+        """Return a counter bumped on every write to the table, or None if it does not exist"""
+        raise NotImplementedError
+
+    def read_table(self, name, parse_dates=None):
+        """Read a whole table into a DataFrame"""
+        raise NotImplementedError
+
+    def read_chunks(self, name, after=None, chunk_rows=5000, first_rows=None, parse_dates=None):
+        """Yield the table's rows with id greater than after, in id order, as DataFrame chunks.
+
+        Every chunk comes from the same table version. The first chunk holds
+        up to first_rows rows (default chunk_rows) and later ones double up
+        to chunk_rows; an empty chunk is never yielded.
+        """
+        raise NotImplementedError
+
+    def read_rows(self, name, ids, parse_dates=None):
+        """Rows with the given ids, in id order; ids that do not exist are skipped"""
+        raise NotImplementedError
+
+    def write_table(self, name, df):
+        """Replace a table with the contents of a DataFrame"""
+        raise NotImplementedError
+
+    def append_journal(self, name, entries):
+        """Append (op, row_id, payload) entries to the table's write log; returns the new version"""
+        return self.append_journals({name: entries})[name]
+
+    def append_journals(self, changes, expected_versions=None):
+        """Append {table: entries} atomically across tables; returns {table: new version}.
+
+        With expected_versions ({table: version}), nothing is written and
+        StaleVersionError is raised unless every listed table is still at
+        that version when the write lock is held.
+        """
+        raise NotImplementedError
+
+    def compact(self, name):
+        """Fold the write log into the base table.
+
+        Also prunes the change log through the lowest consumer checkpoint, or
+        entirely when the table has no consumers.
+        """
+        raise NotImplementedError
+
+    def replace_table(self, name, chunks):
+        """Replace a table with DataFrame chunks written one at a time, swapped in atomically"""
+        raise NotImplementedError
+
+    def dictionary(self, name, column, values=()):
+        """Return the column's value dictionary in code order, first appending any unseen values.
+
+        Codes are assigned once and never change, so categorical encodings stay
+        stable across saves, uploads and restarts.
+        """
+        raise NotImplementedError
+
+    def allocate_ids(self, name, count=1):
+        """Reserve count new ids from the table's persistent sequence; returns the first one"""
+        raise NotImplementedError
+
+    def changes(self, name, after=0, through_version=None):
+        """Return [(seq, row_id)] of rows changed after change sequence number `after`, in order.
+
+        A row_id of None means the whole table was rewritten. Only changes up
+        to through_version are listed, when given.
+        """
+        raise NotImplementedError
+
+    def acknowledge_changes(self, consumer, name, seq):
+        """Record that consumer has read the table's change log through seq.
+
+        Entries every consumer of the table has read past are pruned.
+        """
+        raise NotImplementedError
+
+    def changes_pruned_through(self, name):
+        """Return the highest change sequence number pruned from the table's log (0 if none)"""
+        raise NotImplementedError
+
+
+# PUBLIC_INTERFACE
+class SQLiteStorage(StorageBackend):
+    """Embedded SQLite storage; one database file holds every table.
+
+    Single-row inserts, updates and deletes go to an append-only journal table
+    next to each base table. Reads merge base and journal; once the journal
+    reaches compact_threshold entries it is folded into the base table on a
+    background thread.
+    Every write also lists the ids it touched in a change log that survives
+    compaction, for change-data-capture consumers; entries are pruned once
+    every consumer has acknowledged them, and by compaction when there are no
+    consumers at all.
+    """
+
+    def __init__(self, path, compact_threshold=1000):
+        self.path = Path(path)
+        self.compact_threshold = compact_threshold
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _table_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS _sequences (name TEXT PRIMARY KEY, next_id INTEGER NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _dictionaries (name TEXT NOT NULL, col TEXT NOT NULL, "
+                "code INTEGER NOT NULL, value TEXT NOT NULL, PRIMARY KEY (name, col, value))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "name TEXT NOT NULL, version INTEGER NOT NULL, row_id INTEGER)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS _changes__name ON _changes (name, seq)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _change_consumers (consumer TEXT NOT NULL, name TEXT NOT NULL, "
+                "seq INTEGER NOT NULL, PRIMARY KEY (consumer, name))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS _changes_pruned (name TEXT PRIMARY KEY, seq INTEGER NOT NULL)")
+
+    @property
+    def identity(self):
+        return str(self.path.resolve())
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return _closing(conn)
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    @contextmanager
+    def _snapshot(self):
+        """Read transaction so base and journal are seen at the same point in time."""
+        with self._connect() as conn:
+            conn.execute("BEGIN")
+            try:
+                yield conn
+            finally:
+                conn.execute("COMMIT")
+
+    def has_table(self, name):
+        with self._connect() as conn:
+            return table_exists(conn, name)
+
+    def table_version(self, name):
+        with self._connect() as conn:
+            return self._version(conn, name)
+
+    def _version(self, conn, name):
+        row = conn.execute("SELECT version FROM _table_versions WHERE name = ?", (name,)).fetchone()
+        if row:
+            return row[0]
+        # Tables written before versioning existed start at version 0
+        return 0 if table_exists(conn, name) else None
+
+    def _bump_version(self, conn, name, row_ids=None):
+        """Bump the table version and log the changed ids (None: every row) under it"""
+        conn.execute(
+            "INSERT INTO _table_versions (name, version) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+            (name,),
+        )
+        version = self._version(conn, name)
+        conn.executemany(
+            "INSERT INTO _changes (name, version, row_id) VALUES (?, ?, ?)",
+            [(name, version, row_id) for row_id in (row_ids if row_ids is not None else [None])],
+        )
+        return version
+
+    def changes(self, name, after=0, through_version=None):
+        query = "SELECT seq, row_id FROM _changes WHERE name = ? AND seq > ?"
+        params = [name, int(after)]
+        if through_version is not None:
+            query += " AND version <= ?"
+            params.append(int(through_version))
+        with self._connect() as conn:
+            return conn.execute(query + " ORDER BY seq", params).fetchall()
+
+    def acknowledge_changes(self, consumer, name, seq):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO _change_consumers (consumer, name, seq) VALUES (?, ?, ?) "
+                "ON CONFLICT(consumer, name) DO UPDATE SET seq = MAX(seq, excluded.seq)",
+                (consumer, name, int(seq)),
+            )
+            self._prune_changes(conn, name)
+
+    def _prune_changes(self, conn, name):
+        """Drop change log entries every consumer has read; all of them if nobody consumes the table"""
+        floor = conn.execute("SELECT MIN(seq) FROM _change_consumers WHERE name = ?", (name,)).fetchone()[0]
+        if floor is None:
+            floor = conn.execute("SELECT MAX(seq) FROM _changes WHERE name = ?", (name,)).fetchone()[0]
+            if floor is None:
+                return
+        conn.execute("DELETE FROM _changes WHERE name = ? AND seq <= ?", (name, floor))
+        conn.execute(
+            "INSERT INTO _changes_pruned (name, seq) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET seq = MAX(seq, excluded.seq)",
+            (name, floor),
+        )
+
+    def changes_pruned_through(self, name):
+        with self._connect() as conn:
+            row = conn.execute("SELECT seq FROM _changes_pruned WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def read_table(self, name, parse_dates=None):
+        with self._snapshot() as conn:
+            df = self._read(conn, name)
+        return parse_date_columns(df, parse_dates)
+
+    def read_chunks(self, name, after=None, chunk_rows=5000, first_rows=None, parse_dates=None):
+        # Keyset reads on the id index inside one read transaction: memory is bounded by the
+        # chunk plus the write log, which compaction keeps near compact_threshold entries
+        with self._snapshot() as conn:
+            if not table_exists(conn, name):
+                return
+            table = quote_identifier(name)
+            entries = self._journal_entries(conn, name)
+            columns = _result_columns(_columns(conn, name), entries)
+            if "id" not in columns:
+                chunk = parse_date_columns(self._read(conn, name), parse_dates)
+                if len(chunk):
+                    yield chunk
+                return
+            logged = _entries_by_id(entries)
+            pending = sorted(logged)
+            size = min(first_rows or chunk_rows, chunk_rows)
+            while True:
+                where = "WHERE id > ? " if after is not None else ""
+                params = ([int(after)] if after is not None else []) + [size]
+                chunk = pd.read_sql_query(f"SELECT * FROM {table} {where}ORDER BY id LIMIT ?", conn, params=params)
+                done = len(chunk) < size
+                upper = None if done else int(chunk["id"].iat[-1])
+                lo = bisect_right(pending, after) if after is not None else 0
+                hi = len(pending) if upper is None else bisect_right(pending, upper)
+                if hi > lo:
+                    chunk = _apply_logged(chunk, logged, pending[lo:hi])
+                chunk = parse_date_columns(chunk.reindex(columns=columns), parse_dates)
+                if len(chunk):
+                    yield chunk
+                if done:
+                    return
+                after, size = upper, min(size * 2, chunk_rows)
+
+    def read_rows(self, name, ids, parse_dates=None):
+        ids = sorted({int(row_id) for row_id in ids})
+        with self._snapshot() as conn:
+            if not table_exists(conn, name):
+                return pd.DataFrame()
+            entries = self._journal_entries(conn, name)
+            columns = _result_columns(_columns(conn, name), entries)
+            table = quote_identifier(name)
+            parts = [
+                pd.read_sql_query(
+                    f"SELECT * FROM {table} WHERE id IN ({_placeholders(batch)})", conn, params=batch
+                )
+                for batch in (ids[i:i + _MAX_PARAMS] for i in range(0, len(ids), _MAX_PARAMS))
+            ]
+        rows = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+        logged = _entries_by_id(entries)
+        touched = [row_id for row_id in ids if row_id in logged]
+        if touched:
+            rows = _apply_logged(rows, logged, touched)
+        return parse_date_columns(rows.reindex(columns=columns), parse_dates)
+
+    def write_table(self, name, df):
+        with self._transaction() as conn:
+            self._write(conn, name, df)
+            if table_exists(conn, _journal(name)):
+                conn.execute(f'DELETE FROM {quote_identifier(_journal(name))}')
+            self._bump_version(conn, name)
+
+    def append_journals(self, changes, expected_versions=None):
+        versions, sizes = {}, {}
+        with self._transaction() as conn:
+            for name, expected in (expected_versions or {}).items():
+                current = self._version(conn, name)
+                if current != expected:
+                    raise StaleVersionError(name, expected, current)
+            for name, entries in changes.items():
+                conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS {quote_identifier(_journal(name))} '
+                    "(seq INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT NOT NULL, row_id INTEGER NOT NULL, payload TEXT)"
+                )
+                conn.executemany(
+                    f'INSERT INTO {quote_identifier(_journal(name))} (op, row_id, payload) VALUES (?, ?, ?)',
+                    [(op, int(row_id), json.dumps(payload, default=_json_default)) for op, row_id, payload in entries],
+                )
+                inserted = [int(row_id) for op, row_id, _ in entries if op == "insert"]
+                if inserted:
+                    # Rows inserted with caller-supplied ids must not be handed out again
+                    conn.execute(
+                        "INSERT INTO _sequences (name, next_id) VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET next_id = MAX(next_id, excluded.next_id)",
+                        (name, max(inserted) + 1),
+                    )
+                touched = list(dict.fromkeys(int(row_id) for _, row_id, _ in entries))
+                versions[name] = self._bump_version(conn, name, touched)
+                sizes[name] = conn.execute(f'SELECT COUNT(*) FROM {quote_identifier(_journal(name))}').fetchone()[0]
+        for name, size in sizes.items():
+            if size >= self.compact_threshold:
+                self._compact_in_background(name)
+        return versions
+
+    def _compact_in_background(self, name):
+        """Compact on a background thread, off the writer's request path; one at a time per table"""
+        key = (self.identity, name)
+        with _compacting_lock:
+            if key in _compacting:
+                return
+            _compacting.add(key)
+        threading.Thread(target=self._run_compaction, args=(key, name), daemon=True).start()
+
+    def _run_compaction(self, key, name):
+        try:
+            self.compact(name)
+        except Exception:
+            # The journal is left as it was; the next write past the threshold tries again
+            logger.exception("Compacting %s failed", name)
+        finally:
+            with _compacted:
+                _compacting.discard(key)
+                _compacted.notify_all()
+
+    def wait_for_compaction(self, name, timeout=None):
+        """Block until no background compaction of the table is running; returns False on timeout"""
+        key = (self.identity, name)
+        with _compacted:
+            return _compacted.wait_for(lambda: key not in _compacting, timeout)
+
+    def allocate_ids(self, name, count=1):
+        # Committed before the rows are written, so a crash leaves a gap but never reuses an id
+        with self._transaction() as conn:
+            row = conn.execute("SELECT next_id FROM _sequences WHERE name = ?", (name,)).fetchone()
+            first = row[0] if row else self._max_id(conn, name) + 1
+            conn.execute(
+                "INSERT INTO _sequences (name, next_id) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET next_id = excluded.next_id",
+                (name, first + count),
+            )
+        return first
+
+    def _max_id(self, conn, name):
+        max_id = 0
+        if table_exists(conn, name) and "id" in _columns(conn, name):
+            max_id = conn.execute(f'SELECT COALESCE(MAX(id), 0) FROM {quote_identifier(name)}').fetchone()[0]
+        if table_exists(conn, _journal(name)):
+            journal = quote_identifier(_journal(name))
+            max_id = max(max_id, conn.execute(f"SELECT COALESCE(MAX(row_id), 0) FROM {journal}").fetchone()[0])
+        return int(max_id)
+
+    def compact(self, name):
+        # Content is unchanged, so the table version (and cached frames) stay valid
+        with self._transaction() as conn:
+            # A consumer registering later sees the pruned mark and starts with a full read
+            self._prune_changes(conn, name)
+            if not table_exists(conn, _journal(name)):
+                return
+            self._write(conn, name, self._read(conn, name))
+            conn.execute(f'DELETE FROM {quote_identifier(_journal(name))}')
+
+    def replace_table(self, name, chunks):
+        # Each chunk is committed into a staging table so memory and lock time
+        # stay bounded; readers keep seeing the old table until the final swap.
+        staging = f"{name}__staging"
+        with self._transaction() as conn:
+            conn.execute(f'DROP TABLE IF EXISTS {quote_identifier(staging)}')
+        columns = None
+        try:
+            for chunk in chunks:
+                with self._transaction() as conn:
+                    if columns is None:
+                        columns = list(chunk.columns)
+                        self._create(conn, staging, chunk)
+                    if len(chunk):
+                        conn.executemany(
+                            f"INSERT INTO {quote_identifier(staging)} ({_column_list(columns)}) "
+                            f"VALUES ({_placeholders(columns)})",
+                            to_records(chunk[columns]),
+                        )
+            with self._transaction() as conn:
+                conn.execute(f'DROP TABLE IF EXISTS {quote_identifier(name)}')
+                conn.execute(f'DROP INDEX IF EXISTS {quote_identifier(staging + "__pk")}')
+                conn.execute(f'ALTER TABLE {quote_identifier(staging)} RENAME TO {quote_identifier(name)}')
+                self._index(conn, name, columns)
+                if table_exists(conn, _journal(name)):
+                    conn.execute(f'DELETE FROM {quote_identifier(_journal(name))}')
+                self._bump_version(conn, name)
+        except BaseException:
+            with self._transaction() as conn:
+                conn.execute(f'DROP TABLE IF EXISTS {quote_identifier(staging)}')
+            raise
+
+    def dictionary(self, name, column, values=()):
+        query = "SELECT value FROM _dictionaries WHERE name = ? AND col = ? ORDER BY code"
+        with self._connect() as conn:
+            known = [row[0] for row in conn.execute(query, (name, column))]
+        unseen = [value for value in dict.fromkeys(str(v) for v in values) if value not in set(known)]
+        if not unseen:
+            return known
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO _dictionaries (name, col, code, value) VALUES (?, ?, "
+                "(SELECT COALESCE(MAX(code), -1) + 1 FROM _dictionaries WHERE name = ? AND col = ?), ?)",
+                [(name, column, name, column, value) for value in unseen],
+            )
+            return [row[0] for row in conn.execute(query, (name, column))]
+
+    def _read(self, conn, name):
+        if table_exists(conn, name):
+            df = pd.read_sql_query(f'SELECT * FROM {quote_identifier(name)} ORDER BY rowid', conn)
+        else:
+            df = pd.DataFrame()
+        entries = self._journal_entries(conn, name)
+        return apply_journal(df, entries) if entries else df
+
+    def _journal_entries(self, conn, name):
+        """The table's write log as (op, row_id, payload) entries, oldest first"""
+        if not table_exists(conn, _journal(name)):
+            return []
+        journal = quote_identifier(_journal(name))
+        rows = conn.execute(f"SELECT op, row_id, payload FROM {journal} ORDER BY seq").fetchall()
+        return [(op, row_id, json.loads(payload)) for op, row_id, payload in rows]
+
+    def _write(self, conn, name, df):
+        self._create(conn, name, df)
+        if len(df.columns):
+            conn.executemany(
+                f'INSERT INTO {quote_identifier(name)} VALUES ({_placeholders(df.columns)})', to_records(df)
+            )
+        self._index(conn, name, df.columns)
+
+    def _create(self, conn, name, df):
+        columns = ", ".join(f'{quote_identifier(col)} {sql_type(df[col])}' for col in df.columns)
+        conn.execute(f'DROP TABLE IF EXISTS {quote_identifier(name)}')
+        conn.execute(f'CREATE TABLE {quote_identifier(name)} ({columns})')
+        if "id" in df.columns:
+            # Enforce the primary key while rows are written
+            conn.execute(f'CREATE UNIQUE INDEX {quote_identifier(name + "__pk")} ON {quote_identifier(name)} (id)')
+
+    def _index(self, conn, name, columns):
+        if "id" in columns:
+            conn.execute(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS {quote_identifier(name + "__pk")} ON {quote_identifier(name)} (id)'
+            )
+            # Keep the sequence ahead of imported ids
+            conn.execute(
+                "INSERT INTO _sequences (name, next_id) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET next_id = MAX(next_id, excluded.next_id)",
+                (name, self._max_id(conn, name) + 1),
+            )
+
+
+# PUBLIC_INTERFACE
+def apply_journal(df, entries, key="id", locate=None):
+    """Return df with journal entries applied in order.
+
+    Entries are (op, row_id, payload) with op one of "insert" (payload is the
+    full row), "update" (payload holds only the changed fields) or "delete".
+    Entries are folded per row first, then applied one column at a time.
+
+    Without deletes the result shares every untouched column with df and
+    copies each written column once; df itself is never modified.
+    locate(row_id) -> position or None (e.g. KeyIndex.locate) finds updated
+    rows without scanning the key column.
+    """
+    changes = {}  # row_id -> (is_full_row, fields or None when deleted)
+    for op, row_id, payload in entries:
+        if op == "delete":
+            changes[row_id] = (False, None)
+        elif op == "insert":
+            changes[row_id] = (True, dict(payload))
+        else:
+            full, fields = changes.get(row_id, (False, {}))
+            if fields is None:
+                continue
+            changes[row_id] = (full, {**fields, **payload})
+
+    replaced = set(changes)
+    updates = {row_id: fields for row_id, (full, fields) in changes.items() if fields is not None and not full}
+    inserts = [fields for full, fields in changes.values() if full]
+    if all(fields is not None for _, fields in changes.values()):
+        patched = _patch(df, updates, inserts, key, locate)
+        if patched is not None:
+            return patched
+
+    out = df
+    if len(df) and key in df.columns:
+        keep = ~df[key].isin(replaced) | df[key].isin(updates.keys())
+        # Renumbered so the result is positional again and later writes can be patched
+        out = df.take(np.flatnonzero(keep.to_numpy())).reset_index(drop=True)
+        if updates:
+            out = out.set_index(key, drop=False)
+            columns = {}
+            for row_id, fields in updates.items():
+                if row_id in out.index:
+                    for col, value in fields.items():
+                        columns.setdefault(col, {})[row_id] = value
+            for col, values in columns.items():
+                series = pd.Series(values)
+                if col in out.columns:
+                    if isinstance(out[col].dtype, pd.CategoricalDtype):
+                        out[col] = _with_categories(out[col], series)
+                        series = series.astype(out[col].dtype)
+                    elif pd.api.types.is_datetime64_any_dtype(out[col]):
+                        series = pd.to_datetime(series, errors="coerce", format="mixed")
+                    elif series.dtype != out[col].dtype:
+                        common = _common_dtype(out[col].dtype, series.dtype)
+                        out[col] = out[col].astype(common)
+                        series = series.astype(common)
+                out.loc[list(values), col] = series
+            out = out.reset_index(drop=True)
+    if inserts:
+        new_rows = pd.DataFrame(inserts)
+        for col in new_rows.columns:
+            if col in out.columns and isinstance(out[col].dtype, pd.CategoricalDtype):
+                out[col] = _with_categories(out[col], new_rows[col])
+                new_rows[col] = new_rows[col].astype(out[col].dtype)
+            elif col in out.columns and pd.api.types.is_datetime64_any_dtype(out[col]):
+                new_rows[col] = pd.to_datetime(new_rows[col], errors="coerce", format="mixed")
+        out = pd.concat([out, new_rows], ignore_index=True) if len(out) else new_rows
+    return out
+
+
+def _patch(df, updates, inserts, key, locate):
+    """apply_journal without deletes, touching only the columns and rows written; None if it does not apply"""
+    index = df.index
+    if not len(df) or key not in df.columns or not isinstance(index, pd.RangeIndex) or index.start or index.step != 1:
+        return None
+    ids = df[key].to_numpy()
+    located = _locate(ids, list(updates) + [fields.get(key) for fields in inserts], locate)
+    if located is None or any(pos is not None for pos in located[len(updates):]):
+        return None  # an inserted id is already present: it replaces that row
+    new_rows = pd.DataFrame(inserts) if inserts else pd.DataFrame()
+    if not set(new_rows.columns).union(*updates.values()) <= set(df.columns):
+        return None  # a write adds a column
+    columns = {}
+    for col in df.columns:
+        positions, values = [], []
+        for pos, fields in zip(located, updates.values()):
+            if pos is not None and col in fields:
+                positions.append(pos)
+                values.append(fields[col])
+        appended = new_rows[col].tolist() if col in new_rows.columns else None
+        if not positions and not inserts:
+            columns[col] = df[col]
+            continue
+        column = _patch_column(df[col], positions, values, appended, len(inserts))
+        if column is None:
+            return None
+        columns[col] = column
+    return pd.DataFrame(columns, copy=False)
+
+
+def _locate(ids, row_ids, locate):
+    """Positions of row_ids in ids (None where absent), found via locate when given"""
+    if locate is None:
+        found = pd.Index(ids).get_indexer(pd.Index(row_ids, dtype=object))
+        return [int(pos) if pos >= 0 else None for pos in found]
+    positions = []
+    for row_id in row_ids:
+        try:
+            pos = locate(row_id) if row_id is not None else None
+        except (TypeError, ValueError):
+            return None
+        # Trust the index only where it agrees with this frame
+        positions.append(pos if pos is not None and pos < len(ids) and ids[pos] == row_id else None)
+    return positions
+
+
+def _patch_column(series, positions, values, appended, count):
+    """Copy of series with values written at positions and count rows appended (NA where appended is None)"""
+    # Rows inserted without this column get NA, as pd.concat would give them
+    incoming = values + (appended if appended is not None else [np.nan] * count)
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = series.array.codes
+        new = pd.Series(incoming, dtype=object)
+        unseen = pd.Index(new.dropna().astype(str).unique()).difference(dtype.categories)
+        categories = dtype.categories.append(unseen) if len(unseen) else dtype.categories
+        if len(categories) > np.iinfo(codes.dtype).max:
+            return None
+        dtype = pd.CategoricalDtype(categories, ordered=dtype.ordered)
+        new = new.astype(dtype).cat.codes.to_numpy()
+
+        def build(array):
+            return pd.Series(pd.Categorical.from_codes(array, dtype=dtype, validate=False), name=series.name, copy=False)
+    elif dtype == np.dtype("datetime64[ns]"):
+        codes = np.asarray(series.array)
+        new = pd.to_datetime(pd.Series(incoming, dtype=object), errors="coerce", format="mixed")
+        if new.dtype != dtype:
+            return None
+        new = new.to_numpy()
+
+        def build(array):
+            return pd.Series(array, name=series.name, copy=False)
+    elif isinstance(dtype, np.dtype) and dtype.kind in "biufO":
+        codes = series.to_numpy()
+        if appended is None and count and dtype.kind not in "fO":
+            return None  # missing values would change the column's dtype
+        new = pd.Series(incoming)
+        if len(new) and new.dtype != dtype and _common_dtype(dtype, new.dtype) != dtype:
+            return None
+        new = new.to_numpy(dtype=dtype)
+
+        def build(array):
+            return pd.Series(array, name=series.name, copy=False)
+    else:
+        return None
+    rows = len(codes)
+    # Always a fresh buffer: older versions of the frame still read the current one
+    buffer = np.empty(rows + count, dtype=codes.dtype)
+    buffer[:rows] = codes
+    buffer[positions] = new[: len(positions)]
+    buffer[rows:] = new[len(positions):]
+    return build(buffer)
+
+
+def _with_categories(column, values):
+    """Extend a categorical column with any new values, keeping existing codes"""
+    unseen = pd.Index(values.dropna().astype(str).unique()).difference(column.cat.categories)
+    return column.cat.add_categories(unseen) if len(unseen) else column
+
+
+def _common_dtype(current, incoming):
+    """dtype a column must take to hold patched values without a lossy cast"""
+    numeric = pd.api.types.is_numeric_dtype
+    if numeric(current) and numeric(incoming) and not pd.api.types.is_bool_dtype(current):
+        try:
+            return np.result_type(current, incoming)
+        except TypeError:
+            pass
+    return np.dtype(object)
+
+
+# PUBLIC_INTERFACE
+def parse_date_columns(df, columns):
+    """Coerce the given columns to datetimes where present"""
+    for col in columns or []:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors="coerce", format="mixed")
+    return df
+
+
+# PUBLIC_INTERFACE
+def encode_categoricals(df, dictionaries):
+    """Convert {column: dictionary} columns to categoricals whose codes follow the dictionary"""
+    for col, values in dictionaries.items():
+        if col not in df.columns:
+            continue
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            if list(df[col].cat.categories) != list(values):
+                df[col] = df[col].cat.set_categories(values)
+        else:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str)).astype(pd.CategoricalDtype(values))
+    return df
+
+
+def _journal(name):
+    return f"{name}__journal"
+
+
+# Ids bound per IN (...) query, below SQLite's default variable limit
+_MAX_PARAMS = 500
+
+
+def _entries_by_id(entries):
+    """{row_id: that row's journal entries, oldest first}"""
+    logged = {}
+    for entry in entries:
+        logged.setdefault(int(entry[1]), []).append(entry)
+    return logged
+
+
+def _apply_logged(rows, logged, row_ids):
+    """rows (in id order) with the journal entries of row_ids applied, back in id order"""
+    entries = [entry for row_id in row_ids for entry in logged[row_id]]
+    return apply_journal(rows, entries).sort_values("id", kind="stable", ignore_index=True)
+
+
+def _result_columns(columns, entries):
+    """Base table columns followed by any new columns the write log adds, as a full read returns them"""
+    columns = list(columns)
+    for op, _, payload in entries:
+        if op != "delete":
+            columns.extend(col for col in payload if col not in columns)
+    return columns
+
+
+# PUBLIC_INTERFACE
+def table_exists(conn, name):
+    """True if a SQLite connection's database has the table"""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+
+# PUBLIC_INTERFACE
+def quote_identifier(name):
+    """Double-quoted SQL identifier with embedded quotes doubled, safe for uploaded column names"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _column_list(columns):
+    return ", ".join(quote_identifier(col) for col in columns)
+
+
+def _placeholders(columns):
+    return ", ".join("?" for _ in columns)
+
+
+def _columns(conn, name):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({quote_identifier(name)})')]
+
+
+def _json_default(value):
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+@contextmanager
+def _closing(conn):
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+# PUBLIC_INTERFACE
+def sql_type(series):
+    """SQLite column type for a pandas column"""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(series):
+        return "REAL"
+    return "TEXT"
+
+
+# PUBLIC_INTERFACE
+def to_records(df):
+    """Rows as tuples of plain Python values for sqlite3; dates as ISO text, missing values as None"""
+    out = df.copy()
+    for col in out.columns:
+        if pd.api.types.is_datetime64_any_dtype(out[col]):
+            out[col] = out[col].dt.strftime("%Y-%m-%d %H:%M:%S")
+    out = out.astype(object).where(out.notna(), None)
+    return list(out.itertuples(index=False, name=None))
@@ -0,0 +1,385 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+import pandas as pd
+
+from storage import quote_identifier, sql_type, table_exists, to_records
+
+# Tables pushed to the warehouse
+SYNC_TABLES = ("candidates", "interviews", "clients")
+
+# Changed rows sent per upsert batch; a checkpoint is written with each batch
+SYNC_BATCH_ROWS = 5000
+
+# Attempts per batch before a sync run gives up (its checkpoints are kept)
+SYNC_RETRIES = 3
+SYNC_BACKOFF_SECONDS = 0.5
+
+
+class WarehouseTarget:
+    """Base class for warehouses the sync engine pushes to.
+
+    Every write is an idempotent upsert keyed on id, so a batch replayed after
+    a failure leaves the target as if it had been applied once. Checkpoints
+    live in the target itself, next to the data they describe.
+    """
+
+    @property
+    def identity(self):
+        """Stable key identifying this target, for deduplicating sync runs"""
+        raise NotImplementedError
+
+    def checkpoint(self, table):
+        """Return the last checkpoint dict stored for the table, or None"""
+        raise NotImplementedError
+
+    def apply(self, table, rows, deleted_ids, checkpoint=None):
+        """Upsert rows and delete ids, then store checkpoint (if given) only once they are written"""
+        raise NotImplementedError
+
+    def ids(self, table):
+        """Return the set of ids currently held for the table"""
+        raise NotImplementedError
+
+
+# PUBLIC_INTERFACE
+class SQLiteTarget(WarehouseTarget):
+    """Local warehouse stand-in: one SQLite file, each batch committed with its checkpoint."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _sync_checkpoints (name TEXT PRIMARY KEY, checkpoint TEXT NOT NULL)"
+            )
+
+    @property
+    def identity(self):
+        return f"sqlite:{self.path.resolve()}"
+
+    def _connect(self):
+        return closing(sqlite3.connect(self.path, timeout=30, isolation_level=None))
+
+    def checkpoint(self, table):
+        with self._connect() as conn:
+            row = conn.execute("SELECT checkpoint FROM _sync_checkpoints WHERE name = ?", (table,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def apply(self, table, rows, deleted_ids, checkpoint=None):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if len(rows):
+                    self._ensure_table(conn, table, rows)
+                    quoted = [quote_identifier(col) for col in rows.columns]
+                    assignments = ", ".join(f"{col} = excluded.{col}" for col in quoted if col != '"id"')
+                    conn.executemany(
+                        f"INSERT INTO {quote_identifier(table)} ({', '.join(quoted)}) "
+                        f"VALUES ({', '.join('?' * len(quoted))}) "
+                        "ON CONFLICT(id) DO " + (f"UPDATE SET {assignments}" if assignments else "NOTHING"),
+                        to_records(rows),
+                    )
+                if deleted_ids and table_exists(conn, table):
+                    conn.executemany(
+                        f"DELETE FROM {quote_identifier(table)} WHERE id = ?",
+                        [(int(row_id),) for row_id in deleted_ids],
+                    )
+                if checkpoint is not None:
+                    conn.execute(
+                        "INSERT INTO _sync_checkpoints (name, checkpoint) VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET checkpoint = excluded.checkpoint",
+                        (table, json.dumps(checkpoint)),
+                    )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def ids(self, table):
+        with self._connect() as conn:
+            if not table_exists(conn, table):
+                return set()
+            return {row[0] for row in conn.execute(f"SELECT id FROM {quote_identifier(table)}")}
+
+    @staticmethod
+    def _ensure_table(conn, table, rows):
+        """Create the table for the batch's columns, adding any columns it does not have yet"""
+        if not table_exists(conn, table):
+            columns = ", ".join(f"{quote_identifier(col)} {sql_type(rows[col])}" for col in rows.columns)
+            conn.execute(f"CREATE TABLE {quote_identifier(table)} ({columns})")
+            conn.execute(f'CREATE UNIQUE INDEX {quote_identifier(table + "__pk")} ON {quote_identifier(table)} (id)')
+            return
+        present = {row[1] for row in conn.execute(f"PRAGMA table_info({quote_identifier(table)})")}
+        for col in rows.columns:
+            if col not in present:
+                conn.execute(
+                    f"ALTER TABLE {quote_identifier(table)} ADD COLUMN {quote_identifier(col)} {sql_type(rows[col])}"
+                )
+
+
+# PUBLIC_INTERFACE
+class SnowflakeTarget(WarehouseTarget):
+    """Snowflake warehouse; batches are staged in a temporary table and MERGEd on id.
+
+    Snowflake commits DDL implicitly, so a batch is not one transaction: the
+    checkpoint is written last, and a batch cut short is replayed in full.
+    Needs the optional snowflake-connector-python[pandas] package.
+    connection_params go to snowflake.connector.connect().
+    """
+
+    def __init__(self, **connection_params):
+        try:
+            import snowflake.connector
+            from snowflake.connector.pandas_tools import write_pandas
+        except ImportError as e:
+            raise RuntimeError("Snowflake sync needs snowflake-connector-python[pandas]") from e
+        self._write_pandas = write_pandas
+        self._params = connection_params
+        self._conn = snowflake.connector.connect(**connection_params)
+        self._conn.cursor().execute(
+            "CREATE TABLE IF NOT EXISTS SYNC_CHECKPOINTS (NAME STRING PRIMARY KEY, CHECKPOINT STRING NOT NULL)"
+        )
+
+    @property
+    def identity(self):
+        return "snowflake:{account}/{database}/{schema}".format(
+            **{key: self._params.get(key, "") for key in ("account", "database", "schema")}
+        )
+
+    def checkpoint(self, table):
+        row = self._conn.cursor().execute(
+            "SELECT CHECKPOINT FROM SYNC_CHECKPOINTS WHERE NAME = %s", (table,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def apply(self, table, rows, deleted_ids, checkpoint=None):
+        name, stage = table.upper(), f"{table.upper()}__STAGE"
+        cursor = self._conn.cursor()
+        if len(rows):
+            upper = rows.rename(columns=str.upper)
+            self._write_pandas(
+                self._conn, upper, stage, auto_create_table=True, overwrite=True,
+                table_type="temporary", quote_identifiers=False,
+            )
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {name} LIKE {stage}")
+            columns = list(upper.columns)
+            assignments = ", ".join(f"t.{col} = s.{col}" for col in columns if col != "ID")
+            cursor.execute(
+                f"MERGE INTO {name} t USING {stage} s ON t.ID = s.ID "
+                + (f"WHEN MATCHED THEN UPDATE SET {assignments} " if assignments else "")
+                + f"WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}) "
+                f"VALUES ({', '.join(f's.{col}' for col in columns)})"
+            )
+        if deleted_ids:
+            cursor.execute(
+                f"DELETE FROM {name} WHERE ID IN ({', '.join(['%s'] * len(deleted_ids))})",
+                [int(row_id) for row_id in deleted_ids],
+            )
+        if checkpoint is not None:
+            cursor.execute(
+                "MERGE INTO SYNC_CHECKPOINTS t USING (SELECT %s AS NAME, %s AS CHECKPOINT) s ON t.NAME = s.NAME "
+                "WHEN MATCHED THEN UPDATE SET t.CHECKPOINT = s.CHECKPOINT "
+                "WHEN NOT MATCHED THEN INSERT (NAME, CHECKPOINT) VALUES (s.NAME, s.CHECKPOINT)",
+                (table, json.dumps(checkpoint)),
+            )
+
+    def ids(self, table):
+        cursor = self._conn.cursor()
+        found = cursor.execute(
+            "SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_SCHEMA = CURRENT_SCHEMA() AND TABLE_NAME = %s",
+            (table.upper(),),
+        ).fetchone()[0]
+        if not found:
+            return set()
+        return {row[0] for row in cursor.execute(f"SELECT ID FROM {table.upper()}")}
+
+
+# PUBLIC_INTERFACE
+def target_from_env(data_dir="data"):
+    """Warehouse target from SYNC_TARGET: "snowflake" (SNOWFLAKE_* settings) or the local SQLite stand-in"""
+    if os.getenv("SYNC_TARGET", "sqlite").lower() == "snowflake":
+        params = {
+            key: os.getenv(f"SNOWFLAKE_{key.upper()}")
+            for key in ("account", "user", "password", "warehouse", "database", "schema", "role")
+        }
+        return SnowflakeTarget(**{key: value for key, value in params.items() if value})
+    return SQLiteTarget(os.getenv("SYNC_SQLITE_PATH") or Path(data_dir) / "warehouse.db")
+
+
+# PUBLIC_INTERFACE
+class SyncEngine:
+    """Push rows changed since the last successful sync to a warehouse target.
+
+    Per table, the checkpoint stored in the target records the source store,
+    the table version and the last change-log sequence number pushed. A
+    table still at its checkpointed version is skipped without reading any
+    rows; otherwise only the ids logged since the checkpoint are re-read and
+    upserted (or deleted, if gone), one batch and checkpoint at a time. A
+    table rewritten since the checkpoint (e.g. by an Excel import) is pushed
+    whole and ids no longer in the source are deleted.
+
+    After each table the target acknowledges the change-log position it
+    reached, so the source can prune entries every target has read.
+    """
+
+    def __init__(self, dh, target, batch_rows=SYNC_BATCH_ROWS, retries=SYNC_RETRIES, backoff=SYNC_BACKOFF_SECONDS):
+        self.dh = dh
+        self.target = target
+        self.batch_rows = batch_rows
+        self.retries = retries
+        self.backoff = backoff
+
+    def sync(self, tables=SYNC_TABLES, on_progress=None):
+        """Sync each table; returns {table: {"upserted", "deleted", "skipped", "full"}}.
+
+        on_progress(table, stats) is called after every batch.
+        """
+        return {table: self.sync_table(table, on_progress) for table in tables}
+
+    def sync_table(self, table, on_progress=None):
+        stats = {"upserted": 0, "deleted": 0, "skipped": False, "full": False}
+        storage = self.dh.storage
+        source = storage.identity
+        version = self.dh.table_version(table)
+        checkpoint = self._retry(self.target.checkpoint, table)
+        if checkpoint is not None and checkpoint.get("source") != source:
+            checkpoint = None
+        if version is None or (checkpoint is not None and checkpoint["version"] == version):
+            stats["skipped"] = True
+            if checkpoint is not None:
+                storage.acknowledge_changes(self.target.identity, table, checkpoint["seq"])
+            return stats
+        after = checkpoint["seq"] if checkpoint is not None else 0
+        pruned = storage.changes_pruned_through(table)
+        if after < pruned:
+            # Log entries this target never read are gone; only a full push is safe
+            checkpoint = None
+        # Rows are read at this version or later; replaying a newer row is harmless
+        changes = storage.changes(table, after=after, through_version=version)
+        last_seq = changes[-1][0] if changes else max(after, pruned)
+        if checkpoint is None or any(row_id is None for _, row_id in changes):
+            stats["full"] = True
+            self._full_sync(table, stats, on_progress)
+            self._apply(table, _empty(), [], {"source": source, "version": version, "seq": last_seq})
+        else:
+            for start in range(0, len(changes), self.batch_rows):
+                batch = changes[start:start + self.batch_rows]
+                ids = list(dict.fromkeys(row_id for _, row_id in batch))
+                rows = _plain(self.dh.rows_by_id(table, ids))
+                deleted = sorted(set(ids) - set(rows["id"].tolist())) if len(rows) else ids
+                final = start + self.batch_rows >= len(changes)
+                self._apply(table, rows, deleted, {
+                    "source": source,
+                    # Until the last batch lands, an unchanged version must not read as fully synced
+                    "version": version if final else checkpoint["version"],
+                    "seq": batch[-1][0],
+                })
+                stats["upserted"] += len(rows)
+                stats["deleted"] += len(deleted)
+                if on_progress:
+                    on_progress(table, stats)
+            if not changes:
+                self._apply(table, _empty(), [], {"source": source, "version": version, "seq": after})
+        # Acknowledged only once the checkpoint is stored, so pruning never outruns the target
+        storage.acknowledge_changes(self.target.identity, table, last_seq)
+        return stats
+
+    def _full_sync(self, table, stats, on_progress):
+        present = set()
+        for chunk in self.dh.export_chunks(table, chunk_rows=self.batch_rows):
+            rows = _plain(chunk)
+            self._apply(table, rows, [])
+            present.update(rows["id"].tolist())
+            stats["upserted"] += len(rows)
+            if on_progress:
+                on_progress(table, stats)
+        stale = sorted(self._retry(self.target.ids, table) - present)
+        for start in range(0, len(stale), self.batch_rows):
+            self._apply(table, _empty(), stale[start:start + self.batch_rows])
+        stats["deleted"] += len(stale)
+
+    def _apply(self, table, rows, deleted, checkpoint=None):
+        self._retry(self.target.apply, table, rows, deleted, checkpoint)
+
+    def _retry(self, func, *args):
+        for attempt in range(self.retries):
+            try:
+                return func(*args)
+            except Exception:
+                if attempt == self.retries - 1:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+
+# PUBLIC_INTERFACE
+class SyncRun:
+    """State of one background sync, updated by its thread and read by the UI"""
+
+    def __init__(self, key):
+        self.key = key
+        self.status = "running"
+        self.stats = {}
+        self.error = None
+        self.started = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+
+# PUBLIC_INTERFACE
+class SyncRuns:
+    """Process-wide registry running one sync at a time per (store, target), off the script thread."""
+
+    def __init__(self):
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def start(self, dh, target):
+        """Start a sync, or return the one already running for the same store and target"""
+        key = (dh.storage.identity, target.identity)
+        with self._lock:
+            run = self._runs.get(key)
+            if run is not None and not run.finished:
+                return run
+            run = self._runs[key] = SyncRun(key)
+        threading.Thread(target=self._run, args=(run, SyncEngine(dh, target)), daemon=True).start()
+        return run
+
+    def last(self, dh, target):
+        """Return the latest run for this store and target, or None"""
+        with self._lock:
+            return self._runs.get((dh.storage.identity, target.identity))
+
+    @staticmethod
+    def _run(run, engine):
+        try:
+            def progress(table, stats):
+                run.stats[table] = dict(stats)
+
+            for table in SYNC_TABLES:
+                run.stats[table] = engine.sync_table(table, on_progress=progress)
+            run.status = "done"
+        except Exception as exc:
+            run.error = str(exc) or type(exc).__name__
+            run.status = "failed"
+        run.finished_at = time.time()
+
+
+def _plain(df):
+    """Categoricals as plain values, so targets see ordinary columns"""
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def _empty():
+    return pd.DataFrame()
+
+
+sync_runs = SyncRuns()
@@ -0,0 +1,46 @@
+import math
+
+import streamlit as st
+
+PAGE_SIZE = 50
+
+
+# PUBLIC_INTERFACE
+def paged_table(dh, table, key, query="", filters=None, page_size=PAGE_SIZE):
+    """Render one server-side page of a table with sort and paging controls.
+
+    Only page_size rows are sent to the browser. Sort column, direction and
+    page live in session state under `key`, so they survive reruns; the page
+    resets to the first one whenever the query or filters change.
+    """
+    columns = dh.columns(table)
+    signature = (str(query).strip(), tuple(sorted((filters or {}).items(), key=lambda item: item[0])))
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_page"] = 1
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_by = st.selectbox("Sort by", options=["(default)"] + columns, key=f"{key}_sort")
+    with col2:
+        descending = st.toggle("Descending", key=f"{key}_desc")
+
+    sort_column = None if sort_by == "(default)" else sort_by
+    page = st.session_state.get(f"{key}_page", 1)
+    rows, total = dh.page_rows(
+        table, query, filters, sort_by=sort_column, ascending=not descending, page=page - 1, page_size=page_size
+    )
+    pages = max(1, math.ceil(total / page_size))
+    if page > pages:
+        # The result shrank under the current page (e.g. after a delete): show its last page
+        page = st.session_state[f"{key}_page"] = pages
+        rows, total = dh.page_rows(
+            table, query, filters, sort_by=sort_column, ascending=not descending, page=page - 1, page_size=page_size
+        )
+    with col3:
+        st.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    first = (page - 1) * page_size + 1 if total else 0
+    st.caption(f"Rows {first:,}–{first + len(rows) - 1 if total else 0:,} of {total:,} · page {page} of {pages}")
+    return rows
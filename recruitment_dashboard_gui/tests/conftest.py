@@ -0,0 +1,214 @@
+import asyncio
+import json
+import shutil
+import sys
+import threading
+import time
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# The app's modules live flat in the package directory above
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from google.auth import crypt, jwt  # noqa: E402
+
+from data_handler import DataHandler  # noqa: E402
+from oauth_handler import DEFAULT_CERTS_TTL_SECONDS  # noqa: E402
+
+
+class LocalIssuer:
+    """Offline stand-in for Google's ID token issuer.
+
+    Serves a self-signed signing certificate over HTTP on localhost with
+    the given Cache-Control max-age, and mints ID tokens signed by it, so
+    verification can be exercised end to end without network access.
+    Point a CertificateCache (or GOOGLE_CERTS_URL, together with
+    OAUTH_ALLOW_TEST_CERTS_URL=true) at certs_url.
+    """
+
+    def __init__(self, max_age=DEFAULT_CERTS_TTL_SECONDS, issuer="https://accounts.google.com", host="127.0.0.1",
+                 port=0):
+        self.max_age = max_age
+        self.issuer = issuer
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._keys = {}
+        self._server = None
+        self.rotate()
+
+    @property
+    def certs_url(self):
+        return f"http://{self.host}:{self.port}/oauth2/v1/certs"
+
+    def rotate(self):
+        """Start signing with a new key; earlier keys stay published. Returns the new key id"""
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from cryptography.x509.oid import NameOID
+        from datetime import datetime, timedelta, timezone
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "local-issuer")])
+        now = datetime.now(timezone.utc)
+        cert = (
+            x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=1))
+            .sign(key, hashes.SHA256())
+        )
+        key_id = f"local-{len(self._keys) + 1}"
+        private_pem = key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        self._keys[key_id] = cert.public_bytes(serialization.Encoding.PEM).decode()
+        self._signer = crypt.RSASigner.from_string(private_pem, key_id)
+        return key_id
+
+    def token(self, audience, email="user@example.com", name="Local User", expires_in=3600, **claims):
+        """A signed ID token for the audience with the current key"""
+        now = int(time.time())
+        payload = {
+            "iss": self.issuer, "aud": audience, "sub": email, "email": email, "email_verified": True,
+            "name": name, "iat": now, "exp": now + expires_in, **claims,
+        }
+        return jwt.encode(self._signer, payload).decode()
+
+    def start(self):
+        """Serve on a background thread; returns once the port is bound"""
+        issuer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                issuer.requests += 1
+                body = json.dumps(issuer._keys).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", f"public, max-age={issuer.max_age}, must-revalidate")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class LocalSMTPServer:
+    """Minimal SMTP server on localhost that keeps every message it receives.
+
+    Stands in for a mail relay, so the SMTP transport and the notification
+    sender are exercised end to end without sending anything. Point an
+    SMTPTransport at host and port; received messages are in messages.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.messages = []
+        self._ready = threading.Event()
+        self._loop = None
+        self._server = None
+
+    def start(self):
+        """Serve on a background thread; returns once the port is bound"""
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._session, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _session(self, reader, writer):
+        def reply(line):
+            writer.write(line.encode() + b"\r\n")
+
+        reply("220 localhost SMTP stand-in")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip().upper()
+                if command.startswith("EHLO"):
+                    reply("250-localhost")
+                    reply("250 8BITMIME")
+                elif command.startswith(("HELO", "MAIL", "RCPT", "RSET", "NOOP")):
+                    reply("250 OK")
+                elif command == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    lines = []
+                    while True:
+                        data = await reader.readline()
+                        if data in (b".\r\n", b".\n", b""):
+                            break
+                        lines.append(data[1:] if data.startswith(b"..") else data)
+                    self.messages.append(message_from_bytes(b"".join(lines)))
+                    reply("250 OK queued")
+                elif command == "QUIT":
+                    reply("221 Bye")
+                    break
+                else:
+                    reply("502 Command not implemented")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+@pytest.fixture
+def local_smtp():
+    """A running LocalSMTPServer, stopped after the test"""
+    with LocalSMTPServer() as server:
+        yield server
+
+
+@pytest.fixture
+def local_issuer():
+    """A running LocalIssuer, stopped after the test"""
+    with LocalIssuer() as issuer:
+        yield issuer
+
+
+@pytest.fixture
+def handler(tmp_path):
+    """A DataHandler over a fresh copy of the sample workbooks"""
+    for workbook in (Path(__file__).resolve().parents[1] / "data").glob("*.xlsx"):
+        shutil.copy(workbook, tmp_path / workbook.name)
+    return DataHandler(data_dir=tmp_path)
@@ -0,0 +1,113 @@
+import io
+import json
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("flask_smorest")
+
+from app import app  # noqa: E402
+from app.routes import export  # noqa: E402
+
+TOKEN = "test-token"
+
+
+@pytest.fixture
+def client(handler, monkeypatch):
+    """Test client for the REST API over the handler's store, with one valid token"""
+    monkeypatch.setitem(app.config, "DATA_DIR", str(handler.data_dir))
+    monkeypatch.setitem(app.config, "API_TOKENS", [TOKEN])
+    return app.test_client()
+
+
+def _get(client, path, **headers):
+    return client.get(path, headers={"Authorization": f"Bearer {TOKEN}", **headers})
+
+
+def test_data_routes_require_a_token(client, monkeypatch):
+    assert client.get("/api/candidates/").status_code == 401
+    assert client.get("/api/export/candidates").status_code == 401
+    response = client.get("/api/candidates/", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401 and response.headers["WWW-Authenticate"] == "Bearer"
+    assert client.get("/").status_code == 200  # the health check stays public
+    monkeypatch.setitem(app.config, "API_TOKENS", [])
+    assert _get(client, "/api/candidates/").status_code == 401  # no tokens configured: closed
+
+
+def test_cursor_paging_returns_every_row_once(client, handler):
+    ids, cursor = [], None
+    while True:
+        response = _get(client, "/api/candidates/?limit=2" + (f"&cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page["items"]) <= 2
+        ids += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == sorted(handler.load_candidates()["id"].tolist())
+    assert _get(client, "/api/candidates/?cursor=not-a-cursor").status_code == 400
+
+
+def test_etag_answers_304_until_the_table_changes(client, handler):
+    first = _get(client, "/api/candidates/?limit=5")
+    etag = first.headers["ETag"]
+    assert _get(client, "/api/candidates/?limit=5", **{"If-None-Match": etag}).status_code == 304
+    assert _get(client, "/api/candidates/?limit=6", **{"If-None-Match": etag}).status_code == 200
+    handler.update_candidate(first.get_json()["items"][0]["id"], {"name": "Changed"})
+    assert _get(client, "/api/candidates/?limit=5", **{"If-None-Match": etag}).status_code == 200
+
+
+def test_metrics_etag_follows_the_kpi_values(client, handler):
+    first = _get(client, "/api/metrics/")
+    etag = first.headers["ETag"]
+    assert first.get_json()["total_candidates"] == len(handler.load_candidates())
+    handler.update_candidate(1, {"name": "Renamed"})  # no KPI reads names
+    assert _get(client, "/api/metrics/", **{"If-None-Match": etag}).status_code == 304
+    handler.update_candidate(1, {"status": "Hired"})
+    assert _get(client, "/api/metrics/", **{"If-None-Match": etag}).status_code == 200
+
+
+def test_field_selection_and_filters(client, handler):
+    status = handler.load_candidates()["status"].iloc[0]
+    page = _get(client, f"/api/candidates/?fields=id,name&status={status}&limit=1000").get_json()
+    assert page["items"] and all(set(item) == {"id", "name"} for item in page["items"])
+    expected = handler.load_candidates().query("status == @status")["id"].tolist()
+    assert sorted(item["id"] for item in page["items"]) == sorted(expected)
+    assert _get(client, "/api/candidates/?fields=id,salary").status_code == 400
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+
+
+def test_ndjson_export_streams_every_row_and_resumes(client, handler):
+    response = _get(client, "/api/export/candidates")
+    assert response.status_code == 200 and response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    rows = _ndjson(response)
+    assert [row["id"] for row in rows] == sorted(handler.load_candidates()["id"].tolist())
+    resumed = _ndjson(_get(client, f"/api/export/candidates?after={rows[1]['id']}"))
+    assert resumed == rows[2:]
+
+
+def test_csv_export_has_one_header_across_chunks(client, handler, monkeypatch):
+    monkeypatch.setattr(export, "EXPORT_CHUNK_ROWS", 2)
+    response = _get(client, "/api/export/candidates?format=csv")
+    assert response.mimetype == "text/csv"
+    exported = pd.read_csv(io.StringIO(response.get_data(as_text=True)))
+    assert exported["id"].tolist() == sorted(handler.load_candidates()["id"].tolist())
+    assert list(exported.columns) == list(handler.load_candidates().columns)
+
+
+def test_interview_details_export_joins_candidates_and_bounds_dates(client, handler):
+    interviews = handler.load_interviews().dropna(subset=["date"]).sort_values("date")
+    day = interviews["date"].iloc[0].date()
+    rows = _ndjson(_get(client, f"/api/export/interview_details?start={day}&end={day}"))
+    expected = interviews[interviews["date"].dt.date == day]["id"].tolist()
+    assert rows and sorted(row["id"] for row in rows) == sorted(expected)
+    names = handler.load_candidates().set_index("id")["name"]
+    for row in rows:
+        assert row["candidate_name"] == names.get(row["candidate_id"])
+    assert _get(client, "/api/export/nothing").status_code == 404
+    assert _get(client, f"/api/export/interviews?start={day}&end=2000-01-01").status_code == 400
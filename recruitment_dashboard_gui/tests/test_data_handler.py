@@ -0,0 +1,150 @@
+import io
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from ingest import SCHEMAS
+from storage import StaleVersionError
+
+
+def test_batch_writes_commit_as_one_version(handler):
+    version = handler.table_version("candidates")
+    ids = handler.insert_many("candidates", [
+        {"name": "Amy", "position": "Engineer", "status": "Open"},
+        {"name": "Ben", "position": "Designer", "status": "Open"},
+    ])
+    assert handler.table_version("candidates") == version + 1
+    assert handler.update_many("candidates", {ids[0]: {"status": "Hired"}, ids[1]: {"name": "Benji"}, 10**6: {}}) == 2
+    assert handler.delete_many("candidates", [ids[1], ids[1], 10**6]) == 1
+    assert handler.table_version("candidates") == version + 3
+    assert handler.get_candidate(ids[0])["status"] == "Hired"
+    assert handler.get_candidate(ids[1]) is None
+
+
+def test_transaction_rolls_back_on_exception(handler):
+    before = handler.load_candidates().copy()
+    version = handler.table_version("candidates")
+    existing = int(before["id"].iat[0])
+    with pytest.raises(RuntimeError):
+        with handler.transaction():
+            new_id = handler.add_candidate({"name": "Temp", "position": "Engineer", "status": "Open"})
+            handler.update_candidate(existing, {"name": "Changed"})
+            handler.delete_candidate(int(before["id"].iat[1]))
+            raise RuntimeError("abort")
+    assert handler.table_version("candidates") == version
+    assert handler.get_candidate(new_id) is None
+    assert_frame_equal(handler.load_candidates(), before)
+
+
+def test_transaction_commits_tables_together(handler):
+    candidates, interviews = handler.table_version("candidates"), handler.table_version("interviews")
+    with handler.transaction():
+        candidate_id = handler.add_candidate({"name": "Amy", "position": "Engineer", "status": "Interview"})
+        interview_id = handler.add_interview({"candidate_id": candidate_id, "interviewer": "Kim", "status": "Scheduled"})
+        assert handler.table_version("candidates") == candidates  # nothing is written before the block ends
+    assert handler.table_version("candidates") == candidates + 1
+    assert handler.table_version("interviews") == interviews + 1
+    assert handler.get_interview(interview_id)["candidate_id"] == candidate_id
+
+
+def test_expected_version_rejects_stale_edits(handler):
+    seen = handler.table_version("candidates")
+    row_id = int(handler.load_candidates()["id"].iat[0])
+    assert handler.update_candidate(row_id, {"name": "First"}, expected_version=seen)
+    with pytest.raises(StaleVersionError):
+        handler.update_candidate(row_id, {"name": "Second"}, expected_version=seen)
+    with pytest.raises(StaleVersionError):
+        handler.delete_candidate(row_id, expected_version=seen)
+    assert handler.get_candidate(row_id)["name"] == "First"
+    assert handler.table_version("candidates") == seen + 1
+
+
+def test_stale_table_rejects_whole_transaction(handler):
+    seen = {"candidates": handler.table_version("candidates"), "interviews": handler.table_version("interviews")}
+    interview_id = int(handler.load_interviews()["id"].iat[0])
+    handler.update_interview(interview_id, {"status": "Completed"})
+    candidate_id = int(handler.load_candidates()["id"].iat[0])
+    with pytest.raises(StaleVersionError):
+        with handler.transaction(seen):
+            handler.update_candidate(candidate_id, {"name": "Never"})
+            handler.update_interview(interview_id, {"status": "Cancelled"})
+    assert handler.table_version("candidates") == seen["candidates"]
+    assert handler.get_candidate(candidate_id)["name"] != "Never"
+    assert handler.get_interview(interview_id)["status"] == "Completed"
+
+
+def test_excel_export_is_built_once_per_version(handler):
+    first = handler.export_excel("candidates")
+    assert handler.export_excel("candidates") is first
+    row_id = int(handler.load_candidates()["id"].iat[0])
+    handler.update_candidate(row_id, {"name": "Exported"})
+    exported = pd.read_excel(io.BytesIO(handler.export_excel("candidates")))
+    assert exported.loc[exported["id"] == row_id, "name"].tolist() == ["Exported"]
+
+
+def test_merge_counts_id_updates_and_commits_per_chunk(handler):
+    existing = handler.load_candidates().astype(object)
+    first, second = existing.iloc[0], existing.iloc[1]
+    upload = pd.DataFrame([
+        {"id": first["id"], "name": first["name"], "position": first["position"], "client": first["client"],
+         "status": "Hired" if first["status"] != "Hired" else "Open"},
+        # New natural key, but an id that already exists: updates that row
+        {"id": second["id"], "name": "Renamed Person", "position": second["position"], "client": second["client"],
+         "status": second["status"]},
+        {"id": None, "name": "Brand New", "position": "Engineer", "client": "TechCorp", "status": "Open"},
+    ])
+    workbook = io.BytesIO()
+    upload.to_excel(workbook, index=False)
+    workbook.seek(0)
+    version = handler.table_version("candidates")
+    report = handler.merge_excel("candidates", workbook, key=SCHEMAS["candidates"]["natural_key"], chunk_rows=1)
+    assert (report.inserted, report.updated, report.unchanged) == (1, 2, 0)
+    assert report.rows_written == 3
+    assert handler.table_version("candidates") == version + 3
+    assert handler.get_candidate(int(second["id"]))["name"] == "Renamed Person"
+
+
+@pytest.mark.parametrize("key, dropped, missing", [(None, ["id", "client"], "client"), ("id", ["id"], "id")])
+def test_merge_without_key_columns_writes_nothing(handler, key, dropped, missing):
+    # Without an id column the natural key (name, position, client) is used
+    upload = handler.load_candidates().astype(object).drop(columns=dropped)
+    workbook = io.BytesIO()
+    upload.to_excel(workbook, index=False)
+    workbook.seek(0)
+    version = handler.table_version("candidates")
+    with pytest.raises(ValueError, match=f"Missing key columns: {missing}"):
+        handler.merge_excel("candidates", workbook, key=key)
+    assert handler.table_version("candidates") == version
+    assert len(handler.load_candidates()) == len(upload)
+
+
+def _page_ids(handler, **kwargs):
+    rows, total = handler.page_rows("candidates", **kwargs)
+    return rows["id"].tolist(), total
+
+
+def test_page_rows_sorts_categories_by_value_with_missing_last(handler):
+    # "Archived" gets the newest dictionary code but sorts first by value
+    handler.insert_many("candidates", [
+        {"name": "Zoe", "position": "Analyst", "status": "Archived", "client": None},
+        {"name": "Amy", "position": "Engineer", "status": None, "client": "TechCorp"},
+    ])
+    assert _page_ids(handler, sort_by="status") == ([6, 3, 2, 1, 4, 5, 7], 7)
+    assert _page_ids(handler, sort_by="status", ascending=False) == ([5, 1, 4, 2, 3, 6, 7], 7)
+    assert _page_ids(handler, sort_by="applied_date")[0][-2:] == [6, 7]
+    assert _page_ids(handler, sort_by="applied_date", ascending=False)[0] == [4, 2, 1, 5, 3, 6, 7]
+    assert _page_ids(handler, sort_by="client", ascending=False)[0][-1] == 6
+    with pytest.raises(ValueError):
+        handler.page_rows("candidates", sort_by="nope")
+
+
+def test_page_rows_slices_filtered_search_results(handler):
+    handler.insert_many("candidates", [{"name": "Amy", "position": "Engineer", "status": "Open", "client": "TechCorp"}])
+    query = {"query": "engineer", "filters": {"client": "TechCorp"}, "sort_by": "name", "page_size": 1}
+    assert _page_ids(handler, page=0, **query) == ([6], 2)
+    assert _page_ids(handler, page=1, **query) == ([1], 2)
+    assert _page_ids(handler, page=2, **query) == ([], 2)
+    # Without a sort, matches keep search rank: the exact value "engineer" first
+    assert _page_ids(handler, query="engineer", page_size=2) == ([6, 5], 3)
+    assert _page_ids(handler, filters={"status": "Open"}, sort_by="id", ascending=False, page_size=2) == ([6, 4], 3)
@@ -0,0 +1,55 @@
+import pandas as pd
+
+from deadlines import DeadlineIndex, sla_rules_from_env
+from storage import apply_journal
+
+RULES = {"*": 14, "In Progress": 7, "Hired": None, "Rejected": None}
+
+
+def _frame():
+    return pd.DataFrame({
+        "id": [1, 2, 3, 4, 5],
+        "status": ["Open", "In Progress", "Hired", None, "Open"],
+        "applied_date": pd.to_datetime(["2026-10-01", "2026-10-01", "2026-10-02", "2026-10-03", None]),
+    })
+
+
+def _entries(index):
+    return list(zip(index.ids.tolist(), index.deadlines.tolist()))
+
+
+def test_deadlines_follow_the_rules_in_order():
+    index = DeadlineIndex(_frame(), RULES)
+    ids, deadlines = index.between("2026-10-01", "2026-12-31")
+    assert ids.tolist() == [2, 1, 4]  # Hired has no follow-up; a missing applied_date has no deadline
+    assert [pd.Timestamp(d) for d in deadlines] == [
+        pd.Timestamp("2026-10-08"), pd.Timestamp("2026-10-15"), pd.Timestamp("2026-10-17"),
+    ]
+    assert index.between("2026-10-15", "2026-10-17")[0].tolist() == [1, 4]
+    assert len(index.between("2026-10-18", "2026-10-31")[0]) == 0
+
+
+def test_deadline_update_matches_rebuild():
+    frame = _frame()
+    index = DeadlineIndex(frame, RULES)
+    before = _entries(index)
+    changes = [
+        ("update", 1, {"status": "Hired"}),
+        ("update", 3, {"status": "In Progress"}),
+        ("update", 5, {"applied_date": pd.Timestamp("2026-09-20")}),
+        ("delete", 2, None),
+        ("insert", 6, {"id": 6, "status": "Open", "applied_date": pd.Timestamp("2026-10-03")}),
+    ]
+    patched = apply_journal(frame, changes)
+    updated = index.update(patched, changes, frame)
+    rebuilt = DeadlineIndex(patched, RULES)
+    assert sorted(_entries(updated)) == sorted(_entries(rebuilt))
+    assert updated.deadlines.tolist() == sorted(updated.deadlines.tolist())
+    assert _entries(index) == before
+
+
+def test_sla_rules_from_env(monkeypatch):
+    monkeypatch.setenv("FOLLOW_UP_SLA", "*=10, In Progress=3,Hired=")
+    assert sla_rules_from_env({"*": 14, "Rejected": None}) == {
+        "*": 10, "In Progress": 3, "Hired": None, "Rejected": None,
+    }
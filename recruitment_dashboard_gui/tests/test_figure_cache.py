@@ -0,0 +1,88 @@
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+import visualizations
+from figure_cache import FigureCache, frame_fingerprint
+from visualizations import DashboardVisualizations
+
+THEME = {"primary": "#1f77b4", "secondary": "#ff7f0e", "success": "#2ca02c", "error": "#d62728", "text": "#000"}
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    spec = go.Figure(go.Bar(x=["a"], y=[1])).to_json()
+    cache = FigureCache(max_bytes=3 * len(spec))
+    for key in "abc":
+        cache.put(key, spec)
+    assert cache.get_or_build("a", lambda: pytest.fail("a is cached")).data[0].y == (1,)
+    cache.put("d", spec)
+    assert list(cache._entries) == ["c", "a", "d"]  # b was the least recently used
+    assert cache.stats() == {"entries": 3, "bytes": 3 * len(spec), "max_bytes": 3 * len(spec), "hits": 1, "misses": 0}
+
+
+def test_byte_accounting_follows_replacements_and_oversized_specs():
+    cache = FigureCache(max_bytes=100)
+    cache.put("a", "x" * 40)
+    cache.put("none", None)  # "no chart" is cached for free
+    cache.put("a", "x" * 25)
+    assert cache.stats()["bytes"] == 25
+    cache.put("b", "y" * 70)
+    assert (cache.stats()["entries"], cache.stats()["bytes"]) == (3, 95)
+    cache.put("b", "y" * 101)  # too large to keep, and the stale spec for b goes too
+    assert list(cache._entries) == ["none", "a"] and cache.stats()["bytes"] == 25
+    cache.put("c", "z" * 90)
+    assert list(cache._entries) == ["c"] and cache.stats()["bytes"] == 90
+    cache.invalidate()
+    assert (cache.stats()["entries"], cache.stats()["bytes"]) == (0, 0)
+
+
+def test_hits_rebuild_an_independent_figure():
+    cache = FigureCache(max_bytes=1 << 20)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return go.Figure(go.Bar(x=["a"], y=[1]))
+
+    first = cache.get_or_build("bar", build)
+    second = cache.get_or_build("bar", build)
+    second.update_layout(title="changed")
+    third = cache.get_or_build("bar", build)
+    assert len(builds) == 1 and (cache.hits, cache.misses) == (2, 1)
+    assert second.to_dict()["data"] == first.to_dict()["data"]
+    assert third.layout.title.text is None
+    assert cache.get_or_build("empty", lambda: None) is None
+    assert cache.get_or_build("empty", lambda: pytest.fail("None is cached")) is None
+
+
+def test_frame_fingerprint_ignores_row_order_but_not_content():
+    df = pd.DataFrame({"status": ["Open", "Open", "Hired"], "client": ["A", "A", "B"], "name": ["x", "y", "z"]})
+    key = frame_fingerprint(df, ["status", "client", "missing"])
+    assert key == frame_fingerprint(df.iloc[::-1], ["status", "client"])
+    assert key == frame_fingerprint(df.assign(name="other"), ["status", "client"])  # unread columns do not count
+    assert key != frame_fingerprint(df.assign(status=["Open", "Hired", "Hired"]), ["status", "client"])
+    assert key != frame_fingerprint(df.iloc[[0, 2]], ["status", "client"])  # a dropped duplicate still counts
+    assert frame_fingerprint(df.iloc[:0], ["status"]) == (0, ("status",))
+
+
+def test_chart_is_rebuilt_when_the_data_version_changes(handler, monkeypatch):
+    cache = FigureCache(max_bytes=1 << 20)
+    monkeypatch.setattr(visualizations, "figure_cache", cache)
+    viz = DashboardVisualizations(THEME)
+
+    def chart():
+        return viz.create_recruitment_funnel(handler.load_candidates(), handler.fingerprint("candidates"))
+
+    before = chart()
+    assert chart().to_dict()["data"] == before.to_dict()["data"]
+    assert (cache.hits, cache.misses) == (1, 1)
+    handler.update_candidate(1, {"status": "Hired"})
+    after = chart()
+    assert cache.misses == 2
+    assert before.data[0].x[3] == 1 and after.data[0].x[3] == 2  # hired candidates
+
+    # Without a version the charted columns are hashed, so unrelated edits keep the entry
+    viz.create_recruitment_funnel(handler.load_candidates())
+    handler.update_candidate(1, {"name": "Johnny"})
+    viz.create_recruitment_funnel(handler.load_candidates())
+    assert (cache.hits, cache.misses) == (2, 3)
@@ -0,0 +1,120 @@
+import threading
+
+import pandas as pd
+
+from indexes import BitmapIndex, ChunkedMap, KeyIndex, changed_rows
+from storage import apply_journal
+
+
+def _frame():
+    return pd.DataFrame({"id": [10, 20, 30], "name": ["a", "b", "c"]})
+
+
+def test_key_index_update_leaves_previous_version_alone():
+    frame = _frame()
+    index = KeyIndex(frame)
+    changes = [("insert", 40, {"id": 40, "name": "d"}), ("update", 20, {"name": "B"})]
+    patched = apply_journal(frame, changes, locate=index.locate)
+    updated = index.update(patched, changes, frame)
+    assert updated is not index
+    assert updated.locate(40) == 3 and updated.locate(20) == 1
+    assert index.locate(40) is None and len(index) == 3
+    assert index.update(apply_journal(patched, [("delete", 10, None)]), [("delete", 10, None)], patched) is None
+
+
+def test_key_index_update_shares_untouched_chunks():
+    frame = pd.DataFrame({"id": range(1, 1001), "name": "x"})
+    index = KeyIndex(frame)
+    changes = [("insert", 1001, {"id": 1001, "name": "y"})]
+    updated = index.update(apply_journal(frame, changes), changes, frame)
+    shared = sum(a is b for a, b in zip(index.positions._chunks, updated.positions._chunks))
+    assert shared == len(index.positions._chunks) - 1
+
+
+def test_chunked_map_copies_are_independent():
+    original = ChunkedMap((key, key * 2) for key in range(100))
+    copy = original.copy()
+    copy[5] = "changed"
+    copy["new"] = 1
+    del copy[7]
+    original[8] = "mine"
+    assert original[5] == 10 and "new" not in original and original[7] == 14
+    assert copy[5] == "changed" and copy["new"] == 1 and 7 not in copy and copy[8] == 16
+    assert len(original) == 100 and len(copy) == 100
+    # Growing and shrinking re-chunk without losing entries
+    for key in range(100, 5000):
+        copy[key] = key
+    for key in range(4990):
+        copy.pop(key, None)
+    assert dict(copy) == {"new": 1, **{key: key for key in range(4990, 5000)}} and len(copy) == 11
+    assert dict(original) == {**{key: key * 2 for key in range(100)}, 8: "mine"}
+
+
+def test_changed_rows_memo_is_per_thread():
+    frame = _frame()
+    changes = [("update", 20, {"name": "B"})]
+    patched = apply_journal(frame, changes)
+    old, new = changed_rows(frame, patched, changes)
+    assert changed_rows(frame, patched, changes)[1] is new  # remembered on this thread
+    seen = []
+    other = apply_journal(frame, [("update", 30, {"name": "C"})])
+    thread = threading.Thread(
+        target=lambda: seen.append(changed_rows(frame, other, [("update", 30, {"name": "C"})])[1]["id"].tolist())
+    )
+    thread.start()
+    thread.join()
+    assert seen == [[30]]
+    assert changed_rows(frame, patched, changes)[1] is new  # not replaced by the other thread's patch
+    assert old["name"].tolist() == ["b"] and new["name"].tolist() == ["B"]
+
+
+def _people():
+    return pd.DataFrame({
+        "id": range(1, 8),
+        "status": pd.Categorical(["Open", "Hired", "Open", None, "Rejected", "Open", "Hired"]),
+        "client": ["Acme", "Acme", "Globex", "Globex", None, "Acme", "Initech"],
+    })
+
+
+def _masks(index, frame):
+    """Row mask per (column, value) for every value in the frame, as the index answers them"""
+    return {
+        (col, value): index.mask({col: value}).tolist()
+        for col in ("status", "client")
+        for value in frame[col].dropna().unique().tolist()
+    }
+
+
+def test_bitmap_mask_ors_within_a_column_and_ands_across():
+    frame = _people()
+    index = BitmapIndex(frame, ["status", "client"])
+    assert index.positions({"status": ["Open", "Hired"]}).tolist() == [0, 1, 2, 5, 6]
+    assert index.positions({"status": ["Open", "Hired"], "client": "Acme"}).tolist() == [0, 1, 5]
+    assert index.positions({"status": "Open", "client": ["Globex", "Initech"]}).tolist() == [2]
+    assert index.positions({"status": "Unknown"}).tolist() == []
+    assert index.mask({"status": None}).all() and len(index.mask({})) == 7
+
+
+def test_bitmap_update_matches_rebuild_and_leaves_previous_alone():
+    frame = _people()
+    index = BitmapIndex(frame, ["status", "client"])
+    before = _masks(index, frame)
+    changes = [
+        ("update", 1, {"status": "Hired"}),
+        ("update", 4, {"status": "Open", "client": None}),
+        ("update", 5, {"client": "Acme"}),
+        ("update", 2, {"status": None}),
+        # Row 8 starts a second byte in every bitmap; row 10 brings a new value
+        ("insert", 8, {"id": 8, "status": "Open", "client": "Globex"}),
+        ("insert", 9, {"id": 9, "status": None, "client": None}),
+        ("insert", 10, {"id": 10, "status": "Offer", "client": "Umbrella"}),
+    ]
+    patched = apply_journal(frame, changes)
+    updated = index.update(patched, changes, frame)
+    rebuilt = BitmapIndex(patched, ["status", "client"])
+    assert updated.rows == rebuilt.rows == 10
+    assert _masks(updated, patched) == _masks(rebuilt, patched)
+    assert updated.positions({"status": ["Open", "Offer"], "client": ["Globex", "Umbrella"]}).tolist() == [2, 7, 9]
+    assert not updated.mask({"status": "Rejected", "client": "Globex"}).any()
+    assert index.rows == 7 and _masks(index, frame) == before
+    assert index.update(apply_journal(patched, [("delete", 3, None)]), [("delete", 3, None)], patched) is None
@@ -0,0 +1,76 @@
+import io
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from ingest import IngestReport, coerce_chunk, iter_workbook_chunks
+
+
+def _workbook(path, header, rows):
+    book = Workbook()
+    sheet = book.active
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    book.save(path)
+    return path
+
+
+@pytest.mark.parametrize("rows, sizes", [(7, [3, 3, 1]), (6, [3, 3]), (0, [0])])
+def test_workbook_chunk_boundaries(tmp_path, rows, sizes):
+    path = _workbook(tmp_path / "people.xlsx", ["id", "name"], [[i, f"P{i}"] for i in range(1, rows + 1)])
+    chunks = list(iter_workbook_chunks(path, chunk_rows=3))
+    assert [len(chunk) for _, chunk in chunks] == sizes
+    assert {total for total, _ in chunks} == {rows}
+    assert all(list(chunk.columns) == ["id", "name"] for _, chunk in chunks)
+    assert [i for _, chunk in chunks for i in chunk["id"]] == list(range(1, rows + 1))
+
+
+def test_workbook_rows_are_trimmed_to_the_header_and_blank_rows_skipped(tmp_path):
+    path = _workbook(tmp_path / "people.xlsx", [" id ", "name", None], [
+        [1, "Ann", "stray"], [None, None, None], [2, "Bob"],
+    ])
+    [(total, chunk)] = list(iter_workbook_chunks(path, chunk_rows=10))
+    assert total == 3  # the sheet's row count, blank rows included
+    assert chunk.to_dict("list") == {"id": [1, 2], "name": ["Ann", "Bob"]}
+
+
+@pytest.mark.parametrize("as_file", [True, False])
+def test_csv_text_with_an_xlsx_extension_is_streamed_as_csv(tmp_path, as_file):
+    text = "id,name\n" + "".join(f"{i},P{i}\n" for i in range(1, 6))
+    path = tmp_path / "legacy.xlsx"
+    path.write_text(text)
+    source = io.BytesIO(text.encode()) if as_file else path
+    chunks = list(iter_workbook_chunks(source, chunk_rows=2))
+    assert [(total, len(chunk)) for total, chunk in chunks] == [(None, 2), (None, 2), (None, 1)]
+    assert pd.concat([chunk for _, chunk in chunks])["name"].tolist() == ["P1", "P2", "P3", "P4", "P5"]
+    [(_, header_only)] = list(iter_workbook_chunks(io.BytesIO(b"id,name\n"), chunk_rows=2))
+    assert header_only.empty and list(header_only.columns) == ["id", "name"]
+
+
+def test_coerce_chunk_rejects_rows_with_their_sheet_row_numbers():
+    chunk = pd.DataFrame({
+        " name": ["Ann ", None, "  ", "Dee", "Eve"],
+        "position": ["Engineer", "Engineer", "Engineer", None, "Designer"],
+        "status": ["Open"] * 5,
+        "id": ["1", "2.0", "x", "4", "5.4"],
+        "applied_date": ["2026-01-02", "02/03/2026", "soon", None, "2026-04-05 10:00"],
+    })
+    report = IngestReport()
+    out = coerce_chunk("candidates", chunk, ["applied_date"], report, first_row=12)
+    assert out["name"].tolist() == ["Ann", "Eve"]  # stripped, and re-indexed after the drops
+    assert out["id"].tolist() == [1, 5] and str(out["id"].dtype) == "Int64"
+    assert out["applied_date"].tolist() == [pd.Timestamp("2026-01-02"), pd.Timestamp("2026-04-05 10:00")]
+    assert report.rows_rejected == 3
+    assert report.errors == [f"Row {n}: missing one of name, position, status" for n in (13, 14, 15)]
+
+
+def test_reject_messages_are_capped_but_counted():
+    report = IngestReport()
+    chunk = pd.DataFrame({"name": [None] * 30})
+    assert coerce_chunk("clients", chunk, [], report, first_row=2).empty
+    assert report.rows_rejected == 30
+    assert len(report.errors) == IngestReport.MAX_ERRORS and report.errors[-1].startswith("Row 21:")
+    with pytest.raises(ValueError, match="Missing required columns: position, status"):
+        coerce_chunk("candidates", pd.DataFrame({"name": ["Ann"]}), [], report)
@@ -0,0 +1,111 @@
+import pandas as pd
+
+from metrics import CandidateCube, compute_recruitment_metrics
+from storage import apply_journal
+
+
+def _frame():
+    return pd.DataFrame({
+        "id": [1, 2, 3, 4, 5],
+        "client": ["Acme", "Acme", "Globex", "Globex", None],
+        "status": ["Open", "Hired", "Open", "Rejected", "Open"],
+        "position": ["Engineer", "Engineer", "Analyst", "Engineer", "Designer"],
+        "applied_date": pd.to_datetime(["2026-10-01", "2026-10-02", "2026-09-01", "2026-10-14", "2026-10-15"]),
+    })
+
+
+def _snapshot(cube, now):
+    cells = cube.cells.sort_values(CandidateCube.DIMENSIONS, na_position="first", ignore_index=True)
+    return cells.astype({"count": "int64"}), cube.total, cube.status_counts, cube.open_positions, cube.recent(now)
+
+
+def test_cube_rolls_up_like_a_row_scan():
+    frame, now = _frame(), pd.Timestamp("2026-10-17")
+    metrics = compute_recruitment_metrics(frame, pd.DataFrame({"status": ["Scheduled", "Done"]}), now)
+    assert metrics == {
+        "total_candidates": 5,
+        "recent_candidates": 4,
+        "open_positions": 3,
+        "active_interviews": 1,
+        "success_rate": 20.0,
+    }
+    acme = CandidateCube(frame).slice({"client": "Acme", "status": None})
+    assert acme.total == 2 and acme.applied_days is None
+    assert acme.counts(["status"]).to_dict() == {"Hired": 1, "Open": 1}
+
+
+def test_cube_update_matches_rebuild():
+    frame, now = _frame(), pd.Timestamp("2026-10-17")
+    cube = CandidateCube(frame)
+    before = _snapshot(cube, now)
+    changes = [
+        ("update", 1, {"status": "Hired"}),
+        ("update", 3, {"applied_date": pd.Timestamp("2026-10-16"), "client": "Initech"}),
+        ("delete", 4, None),
+        ("insert", 6, {"id": 6, "client": "Acme", "status": "Open", "position": "Analyst",
+                       "applied_date": pd.Timestamp("2026-10-12")}),
+    ]
+    patched = apply_journal(frame, changes)
+    updated = cube.update(patched, changes, frame)
+    expected = _snapshot(CandidateCube(patched), now)
+    actual = _snapshot(updated, now)
+    pd.testing.assert_frame_equal(actual[0], expected[0])
+    assert actual[1:] == expected[1:]
+    assert updated.applied_days == CandidateCube(patched).applied_days
+    # The previous version is left as it was
+    pd.testing.assert_frame_equal(_snapshot(cube, now)[0], before[0])
+    assert _snapshot(cube, now)[1:] == before[1:]
+
+
+def test_cube_update_removing_every_row_empties_it():
+    frame = _frame()
+    changes = [("delete", row_id, None) for row_id in frame["id"]]
+    updated = CandidateCube(frame).update(apply_journal(frame, changes), changes, frame)
+    assert updated.total == 0 and not updated.applied_days and not updated.status_counts
+    assert not updated.cell_counts and updated.cells.empty
+
+
+def test_cube_update_only_touches_the_changed_cells():
+    frame = pd.DataFrame({
+        "id": range(1, 401),
+        "client": [f"Client {i % 40}" for i in range(400)],
+        "status": "Open",
+        "position": "Engineer",
+        "applied_date": pd.Timestamp("2026-10-05"),
+    })
+    cube = CandidateCube(frame)
+    changes = [("update", 1, {"status": "Hired"})]
+    updated = cube.update(apply_journal(frame, changes), changes, frame)
+    chunks = cube.cell_counts._chunks
+    assert sum(a is not b for a, b in zip(chunks, updated.cell_counts._chunks)) <= 2
+    assert len(updated.cell_counts) == len(cube.cell_counts) + 1
+    assert updated.status_counts == {"Open": 399, "Hired": 1} and updated.open_positions == {"Engineer": 399}
+
+
+def test_recent_count_is_exact_at_the_cutoff():
+    applied = pd.to_datetime(["2026-09-17 08:00", "2026-09-17 15:30", "2026-09-17 15:30", "2026-09-18 00:00", "2026-09-16 23:59"])
+    frame = pd.DataFrame({"id": range(1, 6), "status": "Open", "applied_date": applied})
+    cube = CandidateCube(frame)
+
+    def exact(now):
+        return int((frame["applied_date"] > now - pd.Timedelta(days=30)).sum())
+
+    # The window moves within a day, and only the cutoff's own day is checked by timestamp
+    for now in ["2026-10-17 07:00", "2026-10-17 08:00", "2026-10-17 12:00", "2026-10-17 15:30", "2026-10-18 00:00"]:
+        assert cube.recent(pd.Timestamp(now)) == exact(pd.Timestamp(now)), now
+    assert [cube.recent(pd.Timestamp(now)) for now in ("2026-10-17 07:00", "2026-10-17 12:00")] == [4, 3]
+
+    changes = [("update", 2, {"applied_date": pd.Timestamp("2026-09-17 07:00")}), ("delete", 3, None)]
+    patched = apply_journal(frame, changes)
+    updated = cube.update(patched, changes, frame)
+    rebuilt = CandidateCube(patched)
+    assert _times(updated) == _times(rebuilt)
+    assert updated.applied_days == rebuilt.applied_days
+    assert updated.recent(pd.Timestamp("2026-10-17 07:30")) == 2
+    assert _times(cube)[pd.Timestamp("2026-09-17")] == pd.to_datetime(
+        ["2026-09-17 08:00", "2026-09-17 15:30", "2026-09-17 15:30"]
+    ).tolist()  # the previous version is left as it was
+
+
+def _times(cube):
+    return {day: pd.to_datetime(stamps).tolist() for day, stamps in cube.applied_times.items()}
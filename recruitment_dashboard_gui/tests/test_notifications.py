@@ -0,0 +1,66 @@
+import asyncio
+import socket
+
+import pandas as pd
+import pytest
+
+from notifications import NotificationSender, Outbox, SMTPTransport, reminder_messages, transport_from_env
+
+
+def _due():
+    return pd.DataFrame({
+        "id": [1, 2],
+        "name": ["Ann", "Bob"],
+        "position": ["Engineer", "Designer"],
+        "client": ["TechCorp", "Acme"],
+        "follow_up_deadline": pd.to_datetime(["2026-10-20", "2026-10-21"]),
+    })
+
+
+def _reminders(recipients):
+    return [message for recipient in recipients for message in reminder_messages(_due(), recipient)]
+
+
+def test_reminders_dedupe_per_recipient(tmp_path):
+    outbox = Outbox(tmp_path / "outbox.db")
+    assert outbox.enqueue(_reminders(["a@example.com", "b@example.com"])) == (4, 0)
+    assert outbox.enqueue(_reminders(["a@example.com", "b@example.com", "c@example.com"])) == (2, 4)
+    assert outbox.status("reminder")["queued"] == 6
+
+
+def test_sender_delivers_and_marks_sent(tmp_path, local_smtp):
+    outbox = Outbox(tmp_path / "outbox.db")
+    outbox.enqueue(_reminders(["a@example.com", "b@example.com"]))
+    sender = NotificationSender(
+        outbox, SMTPTransport(local_smtp.host, local_smtp.port), "from@example.com", connections=2, batch_size=3
+    )
+    assert asyncio.run(sender.drain()) == (4, 0)
+    assert outbox.status() == {"queued": 0, "sending": 0, "sent": 4, "failed": 0}
+    assert sorted(message["To"] for message in local_smtp.messages) == ["a@example.com"] * 2 + ["b@example.com"] * 2
+    assert asyncio.run(sender.drain()) == (0, 0)
+
+
+def test_unreachable_relay_records_error_and_requeues(tmp_path):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    outbox = Outbox(tmp_path / "outbox.db")
+    outbox.enqueue(_reminders(["a@example.com"]))
+    sender = NotificationSender(outbox, SMTPTransport("127.0.0.1", port, timeout=2), "from@example.com")
+    with pytest.raises(OSError):
+        asyncio.run(sender.drain())
+    assert outbox.status()["queued"] == 2
+    assert outbox.last_error()
+    assert outbox.claim(10) == []  # backing off, not claimable straight away
+
+
+def test_transport_requires_a_relay(monkeypatch):
+    monkeypatch.delenv("NOTIFY_TRANSPORT", raising=False)
+    monkeypatch.delenv("SMTP_HOST", raising=False)
+    with pytest.raises(ValueError, match="SMTP_HOST"):
+        transport_from_env()
+    monkeypatch.setenv("SMTP_HOST", "mail.example.com")
+    assert transport_from_env().host == "mail.example.com"
+    monkeypatch.setenv("NOTIFY_TRANSPORT", "local")
+    with pytest.raises(ValueError, match="NOTIFY_TRANSPORT"):
+        transport_from_env()
@@ -0,0 +1,46 @@
+import pytest
+
+import oauth_handler
+from oauth_handler import GOOGLE_CERTS_URL, CertificateCache, GoogleOAuth, certs_url_from_env
+
+
+def test_verify_reuses_cached_certificates(local_issuer):
+    cache = CertificateCache(local_issuer.certs_url)
+    for email in ("a@example.com", "b@example.com"):
+        claims = cache.verify(local_issuer.token("client", email=email), "client")
+        assert claims["email"] == email
+    assert cache.fetches == 1
+    assert local_issuer.requests == 1
+
+
+def test_unknown_key_id_refreshes_for_rotation(local_issuer, monkeypatch):
+    monkeypatch.setattr(oauth_handler, "CERTS_REFRESH_SECONDS", 0)
+    cache = CertificateCache(local_issuer.certs_url)
+    cache.verify(local_issuer.token("client"), "client")
+    local_issuer.rotate()
+    assert cache.verify(local_issuer.token("client"), "client")["aud"] == "client"
+    assert cache.fetches == 2
+
+
+def test_verify_rejects_wrong_audience_and_issuer(local_issuer):
+    cache = CertificateCache(local_issuer.certs_url)
+    with pytest.raises(ValueError):
+        cache.verify(local_issuer.token("someone-else"), "client")
+    with pytest.raises(ValueError):
+        cache.verify(local_issuer.token("client", iss="https://evil.example.com"), "client")
+
+
+def test_certs_url_defaults_to_google(monkeypatch):
+    monkeypatch.delenv("GOOGLE_CERTS_URL", raising=False)
+    assert certs_url_from_env() == GOOGLE_CERTS_URL
+
+
+def test_other_certs_url_needs_explicit_flag(local_issuer, monkeypatch):
+    monkeypatch.setenv("GOOGLE_CERTS_URL", local_issuer.certs_url)
+    monkeypatch.delenv("OAUTH_ALLOW_TEST_CERTS_URL", raising=False)
+    with pytest.raises(ValueError, match="OAUTH_ALLOW_TEST_CERTS_URL"):
+        GoogleOAuth()
+    monkeypatch.setenv("OAUTH_ALLOW_TEST_CERTS_URL", "true")
+    monkeypatch.setenv("GOOGLE_CLIENT_ID", "client")
+    user = GoogleOAuth().verify_oauth_token(local_issuer.token("client", email="user@example.com"))
+    assert user["email"] == "user@example.com"
@@ -0,0 +1,56 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from data_handler import DataHandler
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+PAGES = Path(__file__).resolve().parents[1] / "pages"
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """A working directory whose data/ holds a fresh copy of the sample workbooks, as the pages expect"""
+    (tmp_path / "data").mkdir()
+    for workbook in (PAGES.parent / "data").glob("*.xlsx"):
+        shutil.copy(workbook, tmp_path / "data" / workbook.name)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _page(name):
+    return AppTest.from_file(str(next(PAGES.glob(f"*_{name}.py"))), default_timeout=30).run()
+
+
+def _input(at, label, value, form):
+    """Type into the widget with this label inside the given form"""
+    next(w for w in at.text_input if w.label == label and w.proto.form_id == form).input(value)
+
+
+# Edits are submitted through the DataHandler with the version the page stored for the next
+# submit, since AppTest replays a form's submit button on st.rerun() and would loop
+def test_candidate_added_then_edited_in_one_session(workdir):
+    at = _page("Candidates")
+    _input(at, "Name", "Added Person", "add_candidate_form")
+    _input(at, "Position", "Engineer", "add_candidate_form")
+    at.button(key="FormSubmitter:add_candidate_form-Add").click().run()
+    assert [success.value for success in at.success] == ["Candidate added with ID 6"]
+
+    dh = DataHandler(data_dir=workdir / "data")
+    seen = at.session_state["candidates_form_version"]
+    assert seen == dh.table_version("candidates")
+    assert dh.update_candidate(6, {"name": "Edited Person"}, expected_version=seen)
+
+
+def test_interview_added_then_edited_in_one_session(workdir):
+    at = _page("Interviews")
+    _input(at, "Interviewer", "Nia", "add_interview_form")
+    at.button(key="FormSubmitter:add_interview_form-Schedule").click().run()
+    assert [success.value for success in at.success] == ["Interview scheduled with ID 6"]
+
+    dh = DataHandler(data_dir=workdir / "data")
+    seen = at.session_state["interviews_form_version"]
+    assert seen == dh.table_version("interviews")
+    assert dh.update_interview(6, {"feedback": "Went well"}, expected_version=seen)
@@ -0,0 +1,38 @@
+import pytest
+
+import polling
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+
+def _polling_page():
+    import streamlit as st
+
+    from polling import poll_if_active, request_poll
+
+    runs = st.session_state["runs"] = st.session_state.get("runs", 0) + 1
+    if runs < st.session_state.get("busy_runs", 0):
+        # Two widgets with running jobs still cause one rerun
+        request_poll()
+        request_poll()
+    st.write(f"run {runs}")
+    poll_if_active()
+
+
+@pytest.fixture(autouse=True)
+def no_wait(monkeypatch):
+    monkeypatch.setattr(polling, "POLL_SECONDS", 0)
+
+
+def test_page_reruns_until_no_job_requests_a_poll():
+    at = AppTest.from_function(_polling_page)
+    at.session_state["busy_runs"] = 3
+    at.run()
+    assert at.session_state["runs"] == 3
+    assert [text.value for text in at.markdown] == ["run 3"]
+
+
+def test_page_without_running_jobs_does_not_rerun():
+    at = AppTest.from_function(_polling_page).run()
+    assert at.session_state["runs"] == 1
+    assert "_poll_requested" not in at.session_state
@@ -0,0 +1,85 @@
+import time
+import zipfile
+
+import pandas as pd
+import pytest
+
+import report_jobs
+from report_jobs import ReportJobs, build_client_report
+
+
+@pytest.fixture
+def jobs():
+    """A private job registry whose worker pool is shut down after the test"""
+    registry = ReportJobs(max_workers=1)
+    yield registry
+    if registry._pool is not None:
+        registry._pool.shutdown(cancel_futures=True)
+
+
+def _wait(job, timeout=120):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return job
+
+
+def test_identical_submissions_share_one_job(jobs, handler):
+    first = jobs.submit(handler, formats=["html"])
+    assert jobs.submit(handler, formats=("html", "html")) is first
+    assert jobs.submit(handler, formats=["xlsx"]) is not first
+    _wait(first)
+    handler.update_candidate(1, {"status": "Hired"})
+    assert jobs.submit(handler, formats=["html"]) is not first
+    with pytest.raises(ValueError, match="Unknown report format: pdf"):
+        jobs.submit(handler, formats=["pdf"])
+
+
+def test_job_builds_one_report_per_client_into_a_zip(jobs, handler):
+    handler.add_candidate({"name": "No Client", "position": "Analyst", "status": "Open"})
+    job = jobs.submit(handler, formats=["xlsx", "parquet", "html"])
+    assert job.status in ("queued", "running", "done")
+    assert _wait(job).status == "done", job.error
+    clients = ["CloudTech", "DataCo", "DesignHub", "InnovateTech", "TechCorp", "Unassigned"]
+    assert (job.done, job.total, job.progress) == (len(clients) + 1, len(clients) + 1, 1.0)
+    with zipfile.ZipFile(job.artifact) as bundle:
+        names = sorted(bundle.namelist())
+        assert names == sorted(
+            f"{client}{suffix}" for client in clients
+            for suffix in (".xlsx", ".html", "_candidates.parquet", "_interviews.parquet")
+        )
+        with bundle.open("DataCo.xlsx") as workbook:
+            sheets = pd.read_excel(workbook, sheet_name=None)
+        with bundle.open("Unassigned_candidates.parquet") as parquet:
+            assert pd.read_parquet(parquet)["name"].tolist() == ["No Client"]
+    assert sheets["Candidates"]["name"].tolist() == ["Mike Johnson"]
+    assert sheets["Interviews"]["interviewer"].tolist() == ["Data Team"]
+    summary = dict(zip(sheets["Summary"]["Metric"], sheets["Summary"]["Value"]))
+    assert summary["Client"] == "DataCo" and summary["Total Candidates"] == 1 and summary["Status: Hired"] == 1
+    # Per-client files are removed once zipped
+    assert sorted(path.name for path in job.directory.iterdir()) == [job.artifact.name]
+
+
+def test_failed_job_reports_its_error_and_is_not_reused(jobs, handler, monkeypatch):
+    def broken(candidates, interviews):
+        raise RuntimeError("no clients today")
+
+    monkeypatch.setattr(report_jobs, "_split_by_client", broken)
+    job = _wait(jobs.submit(handler, formats=["html"]))
+    assert (job.status, job.error, job.artifact) == ("failed", "no clients today", None)
+    assert jobs.get(job.id) is job
+    monkeypatch.undo()
+    retry = jobs.submit(handler, formats=["html"])
+    assert retry is not job and _wait(retry).status == "done"
+
+
+def test_client_report_escapes_the_client_name(tmp_path):
+    candidates = pd.DataFrame({"id": [1], "name": ["Ann"], "position": ["Engineer"], "status": ["Open"],
+                               "client": ["<Acme & Co>"], "applied_date": pd.to_datetime(["2026-10-01"])})
+    interviews = pd.DataFrame(columns=["id", "candidate_id", "interviewer", "date", "status"])
+    assert build_client_report("<Acme & Co>", "Acme_Co", candidates, interviews, ("html",), str(tmp_path)) == [
+        "Acme_Co.html"
+    ]
+    page = (tmp_path / "Acme_Co.html").read_text(encoding="utf-8")
+    assert "<title>Recruitment report — &lt;Acme &amp; Co&gt;</title>" in page
+    assert "<Acme & Co>" not in page
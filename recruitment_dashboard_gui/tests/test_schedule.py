@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import schedule
+from schedule import ScheduleIndex
+from storage import apply_journal
+
+
+def _frame(rows=600, seed=7):
+    rng = np.random.default_rng(seed)
+    starts = pd.Timestamp("2026-10-01") + pd.to_timedelta(rng.integers(0, 60 * 24 * 30, rows), unit="m")
+    lengths = pd.to_timedelta(rng.choice([30, 60, 90, 60 * 24 * 20], rows, p=[0.4, 0.4, 0.19, 0.01]), unit="m")
+    return pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "interviewer": rng.choice(["Ana", "Ben", "Cy"], rows),
+        "date": starts,
+        "end": starts + lengths,
+        "status": rng.choice(["Scheduled", "Completed", "Cancelled"], rows, p=[0.6, 0.3, 0.1]),
+    })
+
+
+def _brute_force(frame, interviewer, start, end):
+    busy = frame[(frame["interviewer"] == interviewer) & (frame["status"] != "Cancelled")]
+    hits = busy[(busy["date"] < end) & (busy["end"] > start)]
+    return sorted(hits["id"].tolist())
+
+
+def _windows():
+    rng = np.random.default_rng(11)
+    for offset, minutes in zip(rng.integers(0, 60 * 24 * 32, 40), rng.choice([30, 240, 60 * 24 * 7], 40)):
+        start = pd.Timestamp("2026-10-01") + pd.Timedelta(minutes=int(offset))
+        yield start, start + pd.Timedelta(minutes=int(minutes))
+
+
+@pytest.mark.parametrize("scan_rows", [schedule.SCAN_BAND_ROWS, 4])
+def test_overlapping_matches_brute_force(monkeypatch, scan_rows):
+    # A small scan band sends wide windows through the segment tree instead of the linear scan
+    monkeypatch.setattr(schedule, "SCAN_BAND_ROWS", scan_rows)
+    frame = _frame()
+    index = ScheduleIndex(frame)
+    assert len(index) == int((frame["status"] != "Cancelled").sum())
+    for start, end in _windows():
+        for interviewer in index.interviewers():
+            ids, starts, _ = index.overlapping(interviewer, start, end)
+            assert sorted(ids.tolist()) == _brute_force(frame, interviewer, start, end)
+            assert starts.tolist() == sorted(starts.tolist())
+
+
+def test_conflicts_exclude_the_interview_itself_and_unknown_interviewers():
+    frame = pd.DataFrame({
+        "id": [1, 2, 3],
+        "interviewer": ["Ana", "Ana", "Ana"],
+        "date": pd.to_datetime(["2026-10-19 10:00", "2026-10-19 10:30", "2026-10-19 12:00"]),
+        "end": pd.to_datetime(["2026-10-19 11:00", None, "2026-10-19 11:00"]),
+        "status": ["Scheduled", "Scheduled", "Scheduled"],
+    })
+    index = ScheduleIndex(frame)
+    # Missing or inverted ends default to the standard interview length
+    assert index.overlapping("Ana", "2026-10-19 11:15", "2026-10-19 11:20")[0].tolist() == [2]
+    assert index.overlapping("Ana", "2026-10-19 10:00", "2026-10-19 11:00", exclude_id=1)[0].tolist() == [2]
+    assert len(index.overlapping("Nobody", "2026-10-19", "2026-10-20")[0]) == 0
+    slots = index.free_slots("Ana", "2026-10-19 09:00", minutes=60, limit=2)
+    assert slots == [
+        (pd.Timestamp("2026-10-19 09:00"), pd.Timestamp("2026-10-19 10:00")),
+        (pd.Timestamp("2026-10-19 13:00"), pd.Timestamp("2026-10-19 14:00")),
+    ]
+
+
+def test_schedule_update_matches_rebuild(monkeypatch):
+    monkeypatch.setattr(schedule, "SCAN_BAND_ROWS", 4)
+    frame = _frame()
+    index = ScheduleIndex(frame)
+    changes = [
+        ("update", 1, {"interviewer": "Dee"}),
+        ("update", 2, {"status": "Cancelled"}),
+        ("update", 3, {"date": pd.Timestamp("2026-10-05 09:00"), "end": pd.Timestamp("2026-11-20")}),
+        ("delete", 4, None),
+        ("insert", 601, {"id": 601, "interviewer": "Ana", "date": pd.Timestamp("2026-10-10 10:00"),
+                         "end": pd.Timestamp("2026-10-10 11:00"), "status": "Scheduled"}),
+    ]
+    patched = apply_journal(frame, changes)
+    updated = index.update(patched, changes, frame)
+    rebuilt = ScheduleIndex(patched)
+    assert updated.interviewers() == rebuilt.interviewers() and len(updated) == len(rebuilt)
+    for start, end in _windows():
+        for interviewer in rebuilt.interviewers():
+            assert sorted(updated.overlapping(interviewer, start, end)[0].tolist()) == \
+                sorted(rebuilt.overlapping(interviewer, start, end)[0].tolist()) == \
+                _brute_force(patched, interviewer, start, end)
+        # The previous version still answers from the unpatched frame
+        for interviewer in index.interviewers():
+            assert sorted(index.overlapping(interviewer, start, end)[0].tolist()) == \
+                _brute_force(frame, interviewer, start, end)
+    pd.testing.assert_frame_equal(
+        updated.workload("2026-10-01", "2026-11-01"), rebuilt.workload("2026-10-01", "2026-11-01")
+    )
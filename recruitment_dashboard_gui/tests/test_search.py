@@ -0,0 +1,122 @@
+import pandas as pd
+
+from search import FullTextIndex, SubstringIndex, _trigrams, highlight
+from storage import apply_journal
+
+
+def _candidates():
+    return pd.DataFrame({
+        "id": [1, 2, 3, 4, 5],
+        "name": ["Ann Lee", "Annabel", "Joanna", "Bob", None],
+        "position": ["Engineer", "Data Engineer", "Designer", "Engineer", "Analyst"],
+    })
+
+
+NAME_QUERIES = ["ann", "an", "anna", "lee", "engineer", "eng", " BOB ", "zz", ""]
+
+
+def test_substring_search_ranks_exact_prefix_word_then_substring():
+    index = SubstringIndex(_candidates(), ["name", "position"])
+    assert index.search("ann") == [1, 2, 3]  # equal-length prefixes fall back to alphabetical order
+    assert index.search("anna") == [2, 3]
+    assert index.search("lee") == [1]
+    assert index.search("engineer") == [1, 4, 2]
+    assert index.search("an", columns=["name"]) == [1, 2, 3]
+    assert index.search("ann", limit=2) == [1, 2]
+
+
+def test_substring_update_matches_rebuild():
+    frame = _candidates()
+    index = SubstringIndex(frame, ["name", "position"])
+    before = {query: index.search(query) for query in NAME_QUERIES}
+    changes = [
+        ("update", 1, {"name": "Leeann"}),
+        ("update", 5, {"name": "Anna Bobson"}),
+        ("update", 2, {"position": "Engineer"}),
+        ("delete", 3, None),
+        ("insert", 6, {"id": 6, "name": "ANN", "position": None}),
+    ]
+    patched = apply_journal(frame, changes)
+    updated = index.update(patched, changes, frame)
+    rebuilt = SubstringIndex(patched, ["name", "position"])
+    for query in NAME_QUERIES:
+        assert updated.search(query) == rebuilt.search(query)
+        assert index.search(query) == before[query]  # the previous version is left as it was
+    assert updated.grams["name"] == rebuilt.grams["name"]
+
+
+def _unshared(before, after):
+    """Chunks of a ChunkedMap that an update had to copy"""
+    return sum(old is not new for old, new in zip(before._chunks, after._chunks))
+
+
+def test_substring_update_shares_untouched_chunks():
+    frame = pd.DataFrame({"id": range(1, 2001), "name": [f"person {i:04d}" for i in range(1, 2001)], "position": "x"})
+    index = SubstringIndex(frame, ["name", "position"])
+    changes = [("update", 7, {"name": "Zed Person"})]
+    updated = index.update(apply_journal(frame, changes), changes, frame)
+    assert updated.postings["position"] is index.postings["position"]
+    assert _unshared(index.postings["name"], updated.postings["name"]) <= 2  # the old and the new value
+    assert _unshared(index.grams["name"], updated.grams["name"]) <= len(_trigrams("person 0007") | _trigrams("zed person"))
+    assert updated.search("zed") == [7] and index.search("zed") == []
+
+
+def _interviews():
+    return pd.DataFrame({
+        "id": [1, 2, 3, 4],
+        "feedback": [
+            "Strong system design, weak on Kubernetes",
+            "Kubernetes expert; kubernetes operators and system design",
+            None,
+            "Good communication",
+        ],
+    })
+
+
+FEEDBACK_QUERIES = ["kubernetes", "system design", '"system design"', '"design system"', "communication kubernetes", "zzz"]
+
+
+def test_bm25_ranks_by_term_frequency_and_phrases():
+    index = FullTextIndex(_interviews(), "feedback")
+    assert [row_id for row_id, _ in index.search("kubernetes")] == [2, 1]
+    assert [row_id for row_id, _ in index.search('"system design"')] == [1, 2]
+    assert index.search('"design system"') == []
+    # The rarer term in the shortest text outweighs two mentions of a common one
+    assert [row_id for row_id, _ in index.search("kubernetes communication", limit=1)] == [4]
+
+
+def test_fulltext_update_matches_rebuild():
+    frame = _interviews()
+    index = FullTextIndex(frame, "feedback")
+    before = {query: index.search(query) for query in FEEDBACK_QUERIES}
+    changes = [
+        ("update", 1, {"feedback": "Great communication"}),
+        ("update", 3, {"feedback": "Kubernetes basics only"}),
+        ("delete", 4, None),
+        ("insert", 5, {"id": 5, "feedback": "System design: kubernetes at scale, kubernetes again"}),
+    ]
+    patched = apply_journal(frame, changes)
+    updated = index.update(patched, changes, frame)
+    rebuilt = FullTextIndex(patched, "feedback")
+    for query in FEEDBACK_QUERIES:
+        assert updated.search(query) == rebuilt.search(query)
+        assert index.search(query) == before[query]  # the previous version is left as it was
+
+
+def test_fulltext_update_shares_untouched_chunks_and_scoring_cache():
+    frame = pd.DataFrame({"id": range(1, 2001), "feedback": [f"solid candidate number{i}" for i in range(1, 2001)]})
+    index = FullTextIndex(frame, "feedback")
+    index.search("solid")
+    changes = [("update", 7, {"feedback": "weak candidate"})]
+    updated = index.update(apply_journal(frame, changes), changes, frame)
+    assert _unshared(index.texts, updated.texts) == 1 and _unshared(index.lengths, updated.lengths) == 1
+    assert _unshared(index.postings, updated.postings) <= 4  # solid, candidate, number7 and weak
+    assert updated._cache is index._cache
+    assert len(updated.search("solid", limit=None)) == 1999 and len(index.search("solid", limit=None)) == 2000
+    assert [row_id for row_id, _ in updated.search("weak")] == [7] and index.search("weak") == []
+
+
+def test_highlight_escapes_html():
+    snippet = highlight("<script>alert(1)</script> knows kubernetes", "kubernetes")
+    assert "<script>" not in snippet
+    assert "<mark>kubernetes</mark>" in snippet
@@ -0,0 +1,223 @@
+import datetime
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from data_cache import frame_cache
+from storage import SQLiteStorage, apply_journal
+
+
+def _base():
+    return pd.DataFrame({
+        "id": [1, 2, 3],
+        "name": ["Ann", "Bob", "Cid"],
+        "status": ["Open", "Hired", "Open"],
+        "score": [1.5, 2.5, 3.5],
+    })
+
+
+def test_journal_replays_insert_update_delete(tmp_path):
+    storage = SQLiteStorage(tmp_path / "db.sqlite")
+    storage.write_table("people", _base())
+    storage.append_journals({"people": [
+        ("insert", 4, {"id": 4, "name": "Dee", "status": "Open", "score": 4.5}),
+        ("update", 4, {"status": "Hired"}),
+        ("update", 1, {"name": "Anne", "score": 9.0}),
+        ("delete", 2, None),
+    ]})
+    expected = pd.DataFrame({
+        "id": [1, 3, 4],
+        "name": ["Anne", "Cid", "Dee"],
+        "status": ["Open", "Open", "Hired"],
+        "score": [9.0, 3.5, 4.5],
+    })
+    assert_frame_equal(storage.read_table("people"), expected)
+    assert [row_id for _, row_id in storage.changes("people")][-3:] == [4, 1, 2]
+
+
+def test_compaction_folds_journal_without_changing_content(tmp_path):
+    storage = SQLiteStorage(tmp_path / "db.sqlite", compact_threshold=3)
+    storage.write_table("people", _base())
+    storage.append_journals({"people": [("update", 1, {"name": "Anne"}), ("delete", 3, None)]})
+    before = storage.read_table("people")
+    version = storage.append_journals({"people": [("insert", 4, {"id": 4, "name": "Dee", "status": "Open", "score": 0.5})]})
+    assert storage.wait_for_compaction("people", timeout=10)
+    with storage._connect() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM "people__journal"').fetchone()[0] == 0
+    assert storage.table_version("people") == version["people"]
+    assert_frame_equal(storage.read_table("people").iloc[:2], before)
+    assert storage.read_table("people")["id"].tolist() == [1, 2, 4]
+
+
+def test_patch_shares_untouched_columns():
+    df = _base().astype({"status": "category"})
+    out = apply_journal(df, [
+        ("update", 2, {"score": 7.0}),
+        ("insert", 4, {"id": 4, "name": "Dee", "status": "Rejected", "score": 1.0}),
+    ])
+    assert out["id"].tolist() == [1, 2, 3, 4]
+    assert out["score"].tolist() == [1.5, 7.0, 3.5, 1.0]
+    assert out["status"].tolist() == ["Open", "Hired", "Open", "Rejected"]
+    assert df["score"].tolist() == [1.5, 2.5, 3.5]  # the input frame is left as it was
+    updated = apply_journal(out, [("update", 1, {"name": "Anne"})])
+    assert np.shares_memory(updated["score"].to_numpy(), out["score"].to_numpy())
+    assert not np.shares_memory(updated["name"].to_numpy(), out["name"].to_numpy())
+
+
+def test_patches_from_the_same_version_do_not_share_appended_rows():
+    df = _base()
+    first = apply_journal(df, [("insert", 4, {"id": 4, "name": "Dee", "status": "Open", "score": 4.5})])
+    second = apply_journal(df, [("insert", 5, {"id": 5, "name": "Eve", "status": "Hired", "score": 5.5})])
+    assert first["id"].tolist() == [1, 2, 3, 4] and first["name"].iat[3] == "Dee"
+    assert second["id"].tolist() == [1, 2, 3, 5] and second["name"].iat[3] == "Eve"
+
+
+def test_quoted_column_and_table_names_round_trip(tmp_path):
+    storage = SQLiteStorage(tmp_path / "db.sqlite", compact_threshold=2)
+    df = pd.DataFrame({"id": [1, 2], 'odd "name"': ["a", "b"], 'x" TEXT); DROP TABLE _sequences; --': [1, 2]})
+    storage.write_table('we"ird', df)
+    storage.append_journals({'we"ird': [("update", 1, {'odd "name"': "z"}), ("insert", 3, {"id": 3})]})
+    assert storage.wait_for_compaction('we"ird', timeout=10)
+    out = storage.read_table('we"ird')
+    assert list(out.columns) == list(df.columns)
+    assert out['odd "name"'].tolist() == ["z", "b", None]
+    assert storage.allocate_ids('we"ird') == 4
+
+
+def test_delete_leaves_frame_positional_for_later_patches():
+    out = apply_journal(_base(), [("delete", 2, None)])
+    assert isinstance(out.index, pd.RangeIndex) and out["id"].tolist() == [1, 3]
+    patched = apply_journal(out, [("update", 3, {"name": "Cy"})])
+    assert np.shares_memory(patched["score"].to_numpy(), out["score"].to_numpy())
+
+
+@pytest.mark.parametrize("seed", [3, 11])
+def test_cached_frame_matches_fresh_reload(handler, seed):
+    rng = random.Random(seed)
+
+    def answers():
+        return (
+            [handler.search_rows("candidates", query)["id"].tolist() for query in ("an", "eng", "zed")]
+            + [sorted(handler.filter_rows("candidates", {"status": status})["id"].tolist()) for status in ("Open", "Hired")]
+        )
+
+    answers()
+    for step in range(60):
+        ids = handler.load_candidates()["id"].tolist()
+        choice = rng.random()
+        if choice < 0.35:
+            handler.add_candidate({
+                "name": rng.choice(["Zed", "Amy", None]), "position": rng.choice(["Engineer", f"New {step}"]),
+                "status": rng.choice(["Open", "Interview"]), "client": rng.choice(["TechCorp", None]),
+                "applied_date": rng.choice([datetime.date(2026, 1, 2), "2026-02-03", None]),
+            })
+        elif choice < 0.75:
+            field, value = rng.choice([
+                ("name", "Bob"), ("name", None), ("status", "Hired"), ("status", f"Brand {step}"),
+                ("client", None), ("applied_date", "2024-05-05"), ("applied_date", None),
+            ])
+            handler.update_candidate(rng.choice(ids), {field: value})
+        elif choice < 0.85 and len(ids) > 1:
+            handler.delete_candidate(rng.choice(ids))
+        else:
+            with handler.transaction():
+                new_id = handler.add_candidate({"name": "Tx", "position": "Engineer", "status": "Open"})
+                handler.update_candidate(new_id, {"status": "Hired"})
+                handler.update_candidate(rng.choice(ids), {"name": "Tx edit"})
+        if step % 10 == 9:
+            cached, expected = handler.load_candidates(), answers()
+            frame_cache.invalidate((handler.storage.identity, "candidates"))
+            reloaded = handler.load_candidates()
+            assert_frame_equal(cached, reloaded, check_categorical=False)
+            assert answers() == expected
+
+
+def test_chunked_reads_apply_the_write_log_per_chunk(tmp_path):
+    storage = SQLiteStorage(tmp_path / "db.sqlite")
+    base = pd.DataFrame({"id": range(1, 21), "name": [f"P{i}" for i in range(1, 21)], "score": np.arange(20.0)})
+    storage.write_table("people", base)
+    storage.append_journals({"people": [
+        ("update", 5, {"name": "Five"}),
+        ("delete", 6, None),
+        ("insert", 21, {"id": 21, "name": "New", "score": 0.5}),
+        ("update", 12, {"score": -1.0, "team": "Blue"}),  # adds a column
+        ("delete", 13, None),
+        ("delete", 14, None),
+    ]})
+    chunks = list(storage.read_chunks("people", chunk_rows=4, first_rows=2))
+    assert [len(chunk) for chunk in chunks][:3] == [2, 3, 4]  # the second chunk lost row 6 to a delete
+    assert all(list(chunk.columns) == ["id", "name", "score", "team"] for chunk in chunks)
+    expected = storage.read_table("people").sort_values("id", ignore_index=True)
+    assert_frame_equal(pd.concat(chunks, ignore_index=True), expected, check_dtype=False)
+
+    resumed = pd.concat(storage.read_chunks("people", after=12, chunk_rows=3), ignore_index=True)
+    assert resumed["id"].tolist() == [15, 16, 17, 18, 19, 20, 21]
+    rows = storage.read_rows("people", [21, 5, 6, 99, 12])
+    assert rows["id"].tolist() == [5, 12, 21]
+    assert rows["name"].tolist() == ["Five", "P12", "New"] and rows["team"].tolist()[1] == "Blue"
+
+
+def test_chunked_read_sees_one_version(tmp_path):
+    storage = SQLiteStorage(tmp_path / "db.sqlite")
+    storage.write_table("people", _base())
+    chunks = storage.read_chunks("people", chunk_rows=1)
+    first = next(chunks)
+    storage.append_journals({"people": [("update", 3, {"name": "Later"}), ("delete", 2, None)]})
+    rest = list(chunks)
+    assert pd.concat([first, *rest])["name"].tolist() == ["Ann", "Bob", "Cid"]
+
+
+def test_dictionary_codes_survive_reloads_and_only_grow(tmp_path):
+    storage = SQLiteStorage(tmp_path / "db.sqlite")
+    assert storage.dictionary("people", "status", ["Open", "Hired", "Open", 3]) == ["Open", "Hired", "3"]
+    reopened = SQLiteStorage(tmp_path / "db.sqlite")
+    assert reopened.dictionary("people", "status") == ["Open", "Hired", "3"]
+    # New values are appended after the known codes, whatever order they arrive in
+    assert reopened.dictionary("people", "status", ["Rejected", "Hired", "Archived"]) == [
+        "Open", "Hired", "3", "Rejected", "Archived"
+    ]
+    assert reopened.dictionary("people", "client", ["Hired"]) == ["Hired"]  # one dictionary per column
+    assert SQLiteStorage(tmp_path / "db.sqlite").dictionary("people", "status", ["Open"])[3:] == ["Rejected", "Archived"]
+
+
+def test_category_codes_are_stable_across_saves(handler):
+    def codes(df):
+        return dict(zip(df["id"], df["status"].cat.codes))
+
+    before = handler.load_candidates()
+    categories = list(before["status"].cat.categories)
+    # Rewrite the table without its first status value and rows in another order, then add a new value
+    rewritten = before[before["status"] != "Open"].iloc[::-1].astype({"status": str})
+    handler.save_candidates(rewritten)
+    handler.add_candidate({"name": "Zed", "position": "Engineer", "status": "Archived"})
+    frame_cache.invalidate((handler.storage.identity, "candidates"))
+    after = handler.load_candidates()
+    assert list(after["status"].cat.categories) == categories + ["Archived"]
+    assert {row_id: code for row_id, code in codes(after).items() if row_id in codes(before)} == {
+        row_id: code for row_id, code in codes(before).items() if row_id in set(rewritten["id"])
+    }
+    assert after.set_index("id")["status"].cat.codes.max() == len(categories)
+
+
+def test_compaction_prunes_the_change_log_past_every_consumer(tmp_path):
+    storage = SQLiteStorage(tmp_path / "db.sqlite")
+    storage.write_table("people", _base())
+    storage.write_table("teams", _base())
+    storage.append_journals({"people": [("update", 1, {"name": "Anne"})], "teams": [("delete", 2, None)]})
+    # Nobody reads the people log, so compaction drops all of it
+    storage.compact("people")
+    assert storage.changes("people") == []
+    assert storage.changes_pruned_through("people") == 3
+    assert [row_id for _, row_id in storage.changes("teams")] == [None, 2]
+
+    first = storage.changes("teams")[0][0]
+    storage.acknowledge_changes("target", "teams", first)
+    storage.append_journals({"teams": [("update", 3, {"name": "Cy"})]})
+    storage.compact("teams")
+    assert [row_id for _, row_id in storage.changes("teams")] == [2, 3]  # kept until the consumer reads them
+    assert storage.changes_pruned_through("teams") == first
+    storage.compact("empty")
+    assert storage.changes_pruned_through("empty") == 0
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+import visualizations
+from figure_cache import FigureCache
+from visualizations import DashboardVisualizations, _bucket_timeline
+
+THEME = {"primary": "#1f77b4", "secondary": "#ff7f0e", "success": "#2ca02c", "error": "#d62728", "text": "#000"}
+
+
+def _points(dates, interviewers=("Ann",), status="Scheduled"):
+    dates = pd.to_datetime(dates)
+    return pd.DataFrame({
+        "date": [date for date in dates for _ in interviewers],
+        "interviewer": [name for _ in dates for name in interviewers],
+        "status": status,
+    })
+
+
+def test_bins_are_split_between_the_series():
+    points = _points(pd.date_range("2026-01-01", "2026-01-11", freq="6h"), interviewers=("Ann", "Bob"))
+    out = _bucket_timeline(points, max_points=10)
+    # Two series share ten points: five two-day bins over the ten-day span
+    assert sorted(out["bucket"].unique()) == [0, 1, 2, 3, 4]
+    assert len(out) == 10
+    assert out["count"].sum() == len(points)
+    assert out.groupby("interviewer")["count"].sum().tolist() == [41, 41]
+
+
+def test_first_and_last_points_land_in_the_edge_buckets():
+    points = _points(["2026-01-01 00:00", "2026-01-03 00:00", "2026-01-10 23:00", "2026-01-11 00:00"])
+    out = _bucket_timeline(points, max_points=5).set_index("bucket")
+    # The latest point sits exactly on the upper bound and is kept in the last bin, not a sixth one
+    assert out["count"].to_dict() == {0: 1, 1: 1, 4: 2}
+    assert out.loc[0, "date"] == pd.Timestamp("2026-01-02")
+    assert out.loc[4, "date"] == pd.Timestamp("2026-01-10")
+    assert out["date"].between(points["date"].min(), points["date"].max()).all()
+
+
+@pytest.mark.parametrize("max_points, series, bins", [
+    (10_000, 1, 1000),  # capped
+    (3, 5, 1),  # more series than points
+    (12, 4, 3),
+])
+def test_bin_count_follows_max_points_per_series(max_points, series, bins):
+    points = _points(pd.date_range("2020-01-01", periods=4000, freq="D"), interviewers=[f"I{i}" for i in range(series)])
+    out = _bucket_timeline(points, max_points=max_points)
+    assert out["bucket"].nunique() == bins
+    assert out["count"].sum() == len(points)
+
+
+def test_short_spans_use_at_least_one_day_per_bin():
+    points = _points(pd.date_range("2026-03-01 08:00", "2026-03-01 18:00", freq="h"))
+    out = _bucket_timeline(points, max_points=4)
+    assert out["bucket"].tolist() == [0] and out["count"].tolist() == [11]
+    assert out["date"].iat[0] == pd.Timestamp("2026-03-01 20:00")
+
+
+def test_timeline_buckets_only_when_the_window_holds_too_many_points(monkeypatch):
+    monkeypatch.setattr(visualizations, "figure_cache", FigureCache(max_bytes=1 << 20))
+    viz = DashboardVisualizations(THEME)
+    interviews = _points(pd.date_range("2026-01-01", "2026-01-31 12:00", freq="12h"), interviewers=("Ann", "Bob"))
+    window = ("2026-01-10", "2026-01-12")  # inclusive of the whole last day: 6 instants x 2 interviewers
+    fig = viz.create_interview_timeline(interviews, date_range=window, max_points=12)
+    assert fig.layout.title.text == "Interview Timeline" and len(fig.data[0].x) == 12
+    fig = viz.create_interview_timeline(interviews, date_range=window, max_points=4)
+    assert fig.layout.title.text == "Interview Timeline (12 interviews in 4 buckets)"
+    fig = viz.create_interview_timeline(interviews, max_points=10_000)
+    assert len(fig.data[0].x) == len(interviews)
@@ -1,17 +1,42 @@
+import numpy as np
+import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from figure_cache import figure_cache, frame_fingerprint
+from metrics import CandidateCube
+
+# Interviews drawn individually on the timeline before it switches to time buckets
+TIMELINE_MAX_POINTS = 5000
 
 class DashboardVisualizations:
     def __init__(self, theme_colors):
         self.theme_colors = theme_colors
-        
-    def create_candidate_status_chart(self, candidates_df):
-        """Create stacked bar chart showing candidate status by client"""
-        if len(candidates_df) == 0:
+
+    def _cached(self, chart, df, columns, fingerprint, build):
+        """Serve a chart from the figure cache.
+
+        fingerprint identifies the input data (e.g. DataHandler.fingerprint);
+        without one, the columns the chart reads (or a cube's cells) are hashed.
+        """
+        if fingerprint is None and isinstance(df, CandidateCube):
+            fingerprint = frame_fingerprint(df.cells, df.cells.columns)
+        elif fingerprint is None:
+            fingerprint = frame_fingerprint(df, columns)
+        key = (chart, tuple(sorted(self.theme_colors.items())), fingerprint)
+        return figure_cache.get_or_build(key, lambda: build(df))
+
+    def create_candidate_status_chart(self, candidates, fingerprint=None):
+        """Create stacked bar chart showing candidate status by client, from a CandidateCube or raw rows"""
+        return self._cached(
+            "status", candidates, ['client', 'status'], fingerprint, lambda data: self._status_chart(_as_cube(data))
+        )
+
+    def _status_chart(self, cube):
+        if cube.total == 0:
             return None
             
         fig = px.bar(
-            candidates_df.groupby(['client', 'status']).size().reset_index(name='count'),
+            cube.counts(['client', 'status']).reset_index(),
             x='client',
             y='count',
             color='status',
@@ -33,13 +58,18 @@ class DashboardVisualizations:
         
         return fig
         
-    def create_position_distribution_chart(self, candidates_df):
-        """Create pie chart showing distribution of positions"""
-        if len(candidates_df) == 0:
+    def create_position_distribution_chart(self, candidates, fingerprint=None):
+        """Create pie chart showing distribution of positions, from a CandidateCube or raw rows"""
+        return self._cached(
+            "positions", candidates, ['position'], fingerprint, lambda data: self._position_chart(_as_cube(data))
+        )
+
+    def _position_chart(self, cube):
+        if cube.total == 0:
             return None
             
         fig = px.pie(
-            candidates_df['position'].value_counts().reset_index(),
+            cube.counts(['position']).reset_index(),
             values='count',
             names='position',
             title='Position Distribution',
@@ -60,29 +90,57 @@ class DashboardVisualizations:
         
         return fig
         
-    def create_interview_timeline(self, interviews_df):
-        """Create timeline of scheduled interviews"""
+    def create_interview_timeline(self, interviews_df, fingerprint=None, date_range=None,
+                                  max_points=TIMELINE_MAX_POINTS):
+        """Create timeline of scheduled interviews.
+
+        Drawn as one WebGL trace. date_range=(start, end) limits it to a window;
+        when the window holds more than max_points interviews they are bucketed
+        per interviewer and status into time bins, sized by count.
+        """
+        return self._cached(
+            ("timeline", date_range, max_points), interviews_df, ['date', 'interviewer', 'status'], fingerprint,
+            lambda df: self._interview_timeline(df, date_range, max_points),
+        )
+
+    def _interview_timeline(self, interviews_df, date_range, max_points):
         if len(interviews_df) == 0:
             return None
-            
-        fig = go.Figure()
-        
-        for status in interviews_df['status'].unique():
-            mask = interviews_df['status'] == status
-            fig.add_trace(go.Scatter(
-                x=interviews_df[mask]['date'],
-                y=interviews_df[mask]['interviewer'],
-                mode='markers',
-                name=status,
-                marker=dict(
-                    size=12,
-                    color=self.theme_colors['primary'] if status == 'Scheduled' 
-                          else self.theme_colors['secondary']
-                )
+
+        points = interviews_df[['date', 'interviewer', 'status']]
+        in_window = points['date'].notna()
+        if date_range is not None:
+            start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+            in_window &= points['date'].between(start, end + pd.Timedelta(days=1), inclusive="left")
+        points = points[in_window]
+        bucketed = len(points) > max_points
+        points = _bucket_timeline(points, max_points) if bucketed else points.assign(count=1)
+
+        color = {
+            status: self.theme_colors['primary'] if status == 'Scheduled' else self.theme_colors['secondary']
+            for status in points['status'].dropna().unique()
+        }
+        sizes = 12 if not bucketed else 6 + 14 * np.sqrt(points['count'] / points['count'].max())
+        fig = go.Figure(go.Scattergl(
+            x=points['date'],
+            y=points['interviewer'],
+            mode='markers',
+            marker=dict(size=sizes, color=points['status'].astype(object).map(color).fillna(self.theme_colors['secondary'])),
+            customdata=np.column_stack([points['status'].astype(str), points['count']]),
+            hovertemplate='%{y}<br>%{x}<br>%{customdata[0]}: %{customdata[1]}<extra></extra>',
+            showlegend=False,
+        ))
+        # Legend-only entries; the data itself stays a single trace
+        for status, status_color in color.items():
+            fig.add_trace(go.Scattergl(
+                x=[None], y=[None], mode='markers', name=str(status), marker=dict(size=12, color=status_color)
             ))
-            
+
+        title = 'Interview Timeline'
+        if bucketed:
+            title += f" ({int(points['count'].sum()):,} interviews in {len(points):,} buckets)"
         fig.update_layout(
-            title='Interview Timeline',
+            title=title,
             xaxis_title='Date',
             yaxis_title='Interviewer',
             plot_bgcolor='rgba(0,0,0,0)',
@@ -92,18 +150,24 @@ class DashboardVisualizations:
         
         return fig
         
-    def create_recruitment_funnel(self, candidates_df):
-        """Create recruitment funnel visualization"""
-        if len(candidates_df) == 0:
+    def create_recruitment_funnel(self, candidates, fingerprint=None):
+        """Create recruitment funnel visualization, from a CandidateCube or raw rows"""
+        return self._cached(
+            "funnel", candidates, ['status'], fingerprint, lambda data: self._recruitment_funnel(_as_cube(data))
+        )
+
+    def _recruitment_funnel(self, cube):
+        if cube.total == 0:
             return None
             
+        status_counts = cube.status_counts
         fig = go.Figure(go.Funnel(
             y=['Applied', 'In Progress', 'Interview', 'Hired'],
             x=[
-                len(candidates_df),
-                len(candidates_df[candidates_df['status'] == 'In Progress']),
-                len(candidates_df[candidates_df['status'] == 'Interview']),
-                len(candidates_df[candidates_df['status'] == 'Hired'])
+                cube.total,
+                status_counts.get('In Progress', 0),
+                status_counts.get('Interview', 0),
+                status_counts.get('Hired', 0)
             ],
             textinfo="value+percent initial"
         ))
@@ -116,3 +180,20 @@ class DashboardVisualizations:
         )
         
         return fig
+
+
+def _as_cube(candidates):
+    return candidates if isinstance(candidates, CandidateCube) else CandidateCube(candidates)
+
+
+def _bucket_timeline(points, max_points):
+    """Aggregate timeline points into (time bin, interviewer, status) buckets, at most about max_points"""
+    series = points.groupby(['interviewer', 'status'], observed=True).ngroups
+    bins = int(min(1000, max(1, max_points // max(1, series))))
+    start = points['date'].min()
+    width = max((points['date'].max() - start) / bins, pd.Timedelta(days=1))
+    bucket = ((points['date'] - start) // width).clip(upper=bins - 1)
+    counts = points.groupby([bucket.rename('bucket'), 'interviewer', 'status'], observed=True).size()
+    counts = counts.reset_index(name='count')
+    counts['date'] = start + (counts['bucket'] + 0.5) * width
+    return counts